@@ -0,0 +1,241 @@
+"""
+Scaling benchmark for the model generation functions, run against FakeSapModel.
+
+Two sweeps are run:
+- Grid sweep: number of bays grows from 4x8 up to 200x200 at a fixed storey count.
+- Storey sweep: storey count grows from 3 up to 80 on a fixed 4x8 bay grid.
+
+Each scenario builds a model the way main.py does (units, EC2 materials, slab
+property, grid, stories) and then draws one slab per bay per storey, either with a
+draw_slab call per slab, with one draw_slabs call or with draw_slabs through the
+database table backend (--slab-method).
+For every phase the wall time and the number of API calls are reported, together
+with the simulated COM time (calls x per-call latency).
+
+Usage:
+    python benchmark_model_build.py
+    python benchmark_model_build.py --latency 0.001 --sleep
+    python benchmark_model_build.py --sweep grid --json bench_output.json
+    python benchmark_model_build.py --slab-method draw_slabs
+    python benchmark_model_build.py --slab-method tables
+
+Notes:
+- By default the latency is only accumulated (not waited), so the benchmark runs
+  quickly and "predicted" = wall time + simulated COM time. Use --sleep to really
+  wait the latency on every call.
+- The print output of the benchmarked functions is discarded.
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+
+from fake_sap_model import FakeSapModel
+from set_units import set_etabs_units
+from material_prop import add_eurocode_conc_materials, add_eurocode_rebar_materials
+from set_slab_prop import set_slab_prop
+from create_grid_system import create_grid_system
+from create_ununiformed_grid_system import create_custom_grid
+from get_storey_data import get_story_data
+from draw_slab import draw_slab
+from draw_slabs import draw_slabs
+from geometry_backends import make_geometry_backend
+
+# (bays along x, bays along y)
+GRID_SWEEP = [(4, 8), (10, 10), (25, 25), (50, 50), (100, 100), (200, 200)]
+GRID_SWEEP_STOREYS = 3
+
+STOREY_SWEEP = [3, 5, 10, 20, 40, 80]
+STOREY_SWEEP_BAYS = (4, 8)
+
+BAY_X = 8.1
+BAY_Y = 4.365
+STOREY_HEIGHT = 3.88
+SLAB_PROP = "MyRC125mmSlab"
+
+
+def run_scenario(
+    num_bays_x, num_bays_y, num_of_storeys, latency, sleep, slab_method="draw_slab"
+):
+    """
+    Build one model on a FakeSapModel and measure every phase.
+
+    Parameters:
+    - num_bays_x, num_bays_y: Number of bays in the X and Y directions.
+    - num_of_storeys: Number of storeys above the base.
+    - latency: Per-call latency in seconds.
+    - sleep: If True the latency is waited on every call.
+    - slab_method: "draw_slab" (one call per slab), "draw_slabs" (one bulk call) or
+        "tables" (draw_slabs with the database table backend).
+
+    Returns:
+    - result (dict): Scenario description, per-phase wall time / calls / simulated
+        COM time and the totals.
+    """
+    sap_model = FakeSapModel(latency=latency, sleep=sleep)
+    x_coordinates = [BAY_X * i for i in range(num_bays_x + 1)]
+    y_coordinates = [BAY_Y * j for j in range(num_bays_y + 1)]
+    storey_heights = [STOREY_HEIGHT] * num_of_storeys
+
+    phases = {}
+
+    def measure(phase, func):
+        sap_model.reset_counters()
+        start = time.perf_counter()
+        value = func()
+        wall = time.perf_counter() - start
+        phases[phase] = {
+            "wall_s": wall,
+            "calls": sap_model.total_calls,
+            "com_s": sap_model.simulated_time,
+        }
+        return value
+
+    def draw_all_slabs():
+        if slab_method in ("draw_slabs", "tables"):
+            kind = "tables" if slab_method == "tables" else "api"
+            backend = make_geometry_backend(sap_model, kind)
+            draw_slabs(
+                sap_model, grid_points, [(0, num_bays_x, 0, num_bays_y)], SLAB_PROP,
+                split_bays=True, backend=backend,
+            )
+            backend.apply()
+            return
+        z_coordinate = 0.0
+        for storey_height in storey_heights:
+            z_coordinate += storey_height
+            for i in range(num_bays_x):
+                for j in range(num_bays_y):
+                    draw_slab(
+                        sap_model, grid_points, i, i + 1, j, j + 1, 0,
+                        z_coordinate, SLAB_PROP,
+                    )
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        measure(
+            "custom_grid",
+            lambda: create_custom_grid(
+                sap_model, storey_heights, x_coordinates, y_coordinates
+            ),
+        )
+        grid_points = measure(
+            "grid",
+            lambda: create_grid_system(
+                sap_model, storey_heights, x_coordinates, y_coordinates
+            ),
+        )
+        measure("units", lambda: set_etabs_units(sap_model))
+        measure(
+            "materials",
+            lambda: (
+                add_eurocode_conc_materials(sap_model, delete_existing=True),
+                add_eurocode_rebar_materials(sap_model, delete_existing=True),
+            ),
+        )
+        measure("slab_prop", lambda: set_slab_prop(sap_model, SLAB_PROP))
+        measure("stories", lambda: get_story_data(sap_model))
+        measure("slabs", draw_all_slabs)
+
+    totals = {
+        "wall_s": sum(p["wall_s"] for p in phases.values()),
+        "calls": sum(p["calls"] for p in phases.values()),
+        "com_s": sum(p["com_s"] for p in phases.values()),
+    }
+    if sleep:
+        totals["predicted_s"] = totals["wall_s"]
+    else:
+        totals["predicted_s"] = totals["wall_s"] + totals["com_s"]
+
+    return {
+        "scenario": "{}x{} bays, {} storeys".format(
+            num_bays_x, num_bays_y, num_of_storeys
+        ),
+        "bays_x": num_bays_x,
+        "bays_y": num_bays_y,
+        "storeys": num_of_storeys,
+        "slabs": num_bays_x * num_bays_y * num_of_storeys,
+        "phases": phases,
+        "totals": totals,
+    }
+
+
+def print_report(title, results):
+    print(title)
+    header = "{:<28} {:>9} {:>10} {:>10} {:>10} {:>12}".format(
+        "scenario", "slabs", "calls", "wall [s]", "COM [s]", "predicted [s]"
+    )
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        totals = result["totals"]
+        print(
+            "{:<28} {:>9} {:>10} {:>10.3f} {:>10.3f} {:>12.3f}".format(
+                result["scenario"],
+                result["slabs"],
+                totals["calls"],
+                totals["wall_s"],
+                totals["com_s"],
+                totals["predicted_s"],
+            )
+        )
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0005,
+        help="Per-call COM latency in seconds (default 0.0005).",
+    )
+    parser.add_argument(
+        "--sleep",
+        action="store_true",
+        help="Really wait the latency on every call instead of only adding it up.",
+    )
+    parser.add_argument(
+        "--sweep",
+        choices=["grid", "storey", "all"],
+        default="all",
+        help="Which sweep to run (default all).",
+    )
+    parser.add_argument(
+        "--slab-method",
+        choices=["draw_slab", "draw_slabs", "tables"],
+        default="draw_slab",
+        help="Draw the slabs one call at a time, in bulk or through the database "
+        "tables (default draw_slab).",
+    )
+    parser.add_argument("--json", help="Write the full results to this JSON file.")
+    args = parser.parse_args()
+
+    report = {
+        "latency_s": args.latency,
+        "sleep": args.sleep,
+        "slab_method": args.slab_method,
+    }
+    if args.sweep in ("grid", "all"):
+        report["grid_sweep"] = [
+            run_scenario(
+                nx, ny, GRID_SWEEP_STOREYS, args.latency, args.sleep, args.slab_method
+            )
+            for nx, ny in GRID_SWEEP
+        ]
+        print_report("Grid sweep", report["grid_sweep"])
+    if args.sweep in ("storey", "all"):
+        nx, ny = STOREY_SWEEP_BAYS
+        report["storey_sweep"] = [
+            run_scenario(nx, ny, n, args.latency, args.sleep, args.slab_method)
+            for n in STOREY_SWEEP
+        ]
+        print_report("Storey sweep", report["storey_sweep"])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
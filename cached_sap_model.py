@@ -0,0 +1,142 @@
+"""
+Read-through cache for the read-only SapModel getters.
+
+main.py reads the material table twice (get_all_materials is called by both
+add_eurocode_conc_materials and add_eurocode_rebar_materials) and get_story_data
+re-fetches Story.GetStories on every call. CachedSapModel remembers the results of
+the getters listed in CACHED_GETTERS and drops them again when a setter or deleter
+listed in INVALIDATORS touches the same table, so repeated reads in one session do
+not go through COM.
+
+Notes:
+- Only successful results (return code 0) are cached.
+- Results depend on the present units, so the units set through the wrapper are
+  part of the cache key.
+- Cached results are returned as they are, callers must not modify them.
+- Changes made to the model outside the wrapper (e.g. in the ETABS interface) are
+  not seen, call clear_cache() after such changes.
+
+Example:
+>>> sap_model = CachedSapModel(sap_model)
+>>> get_all_materials(sap_model)  # one GetNameList + GetMaterial per material
+>>> get_all_materials(sap_model)  # served from the cache
+"""
+from sap_model_proxy import SapModelProxy
+
+# Getter path: table it reads
+CACHED_GETTERS = {
+    "GetModelFilename": "file",
+    "PropMaterial.GetNameList": "materials",
+    "PropMaterial.GetMaterial": "materials",
+    "PropMaterial.GetOConcrete_1": "materials",
+    "PropMaterial.GetOSteel_1": "materials",
+    "PropMaterial.GetORebar_1": "materials",
+    "PropMaterial.GetMPIsotropic": "materials",
+    "PropMaterial.GetMPUniaxial": "materials",
+    "PropMaterial.GetWeightAndMass": "materials",
+    "Story.GetStories": "stories",
+}
+
+# Getters whose first argument is not an item name of the table
+_LIST_GETTERS = {"GetModelFilename", "PropMaterial.GetNameList", "Story.GetStories"}
+
+# Tables cleared when the whole model is replaced
+_ALL_TABLES = ("file", "materials", "stories")
+
+# Setter or deleter path: (tables it writes, scope). Scope "name" only drops the
+# cached items of the name passed as first argument, "table" drops the whole table.
+INVALIDATORS = {
+    "PropMaterial.AddMaterial": (("materials",), "table"),
+    "PropMaterial.AddQuick": (("materials",), "table"),
+    "PropMaterial.Delete": (("materials",), "table"),
+    "PropMaterial.ChangeName": (("materials",), "table"),
+    "PropMaterial.SetMaterial": (("materials",), "table"),
+    "PropMaterial.SetOConcrete": (("materials",), "name"),
+    "PropMaterial.SetOConcrete_1": (("materials",), "name"),
+    "PropMaterial.SetOSteel": (("materials",), "name"),
+    "PropMaterial.SetOSteel_1": (("materials",), "name"),
+    "PropMaterial.SetORebar": (("materials",), "name"),
+    "PropMaterial.SetORebar_1": (("materials",), "name"),
+    "PropMaterial.SetMPIsotropic": (("materials",), "name"),
+    "PropMaterial.SetMPUniaxial": (("materials",), "name"),
+    "PropMaterial.SetWeightAndMass": (("materials",), "name"),
+    "Story.SetHeight": (("stories",), "table"),
+    "Story.SetElevation": (("stories",), "table"),
+    "Story.SetMasterStory": (("stories",), "table"),
+    "Story.SetSimilarTo": (("stories",), "table"),
+    "Story.SetSplice": (("stories",), "table"),
+    "Story.SetStories": (("stories",), "table"),
+    "Story.SetStories_2": (("stories",), "table"),
+    "InitializeNewModel": (_ALL_TABLES, "table"),
+    "File.NewBlank": (_ALL_TABLES, "table"),
+    "File.NewGridOnly": (_ALL_TABLES, "table"),
+    "File.OpenFile": (_ALL_TABLES, "table"),
+    "File.Save": (("file",), "table"),
+    # Table edits (materials, stories, geometry, ...) may touch any table
+    "DatabaseTables.ApplyEditedTables": (_ALL_TABLES, "table"),
+}
+
+
+def _return_code(result):
+    if isinstance(result, (list, tuple)):
+        return result[-1] if result else None
+    return 0  # plain values such as the model file name
+
+
+class CachedSapModel(SapModelProxy):
+    """
+    SapModel wrapper caching the read-only getters.
+
+    Parameters:
+    - sap_model: SapModel object (refer to function connect_to_etabs) or FakeSapModel.
+
+    Attributes:
+    - hits, misses (int): Number of getter calls served from / missing the cache.
+    """
+
+    def __init__(self, sap_model):
+        super().__init__(sap_model)
+        # table -> item name (None for list getters) -> call key -> result
+        self._cache = {table: {} for table in _ALL_TABLES}
+        self._units = None
+        self.hits = 0
+        self.misses = 0
+
+    def _invoke(self, path, method, args, kwargs):
+        table = CACHED_GETTERS.get(path)
+        if table is not None:
+            return self._read(table, path, method, args, kwargs)
+
+        result = method(*args, **kwargs)
+        if path == "SetPresentUnits" or path == "InitializeNewModel":
+            if args:
+                self._units = args[0]
+        if path in INVALIDATORS:
+            tables, scope = INVALIDATORS[path]
+            for table in tables:
+                if scope == "name" and args:
+                    self._cache[table].pop(args[0], None)
+                else:
+                    self._cache[table].clear()
+        return result
+
+    def _read(self, table, path, method, args, kwargs):
+        item = None if path in _LIST_GETTERS or not args else args[0]
+        key = (path, args, tuple(sorted(kwargs.items())), self._units)
+        try:
+            hash(key)
+        except TypeError:
+            return method(*args, **kwargs)  # unhashable arguments are not cached
+        entries = self._cache[table].get(item)
+        if entries is not None and key in entries:
+            self.hits += 1
+            return entries[key]
+        self.misses += 1
+        result = method(*args, **kwargs)
+        if _return_code(result) == 0:
+            self._cache[table].setdefault(item, {})[key] = result
+        return result
+
+    def clear_cache(self):
+        for entries in self._cache.values():
+            entries.clear()
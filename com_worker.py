@@ -0,0 +1,267 @@
+"""
+Dedicated COM worker thread with a futures and an asyncio API.
+
+Every API call blocks the calling thread until ETABS answers, so coordinate
+generation, post-processing and file I/O wait for COM and COM waits for Python.
+ComWorker owns the model connection on one worker thread, which initialises its own
+COM apartment and executes the queued operations strictly in order. Callers submit
+calls and get concurrent.futures.Future objects back, so they can keep computing
+while the calls run, and collect the return codes later in bulk.
+
+COM objects belong to the apartment that created them, so the connection is made on
+the worker thread (connect argument) and callers never touch the SapModel directly:
+worker.model is a stand-in which only records the method path, e.g.
+worker.model.AreaObj.AddByCoord(...) queues "AreaObj.AddByCoord" with the arguments.
+
+Example:
+>>> with ComWorker(lambda: connect_to_etabs()) as worker:
+...     futures = [
+...         worker.model.AreaObj.AddByCoord(4, xs, ys, zs, "", "MyRC125mmSlab")
+...         for xs, ys, zs in corners  # computed while the previous calls run
+...     ]
+...     failed = failed_calls(futures)
+...     story_data = worker.run(get_story_data).result()
+
+asyncio:
+>>> async def build(worker):
+...     model = AsyncSapModel(worker)
+...     ret = await model.SetPresentUnits(6)
+...     names = await asyncio.gather(*(model.AreaObj.AddByCoord(*a) for a in areas))
+"""
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+
+try:
+    import comtypes
+except ImportError:  # no COM, e.g. with FakeSapModel
+    comtypes = None
+
+_STOP = object()
+
+
+def return_code(result):
+    """
+    Return code of an API result: the last item of a list result, the value itself
+    for an int, 0 for anything else (e.g. the model file name). Getters returning
+    a plain int (Count, GetPresentUnits) have no return code, do not check them.
+    """
+    if isinstance(result, (list, tuple)):
+        return result[-1] if result else None
+    if isinstance(result, int) and not isinstance(result, bool):
+        return result
+    return 0
+
+
+def failed_calls(futures):
+    """
+    Wait for the futures and return the (index, return code or exception) of the
+    calls which did not succeed.
+    """
+    failed = []
+    for k, future in enumerate(futures):
+        error = future.exception()
+        if error is not None:
+            failed.append((k, error))
+            continue
+        ret = return_code(future.result())
+        if ret != 0:
+            failed.append((k, ret))
+    return failed
+
+
+class PathProxy:
+    """
+    Records an attribute path of the SapModel and submits a call to it.
+    """
+
+    def __init__(self, submit, path):
+        self._submit = submit
+        self._path = path
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        path = self._path + "." + name if self._path else name
+        return PathProxy(self._submit, path)
+
+    def __call__(self, *args, **kwargs):
+        return self._submit(self._path, *args, **kwargs)
+
+    def __repr__(self):
+        return "<queued SapModel path {!r}>".format(self._path)
+
+
+class ComWorker:
+    """
+    Worker thread executing SapModel operations in submission order.
+
+    Parameters:
+    - connect (callable, optional): Called on the worker thread, returns the
+        SapModel or an (etabs_object, sap_model) tuple as connect_to_etabs does.
+    - sap_model (optional): An existing model object instead of connect. Only use
+        this for objects which are not bound to a COM apartment (FakeSapModel).
+    - max_pending (int, optional): Size of the queue; submit blocks while it is
+        full. Default is 10000.
+    - disconnect (callable, optional): disconnect(etabs_object, sap_model), run on the
+        worker thread when it stops, e.g. disconnect_from_etabs.
+
+    Attributes:
+    - model: Stand-in whose calls are queued, returning Futures.
+    - etabs_object: Second item returned by connect, if any.
+    """
+
+    def __init__(self, connect=None, sap_model=None, max_pending=10000, disconnect=None):
+        if (connect is None) == (sap_model is None):
+            raise ValueError("Pass either connect or sap_model")
+        self._queue = queue.Queue(max_pending)
+        self._connect = connect
+        self._sap_model = sap_model
+        self._disconnect = disconnect
+        self._closed = False
+        self._lock = threading.Lock()
+        self.etabs_object = None
+        self._ready = Future()
+        self._thread = threading.Thread(target=self._main, name="ComWorker", daemon=True)
+        self._thread.start()
+        self._ready.result()  # raises if connecting failed
+        self.model = PathProxy(self.submit, "")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _main(self):
+        if comtypes is not None:
+            comtypes.CoInitialize()
+        try:
+            try:
+                if self._connect is not None:
+                    connected = self._connect()
+                    if isinstance(connected, tuple):
+                        self.etabs_object, self._sap_model = connected
+                    else:
+                        self._sap_model = connected
+            except BaseException as error:
+                self._ready.set_exception(error)
+                return
+            self._ready.set_result(True)
+
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                future, function, args, kwargs = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(function(*args, **kwargs))
+                except BaseException as error:
+                    future.set_exception(error)
+        finally:
+            if self._disconnect is not None and self._sap_model is not None:
+                try:
+                    self._disconnect(self.etabs_object, self._sap_model)
+                except Exception as error:
+                    print(f"Error disconnecting from ETABS: {error}")
+            # Released here, before the apartment which owns them is uninitialised
+            self.etabs_object = None
+            self._sap_model = None
+            if comtypes is not None:
+                comtypes.CoUninitialize()
+
+    def _put(self, function, args, kwargs):
+        # Under the lock, so nothing is queued behind _STOP where it would never run
+        with self._lock:
+            if self._closed or not self._thread.is_alive():
+                raise RuntimeError("The COM worker has been closed")
+            future = Future()
+            self._queue.put((future, function, args, kwargs))
+        return future
+
+    def _call_path(self, path, args, kwargs):
+        target = self._sap_model
+        for name in path.split("."):
+            target = getattr(target, name)
+        return target(*args, **kwargs)
+
+    def submit(self, path, *args, **kwargs):
+        """
+        Queue the API call path (e.g. "AreaObj.AddByCoord") and return its Future.
+        """
+        return self._put(self._call_path, (path, args, kwargs), {})
+
+    def submit_many(self, path, arg_lists):
+        """
+        Queue the same API call once per argument list (pipelined writes).
+
+        Returns:
+        - futures (list): One Future per argument list, see failed_calls.
+        """
+        return [self.submit(path, *args) for args in arg_lists]
+
+    def run(self, function, *args, **kwargs):
+        """
+        Queue function(sap_model, *args, **kwargs) to run on the worker thread, e.g.
+        a whole draw_slabs or get_story_data call.
+        """
+        return self._put(lambda: function(self._sap_model, *args, **kwargs), (), {})
+
+    def wait(self):
+        """Block until everything queued so far has been executed."""
+        self._put(lambda: None, (), {}).result()
+
+    def close(self, wait=True, disconnect=None):
+        """
+        Stop the worker after the queued operations. If wait is False the pending
+        operations are cancelled. Calls submitted afterwards raise RuntimeError.
+
+        Parameters:
+        - wait (bool, optional): Run the queued operations first. Default is True.
+        - disconnect (callable, optional): Replaces the disconnect hook given to the
+            constructor.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if disconnect is not None:
+                self._disconnect = disconnect
+        if not self._thread.is_alive():
+            return
+        if not wait:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    item[0].cancel()
+        self._queue.put(_STOP)
+        self._thread.join()
+
+
+class AsyncSapModel:
+    """
+    asyncio facade of a ComWorker: every call returns an awaitable.
+
+    >>> model = AsyncSapModel(worker)
+    >>> ret = await model.File.NewGridOnly(3, 3.88, 3.88, 8, 4, 8.1, 4.365)
+    """
+
+    def __init__(self, worker):
+        self._worker = worker
+        self._proxy = PathProxy(self._submit, "")
+
+    def _submit(self, path, *args, **kwargs):
+        return asyncio.wrap_future(self._worker.submit(path, *args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._proxy, name)
+
+    async def run(self, function, *args, **kwargs):
+        """Awaitable version of ComWorker.run."""
+        return await asyncio.wrap_future(self._worker.run(function, *args, **kwargs))
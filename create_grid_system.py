@@ -6,23 +6,30 @@ Parameters:
 - storey_heights (list): List of storey heights. The first element represents the ground storey height.
 - x_coordinates (list): List of x-coordinates for grid lines.
 - y_coordinates (list): List of y-coordinates for grid lines.
+- units (int, optional): eUnits code the new model is initialized with, the units of the
+    heights and coordinates. Default is 6 (kN_m).
 
 Returns:
-- grid_points (list): Nested list representing grid points generated by combining x and y coordinates.
+- grid_points (Grid): Grid of the x and y coordinates and the storey elevations (see grid.py).
+    grid_points[i][j] returns the (x, y) tuple of the grid point, as the nested list used to.
 
 Notes:
 - This function initializes a new etabs model, creates a grid using the NewGridOnly function,
-    and sets the specified storey heights. The resulting grid points are returned as a nested list.
-- It can only supports ground level and typical level two types of storey height
+    and sets the specified storey heights. The resulting grid points are returned as a Grid.
+- NewGridOnly only supports a ground and a typical storey height. If the storey heights differ
+    from that pattern, all storeys are redefined with their individual heights in one
+    SetStories_2 call (see story_table.define_stories).
 - It can only specify the uniform x or y grid line
 
 Author: Chen Fangting
 Date: 08/Mar/2024
 
 """
+from grid import Grid
+from story_table import define_stories
 
 
-def create_grid_system(sapmodel, storey_heights, x_coordinates, y_coordinates):
+def create_grid_system(sapmodel, storey_heights, x_coordinates, y_coordinates, units=6):
     num_of_storeys = len(storey_heights)
     typical_storey_height = storey_heights[1]
     ground_storey_height = storey_heights[0]
@@ -31,7 +38,7 @@ def create_grid_system(sapmodel, storey_heights, x_coordinates, y_coordinates):
     spacing_x = x_coordinates[1] - x_coordinates[0]
     spacing_y = y_coordinates[1] - y_coordinates[0]
 
-    ret = sapmodel.InitializeNewModel(6)
+    ret = sapmodel.InitializeNewModel(units)
     """
     InitializeNewModel(ModelType)
     ModelType: An integer specifying the type of structural model to create.
@@ -69,23 +76,26 @@ def create_grid_system(sapmodel, storey_heights, x_coordinates, y_coordinates):
     else:
         print("Error running function NewGridOnly")
 
-    grid_points = [[(x, y) for y in y_coordinates] for x in x_coordinates]
+    # NewGridOnly only creates the ground and typical storey heights, set the rest in one call
+    if any(h != typical_storey_height for h in storey_heights[1:]):
+        define_stories(sapmodel, storey_heights)
+    story_elevations = [0.0]
+    for storey_height in storey_heights:
+        story_elevations.append(story_elevations[-1] + storey_height)
+    grid_points = Grid(x_coordinates, y_coordinates, story_elevations)
 
-    # The output nested list has dimensions: len(x_coordinates) x len(y_coordinates)
+    # grid_points[i][j] has dimensions: len(x_coordinates) x len(y_coordinates)
     return grid_points
 
 
 """
-[[(0, 0), (0, 4.365), (0, 8.73), (0, 13.095)], 
-[(8.1, 0), (8.1, 4.365), (8.1, 8.73), (8.1, 13.095)], 
-[(16.2, 0), (16.2, 4.365), (16.2, 8.73), (16.2, 13.095)], 
-[(24.299999999999997, 0), (24.299999999999997, 4.365), (24.299999999999997, 8.73), (24.299999999999997, 13.095)], 
-[(32.4, 0), (32.4, 4.365), (32.4, 8.73), (32.4, 13.095)], [(40.5, 0), (40.5, 4.365), (40.5, 8.73), (40.5, 13.095)], 
-[(48.599999999999994, 0), (48.599999999999994, 4.365), (48.599999999999994, 8.73), (48.599999999999994, 13.095)], 
-[(56.699999999999996, 0), (56.699999999999996, 4.365), (56.699999999999996, 8.73), (56.699999999999996, 13.095)]]
+Grid(8 x 4 lines, 4 levels)
+grid_points.x = [ 0.   8.1 16.2 24.3 32.4 40.5 48.6 56.7]
+grid_points.y = [ 0.     4.365  8.73  13.095]
+grid_points[3][1] = (24.3, 4.365)
 """
 
 # Test Geometric parameters
-# storey_heights = [3.88, 3.88, 3.88]  #Only can set the two types of height
+# storey_heights = [3.88, 3.88, 3.88]  # Any number of storey heights, e.g. [4.5, 3.88, 3.88, 6.0]
 # x_coordinates = [0] + [8.1 * i for i in range(1, 8)]
 # y_coordinates = [0] + [4.365, 8.73, 13.095]
@@ -6,9 +6,22 @@ The script performs the following steps:
 
 1. Connect to ETABS:
    - Create an API helper object.
-   - Attach to a running instance of ETABS using the helper object.
+   - Attach to a running instance of ETABS using the helper object. 'instance'
+     selects which one: None for the active instance, a process id to attach to
+     that ETABS process, "new" to launch a new instance (of 'program_path' if
+     given), or "fake" for an in-process FakeSapModel built with 'fake_options'
+     (no ETABS or comtypes needed).
    - Obtain the active ETABS object and create a SapModel object.
    - Return the ETABS object and SapModel object.
+   - If 'journal' is a file name, the SapModel object is wrapped in a
+     JournalingSapModel which appends every API call to that file for later replay.
+   - If 'profile' is True, the SapModel object is wrapped in a ProfiledSapModel
+     which records call counts, latencies and payload sizes of every API call.
+   - If 'cache' is True, the SapModel object is wrapped in a CachedSapModel which
+     serves repeated reads of materials, stories and the file name from memory.
+   - If 'track_units' is True, the SapModel object is wrapped in a
+     UnitTrackingSapModel which remembers the present units and skips
+     SetPresentUnits calls to the units the model is already in.
 
 2. Print Model Name:
    - Takes a SapModel object as a parameter.
@@ -17,6 +30,9 @@ The script performs the following steps:
 3. Disconnect from ETABS:
    - Takes the ETABS object, SapModel object, and an optional 'close' parameter.
    - If 'close' is True, calls ApplicationExit to exit ETABS.
+   - If the SapModel object is a ProfiledSapModel, writes its report to
+     'profile_report' (JSON, or CSV if the file name ends with .csv).
+   - Closes the journal of a JournalingSapModel.
    - Clears the SapModel and ETABS object variables.
 
 Usage:
@@ -26,7 +42,8 @@ Usage:
 4. Perform other operations as needed.
 5. Run disconnect_from_etabs() to disconnect from the ETABS model.
 
-Note: Ensure that comtypes is installed and a running instance of ETABS is available.
+Note: Ensure that comtypes is installed and a running instance of ETABS is available
+(except for instance="fake").
 
 Author: Chen Fangting
 Date: 07/Mar/2024
@@ -34,10 +51,33 @@ Date: 07/Mar/2024
 
 import os  # os module provides a way to interact with the operating system (e.g., file paths, environment variables).
 import sys  # sys module provides access to some variables and functions related to the Python runtime environment.
-import comtypes.client  # comtypes.client module allows interaction with COM (Component Object Model) objects in Windows.
 
+from profile_sap_model import ProfiledSapModel
+from journal_sap_model import JournalingSapModel
+from cached_sap_model import CachedSapModel
+from sap_model_proxy import SapModelProxy
+from unit_state import UnitTrackingSapModel
+
+
+def connect_to_etabs(
+    profile=False,
+    journal=None,
+    cache=False,
+    instance=None,
+    program_path=None,
+    fake_options=None,
+    track_units=False,
+):
+    if instance == "fake":
+        from fake_sap_model import FakeEtabsObject, FakeSapModel
+
+        my_etabs_object = FakeEtabsObject(FakeSapModel(**(fake_options or {})))
+        return my_etabs_object, _wrap_sap_model(
+            my_etabs_object.SapModel, profile, journal, cache, track_units
+        )
+
+    import comtypes.client  # comtypes.client module allows interaction with COM (Component Object Model) objects in Windows.
 
-def connect_to_etabs():
     # create a API helper object
     helper = comtypes.client.CreateObject(
         "ETABSv1.Helper"
@@ -46,8 +86,19 @@ def connect_to_etabs():
 
     # attach to a ru nning instance of ETABS
     try:
-        # get the active ETABS object
-        my_etabs_object = helper.GetObject("CSI.ETABS.API.ETABSObject")
+        if instance == "new":
+            # launch a new instance, e.g. one per worker process
+            if program_path:
+                my_etabs_object = helper.CreateObject(program_path)
+            else:
+                my_etabs_object = helper.CreateObjectProgID("CSI.ETABS.API.ETABSObject")
+            my_etabs_object.ApplicationStart()
+        elif instance is not None:
+            # attach to the ETABS process with this process id
+            my_etabs_object = helper.GetObjectProcess("CSI.ETABS.API.ETABSObject", int(instance))
+        else:
+            # get the active ETABS object
+            my_etabs_object = helper.GetObject("CSI.ETABS.API.ETABSObject")
     except (OSError, comtypes.COMError):
         """
         If either of these exceptions occurs: 
@@ -63,8 +114,25 @@ def connect_to_etabs():
         )  # The argument -1 indicates an abnormal exit status.When this line is executed, the Python script terminates immediately.
 
     # create an associated SapModel object
-    sap_model = my_etabs_object.SapModel
-    return my_etabs_object, sap_model
+    return my_etabs_object, _wrap_sap_model(
+        my_etabs_object.SapModel, profile, journal, cache, track_units
+    )
+
+
+def _wrap_sap_model(sap_model, profile, journal, cache, track_units=False):
+    if journal:
+        # Append every API call to the journal file, closed by disconnect_from_etabs
+        sap_model = JournalingSapModel(sap_model, journal)
+    if profile:
+        # Record every API call, the report is written by disconnect_from_etabs
+        sap_model = ProfiledSapModel(sap_model)
+    if cache:
+        # Outside the journal and the profile, so that they only see real COM calls
+        sap_model = CachedSapModel(sap_model)
+    if track_units:
+        # Outside the cache, which keys its results on the units actually set
+        sap_model = UnitTrackingSapModel(sap_model)
+    return sap_model
 
 
 def print_model_name(sap_model_object):
@@ -72,7 +140,18 @@ def print_model_name(sap_model_object):
     print(model_name)
 
 
-def disconnect_from_etabs(etabs_object, sap_model, close=False):
+def disconnect_from_etabs(
+    etabs_object, sap_model, close=False, profile_report="sap_model_profile.json"
+):
+    proxy = sap_model
+    while isinstance(proxy, SapModelProxy):
+        if isinstance(proxy, ProfiledSapModel):
+            proxy.write_report(profile_report)
+            proxy.print_report()
+            print(f"Profile report written to {profile_report}")
+        elif isinstance(proxy, JournalingSapModel):
+            proxy.close_journal()
+        proxy = proxy._target
     if close:
         etabs_object.ApplicationExit(False)
     sap_model = None  # Clear the variable
@@ -1,13 +1,82 @@
-import comtypes.client
+from grid import grid_line_labels
 
+GRID_LINES_TABLE = "Grid Definitions - Grid Lines"
+GRID_LINES_FIELDS = ["Name", "LineType", "ID", "Ordinate", "BubbleLoc", "Visible"]
 
-def create_custom_grid(sap_model, storey_heights, x_coordinates, y_coordinates):
+
+def grid_line_records(
+    x_coordinates,
+    y_coordinates,
+    x_labels=None,
+    y_labels=None,
+    x_bubble_loc="End",
+    y_bubble_loc="Start",
+    grid_sys_name="G1",
+):
+    """
+    Flat table data of the "Grid Definitions - Grid Lines" table (fields
+    GRID_LINES_FIELDS) for the given X and Y grid lines.
+    """
+    if x_labels is None:
+        x_labels = grid_line_labels(len(x_coordinates), True)
+    if y_labels is None:
+        y_labels = grid_line_labels(len(y_coordinates), False)
+    table_data = []
+    for line_type, labels, ordinates, bubble_loc in (
+        ("X (Cartesian)", x_labels, x_coordinates, x_bubble_loc),
+        ("Y (Cartesian)", y_labels, y_coordinates, y_bubble_loc),
+    ):
+        for label, ordinate in zip(labels, ordinates):
+            table_data += [grid_sys_name, line_type, str(label), repr(float(ordinate)), bubble_loc, "Yes"]
+    return table_data
+
+
+def create_custom_grid(
+    sap_model,
+    storey_heights,
+    x_coordinates,
+    y_coordinates,
+    x_labels=None,
+    y_labels=None,
+    x_bubble_loc="End",
+    y_bubble_loc="Start",
+    grid_sys_name="G1",
+    tolerance=1e-6,
+    units=6,
+):
+    """
+    Create a grid-only model with non-uniformly spaced grid lines in ETABS.
+
+    NewGridOnly creates the storeys and the grid system, then all X and Y grid lines
+    (ordinates, labels and bubble locations) are written in one batch through the
+    "Grid Definitions - Grid Lines" database table and checked with one
+    GridSys.GetGridSys_2 read-back, so the number of API calls does not grow with
+    the number of grid lines.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - storey_heights (list): List of storey heights. The first element represents the ground storey height.
+    - x_coordinates, y_coordinates (list): Ordinates of the X and Y grid lines.
+    - x_labels, y_labels (list, optional): Grid line labels. Default is A, B, C, ... for X and 1, 2, 3, ... for Y.
+    - x_bubble_loc, y_bubble_loc (str, optional): Bubble location, "End" or "Start".
+    - grid_sys_name (str, optional): Grid system created by NewGridOnly. Default is "G1".
+    - tolerance (float, optional): Allowed difference of the read-back ordinates.
+    - units (int, optional): eUnits code the new model is initialized with, the units
+        of the heights and coordinates. Default is 6 (kN_m).
+
+    Returns:
+    - ret: Return value indicating success (0) or failure (nonzero).
+    """
     num_of_storeys = len(storey_heights)
     num_of_lines_x = len(x_coordinates)
     num_of_lines_y = len(y_coordinates)
+    if x_labels is None:
+        x_labels = grid_line_labels(num_of_lines_x, True)
+    if y_labels is None:
+        y_labels = grid_line_labels(num_of_lines_y, False)
 
     # Initialize ETABS model
-    ret = sap_model.InitializeNewModel(6)
+    ret = sap_model.InitializeNewModel(units)
     """
     InitializeNewModel(ModelType)
     ModelType: An integer specifying the type of structural model to create.
@@ -18,9 +87,16 @@ def create_custom_grid(sap_model, storey_heights, x_coordinates, y_coordinates):
     else:
         print("Error running function InitializeNewModel")
 
-    # Create grid-only model
+    # Create grid-only model, the grid lines are replaced below
+    typical_storey_height = storey_heights[1] if num_of_storeys > 1 else storey_heights[0]
     ret = sap_model.File.NewGridOnly(
-        num_of_storeys, 0, storey_heights[0], num_of_lines_x, num_of_lines_y, 0, 0
+        num_of_storeys,
+        typical_storey_height,
+        storey_heights[0],
+        num_of_lines_x,
+        num_of_lines_y,
+        1,
+        1,
     )
     if (
         ret == 0
@@ -28,21 +104,48 @@ def create_custom_grid(sap_model, storey_heights, x_coordinates, y_coordinates):
         print("Function NewGridOnly was successful")
     else:
         print("Error running function NewGridOnly")
+        return ret
 
-    # Set custom spacings along X and Y directions
-    for i in range(num_of_lines_x):
-        sap_model.GridSys.SetGridSys("GridX{}".format(i + 1), x_coordinates[i], 0, 0)
+    # Set all X and Y grid lines in one table edit
+    table_data = grid_line_records(
+        x_coordinates, y_coordinates, x_labels, y_labels, x_bubble_loc, y_bubble_loc, grid_sys_name
+    )
+    num_records = num_of_lines_x + num_of_lines_y
+    ret = sap_model.DatabaseTables.SetTableForEditingArray(
+        GRID_LINES_TABLE, 0, GRID_LINES_FIELDS, num_records, table_data
+    )[-1]
+    if ret != 0:
+        print("Error running function SetTableForEditingArray for the grid lines")
+        return ret
+
+    apply_result = sap_model.DatabaseTables.ApplyEditedTables(True)
+    ret = apply_result[-1]
+    if ret != 0 or apply_result[0] != 0:
+        print(f"Error running function ApplyEditedTables for the grid lines\n{apply_result[4]}")
+        return ret or 1
+    print(f"Function ApplyEditedTables was successful for {num_records} grid lines")
 
-    for j in range(num_of_lines_y):
-        sap_model.GridSys.SetGridSys("GridY{}".format(j + 1), 0, y_coordinates[j], 0)
+    # Verify the grid lines with one read-back
+    grid_sys = sap_model.GridSys.GetGridSys_2(grid_sys_name)
+    read_x, read_y = sorted(grid_sys[8]), sorted(grid_sys[9])
+    expected_x, expected_y = sorted(x_coordinates), sorted(y_coordinates)
+    if (
+        grid_sys[-1] != 0
+        or len(read_x) != num_of_lines_x
+        or len(read_y) != num_of_lines_y
+        or any(abs(a - b) > tolerance for a, b in zip(read_x, expected_x))
+        or any(abs(a - b) > tolerance for a, b in zip(read_y, expected_y))
+    ):
+        print(f"Grid lines of grid system {grid_sys_name} do not match the requested ordinates")
+        return 1
 
     return ret
 
 
-# Define geometric parameters
-storey_heights = [-1.5, 3.88, 3.88, 2.66]
-x_coordinates = [0] + [8.1 * i for i in range(1, 8)]
-y_coordinates = [0] + [4.365, 8.65, 4.365]
+# # Define geometric parameters
+# storey_heights = [-1.5, 3.88, 3.88, 2.66]
+# x_coordinates = [0] + [8.1 * i for i in range(1, 8)]
+# y_coordinates = [0] + [4.365, 8.65, 4.365]
 
-# Create custom grid-only model
-create_custom_grid(sap_model, storey_heights, x_coordinates, y_coordinates)
+# # Create custom grid-only model
+# create_custom_grid(sap_model, storey_heights, x_coordinates, y_coordinates)
@@ -0,0 +1,223 @@
+"""
+ETABS draw columns and beams on the grid
+
+draw_frames emits a column at every selected grid intersection and a beam between
+consecutive selected intersections along every selected grid line, on every storey.
+All end coordinates are computed in one NumPy pass from the Grid returned by
+create_grid_system and the story data returned by get_story_data, then submitted
+through a geometry backend (see geometry_backends.py) with a single summary print
+per member type: one FrameObj call per member with the default backend, or a few
+table edits for all members with the "tables" backend.
+
+Members are named per storey and grid line:
+- columns: C_<story>_<i>_<j>   at intersection i, j
+- beams along X: BX_<story>_<j>_<i>   on Y grid line j, from X grid line i to the next
+- beams along Y: BY_<story>_<i>_<j>   on X grid line i, from Y grid line j to the next
+
+Example:
+>>> grid_points = create_grid_system(sap_model, storey_heights, x_coordinates, y_coordinates)
+>>> frames = draw_frames(sap_model, grid_points, get_story_data(sap_model), "C600x600", "B300x600")
+>>> frames["columns"][("Story1", 0, 0)]
+'C_Story1_0_0'
+>>> backend = make_geometry_backend(sap_model, "tables")
+>>> frames = draw_frames(sap_model, grid_points, story_data, "C600x600", "B300x600", backend=backend)
+>>> ret = backend.apply()
+"""
+import numpy as np
+
+from geometry_backends import ApiGeometryBackend
+
+
+def story_levels(story_data):
+    """
+    Storey names with bottom and top elevations, from the output of get_story_data.
+
+    Parameters:
+    - story_data (list): Rows [story_nm, story_hgt, story_ele, ...] as returned by
+        get_story_data (top storey first, base last).
+
+    Returns:
+    - names (list), bottoms (array), tops (array): Storeys above the base, bottom up.
+    """
+    rows = sorted(story_data, key=lambda row: row[2])
+    rows = [row for row in rows if row[1] > 0]
+    names = [row[0] for row in rows]
+    tops = np.array([row[2] for row in rows], dtype=float)
+    bottoms = tops - np.array([row[1] for row in rows], dtype=float)
+    return names, bottoms, tops
+
+
+def column_coordinates(grid, bottoms, tops, x_indices=None, y_indices=None):
+    """
+    End coordinates of the columns at the selected intersections on every storey.
+
+    Returns:
+    - i, j (array): Grid line indices of every column.
+    - story (array): Storey index of every column.
+    - start, end (array): (n, 3) bottom and top coordinates.
+    """
+    x_indices = np.arange(len(grid.x)) if x_indices is None else np.asarray(x_indices)
+    y_indices = np.arange(len(grid.y)) if y_indices is None else np.asarray(y_indices)
+    ii, jj = np.meshgrid(x_indices, y_indices, indexing="ij")
+    ii = ii.ravel()
+    jj = jj.ravel()
+    num_of_storeys = len(tops)
+    num_of_columns = len(ii)
+
+    x = np.tile(grid.x[ii], num_of_storeys)
+    y = np.tile(grid.y[jj], num_of_storeys)
+    start = np.column_stack((x, y, np.repeat(bottoms, num_of_columns)))
+    end = np.column_stack((x, y, np.repeat(tops, num_of_columns)))
+    story = np.repeat(np.arange(num_of_storeys), num_of_columns)
+    return np.tile(ii, num_of_storeys), np.tile(jj, num_of_storeys), story, start, end
+
+
+def beam_coordinates(grid, tops, direction, x_indices=None, y_indices=None):
+    """
+    End coordinates of the beams along the selected grid lines on every storey.
+
+    Parameters:
+    - direction: "X" for beams running along X (on the Y grid lines) or "Y".
+
+    Returns:
+    - line, segment (array): Index of the grid line the beam lies on and of the
+        grid line it starts from.
+    - story (array): Storey index of every beam.
+    - start, end (array): (n, 3) start and end coordinates.
+    """
+    x_indices = np.arange(len(grid.x)) if x_indices is None else np.sort(x_indices)
+    y_indices = np.arange(len(grid.y)) if y_indices is None else np.sort(y_indices)
+    if direction == "X":
+        along, across, along_coords, across_coords = x_indices, y_indices, grid.x, grid.y
+    else:
+        along, across, along_coords, across_coords = y_indices, x_indices, grid.y, grid.x
+    segment, line = np.meshgrid(np.arange(len(along) - 1), across, indexing="ij")
+    segment = segment.ravel()
+    line = line.ravel()
+    num_of_storeys = len(tops)
+    num_of_beams = len(line)
+
+    a1 = np.tile(along_coords[along[segment]], num_of_storeys)
+    a2 = np.tile(along_coords[along[segment + 1]], num_of_storeys)
+    c = np.tile(across_coords[line], num_of_storeys)
+    z = np.repeat(tops, num_of_beams)
+    if direction == "X":
+        start = np.column_stack((a1, c, z))
+        end = np.column_stack((a2, c, z))
+    else:
+        start = np.column_stack((c, a1, z))
+        end = np.column_stack((c, a2, z))
+    story = np.repeat(np.arange(num_of_storeys), num_of_beams)
+    return (
+        np.tile(line, num_of_storeys),
+        np.tile(along[segment], num_of_storeys),
+        story,
+        start,
+        end,
+    )
+
+
+def add_frames(sap_model, start, end, prop_name, user_names, joints=None):
+    """
+    Add one frame object per row of the end coordinate arrays.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - start, end (array): (n, 3) end coordinates.
+    - prop_name: Frame section property name.
+    - user_names (list): Name of every frame.
+    - joints (JointIndex, optional): If given, the end joints are shared through the
+        index and the frames are added with FrameObj.AddByPoint.
+
+    Returns:
+    - names (list): Frame name of every row, "" where the API call failed.
+    """
+    return ApiGeometryBackend(sap_model, joints).add_frames(start, end, prop_name, user_names)
+
+
+def _report(member, names, prop_name, backend):
+    failed = names.count("")
+    if getattr(backend, "deferred", False):
+        print(
+            f"{len(names) - failed} {member} queued for {backend.api_function}, "
+            "call apply() to add them"
+        )
+    elif failed == 0:
+        print(f"{len(names)} {member} added successfully with property {prop_name}")
+    else:
+        print(f"Adding {failed} of {len(names)} {member} unsuccessful")
+
+
+def draw_frames(
+    sap_model,
+    grid,
+    story_data,
+    column_prop,
+    beam_prop,
+    x_indices=None,
+    y_indices=None,
+    joints=None,
+    backend=None,
+):
+    """
+    Draw columns and beams on the grid for all storeys.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - grid (Grid): Grid returned by create_grid_system.
+    - story_data (list): Story data returned by get_story_data.
+    - column_prop, beam_prop: Frame section property names. Pass None to skip the
+        columns or the beams.
+    - x_indices, y_indices (list, optional): Grid lines to place members on.
+        Default is all grid lines.
+    - joints (JointIndex, optional): Share the end joints through a JointIndex. Not
+        together with backend.
+    - backend (optional): Geometry backend from make_geometry_backend. Default is
+        the per-object ApiGeometryBackend. With the "tables" backend the members are
+        only queued and added to the model by backend.apply().
+
+    Returns:
+    - frames (dict): {"columns": {(story, i, j): name},
+                      "beams": {(story, direction, line, i): name}}
+    """
+    if backend is None:
+        backend = ApiGeometryBackend(sap_model, joints)
+    elif joints is not None:
+        raise ValueError(
+            "joints is only used without a backend, pass the JointIndex to "
+            "make_geometry_backend instead (the tables backend shares joints itself)"
+        )
+    names, bottoms, tops = story_levels(story_data)
+    frames = {"columns": {}, "beams": {}}
+
+    if column_prop is not None:
+        ii, jj, story, start, end = column_coordinates(
+            grid, bottoms, tops, x_indices, y_indices
+        )
+        keys = [
+            (names[s], i, j) for s, i, j in zip(story.tolist(), ii.tolist(), jj.tolist())
+        ]
+        user_names = ["C_{}_{}_{}".format(*key) for key in keys]
+        added = backend.add_frames(start, end, column_prop, user_names, "column")
+        frames["columns"] = {key: name for key, name in zip(keys, added) if name}
+        _report("columns", added, column_prop, backend)
+
+    if beam_prop is not None:
+        added_all = []
+        for direction in ("X", "Y"):
+            line, segment, story, start, end = beam_coordinates(
+                grid, tops, direction, x_indices, y_indices
+            )
+            keys = [
+                (names[s], direction, l, i)
+                for s, l, i in zip(story.tolist(), line.tolist(), segment.tolist())
+            ]
+            user_names = ["B{1}_{0}_{2}_{3}".format(*key) for key in keys]
+            added = backend.add_frames(start, end, beam_prop, user_names, "beam")
+            frames["beams"].update(
+                {key: name for key, name in zip(keys, added) if name}
+            )
+            added_all.extend(added)
+        _report("beams", added_all, beam_prop, backend)
+
+    return frames
@@ -1,5 +1,8 @@
 """
 ETABS draw slab by coordinates
+
+If a JointIndex is passed as joints, the corner points are shared with the slabs
+drawn before and the slab is added with AddByPoint instead of AddByCoord.
 """
 
 
@@ -13,6 +16,7 @@ def draw_slab(
     offset,
     z_coordinate,
     prop_name,
+    joints=None,
 ):
     # Extract corner points of the slab
     x1, y1 = point_list[start_x_index][start_y_index]
@@ -40,6 +44,22 @@ def draw_slab(
 
     # Add the slab to the ETABS model
     num_points = len(x_coordinates)
+    if joints is not None:
+        point_names = [
+            joints.get_or_add(x, y, z)
+            for x, y, z in zip(x_coordinates, y_coordinates, z_coordinates)
+        ]
+        _, slab_name, ret = sap_model.AreaObj.AddByPoint(
+            num_points, point_names, slab_name, prop_name
+        )
+        if ret == 0:
+            print(
+                f"Function AddByPoint was successful for slab {slab_name} with property {prop_name}"
+            )
+        else:
+            print(f"Error running function AddByPoint for slab {slab_name}")
+        return slab_name
+
     _, _, _, slab_name, ret = sap_model.AreaObj.AddByCoord(
         num_points, x_coordinates, y_coordinates, z_coordinates, slab_name, prop_name
     )
@@ -64,4 +84,12 @@ def draw_slab(
 	string UserName = "",
 	string CSys = "Global"
 )
+
+    int AddByPoint(
+	int NumberPoints,
+	ref string[] Point,
+	ref string Name,
+	string PropName = "Default",
+	string UserName = ""
+)
     """
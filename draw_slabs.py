@@ -0,0 +1,144 @@
+"""
+ETABS draw slabs on many storeys in one go
+
+draw_slabs replaces the per-storey draw_slab loop of main.py. All corner
+coordinates of all slabs on all storeys are computed in one NumPy pass from the
+Grid, then submitted with as little Python work per slab as possible and a single
+summary print at the end. It returns a name table mapping (story, bay range) to
+the slab name, for later assignments.
+
+If a JointIndex is given, the slabs are built from shared joints with
+AreaObj.AddByPoint instead, so adjacent slabs do not duplicate their corner points.
+A geometry backend (see geometry_backends.py) can be passed to submit the slabs
+through the database tables instead of one API call per slab.
+
+Example:
+>>> grid_points = create_grid_system(sap_model, storey_heights, x_coordinates, y_coordinates)
+>>> slab_names = draw_slabs(sap_model, grid_points, [(0, 7, 0, 3)], "MyRC125mmSlab")
+>>> slab_names[("Story1", (0, 7, 0, 3))]
+'1'
+"""
+import numpy as np
+
+from geometry_backends import ApiGeometryBackend
+
+
+def slab_corners(grid, bay_ranges, offset=0.0, split_bays=False):
+    """
+    Corner coordinates of the slabs spanning the given bay ranges.
+
+    Parameters:
+    - grid (Grid): Grid returned by create_grid_system.
+    - bay_ranges (list): (start_x_index, end_x_index, start_y_index, end_y_index)
+        tuples, the same indices draw_slab takes.
+    - offset (float, optional): Outward offset of the slab edges. Default is 0.
+    - split_bays (bool, optional): If True every range is split into one slab per bay.
+
+    Returns:
+    - ranges (array): (m, 4) bay range of every slab.
+    - x, y (array): (m, 4) corner coordinates, in the order draw_slab uses.
+    """
+    ranges = np.asarray(bay_ranges, dtype=int).reshape(-1, 4)
+    if split_bays:
+        pieces = []
+        for start_x, end_x, start_y, end_y in ranges:
+            i, j, _ = grid.bays(start_x, end_x, start_y, end_y)
+            pieces.append(np.column_stack((i, i + 1, j, j + 1)))
+        ranges = np.concatenate(pieces) if pieces else np.empty((0, 4), dtype=int)
+
+    x1 = grid.x[ranges[:, 0]] - offset
+    x2 = grid.x[ranges[:, 1]] + offset
+    y1 = grid.y[ranges[:, 2]] - offset
+    y2 = grid.y[ranges[:, 3]] + offset
+    x = np.column_stack((x1, x2, x2, x1))
+    y = np.column_stack((y1, y1, y2, y2))
+    return ranges, x, y
+
+
+def draw_slabs(
+    sap_model,
+    grid,
+    bay_ranges,
+    prop_name,
+    story_elevations=None,
+    story_names=None,
+    offset=0.0,
+    split_bays=False,
+    joints=None,
+    backend=None,
+):
+    """
+    Draw the slabs of the given bay ranges on every storey.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - grid (Grid): Grid returned by create_grid_system.
+    - bay_ranges (list): (start_x_index, end_x_index, start_y_index, end_y_index)
+        tuples, one slab per range and storey (see split_bays).
+    - prop_name: Slab property name.
+    - story_elevations (list, optional): Elevations to draw at. Default is every
+        storey level of the grid above the base.
+    - story_names (list, optional): Names used in the returned table. Default is
+        "Story1", "Story2", ... as created by NewGridOnly.
+    - offset (float, optional): Outward offset of the slab edges. Default is 0.
+    - split_bays (bool, optional): If True every range is split into one slab per bay.
+    - joints (JointIndex, optional): If given, corner joints are shared through the
+        index and the slabs are added with AreaObj.AddByPoint.
+        Not together with backend.
+    - backend (optional): Geometry backend from make_geometry_backend. Default is
+        the per-object ApiGeometryBackend. With the "tables" backend the slabs are
+        only queued and added to the model by backend.apply().
+
+    Returns:
+    - slab_names (dict): {(story name, (start_x, end_x, start_y, end_y)): slab name}
+    """
+    if story_elevations is None:
+        story_elevations = grid.z[1:]
+    story_elevations = np.asarray(story_elevations, dtype=float)
+    if story_names is None:
+        story_names = ["Story{}".format(k + 1) for k in range(len(story_elevations))]
+
+    ranges, x, y = slab_corners(grid, bay_ranges, offset, split_bays)
+    num_of_ranges = len(ranges)
+    num_of_storeys = len(story_elevations)
+
+    # Stack the slabs of all storeys: storey k occupies rows k*m .. (k+1)*m - 1
+    x_all = np.tile(x, (num_of_storeys, 1))
+    y_all = np.tile(y, (num_of_storeys, 1))
+    z_all = np.repeat(story_elevations, num_of_ranges)[:, None].repeat(4, axis=1)
+
+    if backend is None:
+        backend = ApiGeometryBackend(sap_model, joints)
+    elif joints is not None:
+        raise ValueError(
+            "joints is only used without a backend, pass the JointIndex to "
+            "make_geometry_backend instead (the tables backend shares joints itself)"
+        )
+    names = backend.add_areas(x_all, y_all, z_all, prop_name)
+    api_function = backend.api_function
+
+    slab_names = {}
+    range_keys = [tuple(r) for r in ranges.tolist()]
+    failed = 0
+    for k, name in enumerate(names):
+        if not name:
+            failed += 1
+            continue
+        slab_names[(story_names[k // num_of_ranges], range_keys[k % num_of_ranges])] = name
+
+    if getattr(backend, "deferred", False):
+        print(
+            f"{len(slab_names)} slabs on {num_of_storeys} storeys queued for "
+            f"{api_function}, call apply() to add them"
+        )
+    elif failed == 0:
+        print(
+            f"Function {api_function} was successful for {len(slab_names)} slabs on "
+            f"{num_of_storeys} storeys with property {prop_name}"
+        )
+    else:
+        print(
+            f"Error running function {api_function} for {failed} of {len(names)} slabs "
+            f"with property {prop_name}"
+        )
+    return slab_names
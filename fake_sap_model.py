@@ -0,0 +1,1550 @@
+"""
+In-process stand-in for the ETABS SapModel COM object.
+
+The functions of this project (create_grid_system, create_custom_grid, draw_slab,
+get_story_data, get_all_materials, add_eurocode_conc_materials,
+add_eurocode_rebar_materials, set_slab_prop) all take a live sap_model. The
+FakeSapModel below implements the parts of the API they use, so they can be run,
+measured and regression-tested without ETABS or Windows.
+
+Surfaces implemented:
+- SapModel: InitializeNewModel, SetPresentUnits, GetPresentUnits, GetModelFilename
+- File: NewGridOnly, Save, OpenFile (the model state is pickled to the file)
+- GridSys: SetGridSys, GetGridSys, GetGridSys_2, GetNameList
+- Story: GetStories, GetStories_2, SetStories_2, SetHeight, SetElevation, SetMasterStory, SetSimilarTo, SetSplice
+- PointObj: AddCartesian, Count, GetNameList, GetCoordCartesian, GetAllPoints
+- AreaObj: AddByCoord, AddByPoint, Count, GetNameList, GetPoints, GetProperty, Delete,
+  SetProperty, SetLoadUniform, GetLoadUniform, SetDiaphragm, GetDiaphragm, SetGroupAssign
+- FrameObj: AddByCoord, AddByPoint, Count, GetNameList, GetPoints, Delete, SetSection,
+  GetSection, SetGroupAssign
+- GroupDef: SetGroup, GetNameList, Delete
+- DatabaseTables: GetTableForEditingArray, SetTableForEditingArray,
+  ApplyEditedTables, CancelTableEditing (see FakeDatabaseTables for the tables)
+- PropArea: SetSlab, GetSlab, GetNameList
+- Analyze: RunAnalysis
+- LoadCases: GetNameList
+- RespCombo: Add, SetCaseList, GetNameList
+- Results: JointDispl, FrameForce, AreaStressShell, StoryDrifts (synthetic values,
+  see FakeResults) and Results.Setup: DeselectAllCasesAndCombosForOutput,
+  SetCaseSelectedForOutput, SetComboSelectedForOutput
+- PropMaterial: GetNameList, GetMaterial, AddMaterial, Delete, SetOConcrete,
+  SetOConcrete_1, GetOConcrete_1, SetOSteel_1, GetOSteel_1, SetORebar_1,
+  GetORebar_1, SetMPIsotropic, GetMPIsotropic, SetMPUniaxial, GetMPUniaxial,
+  SetWeightAndMass, GetWeightAndMass
+
+Return values follow the comtypes convention: methods with ref arguments return a
+list of the ref values followed by the return code (0 for success).
+
+Latency:
+- latency (float): Seconds added to every API call, mimicking the COM round-trip.
+- latency_overrides (dict): Per-method latency, e.g. {"AreaObj.AddByCoord": 0.002}.
+- sleep (bool): If False the latency is only accumulated in simulated_time and the
+    call returns immediately. This lets benchmarks predict COM time quickly.
+
+Example:
+>>> sap_model = FakeSapModel(latency=0.0005)
+>>> grid_points = create_grid_system(sap_model, [3.88, 3.88], [0, 8.1], [0, 4.365])
+>>> sap_model.call_counts["File.NewGridOnly"]
+1
+"""
+import copy
+import pickle
+import time
+from collections import Counter
+
+from grid import grid_line_labels
+
+
+# Etabs material type enumerators (same as get_all_materials)
+MAT_TYPE_STEEL = 1
+MAT_TYPE_CONCRETE = 2
+MAT_TYPE_REBAR = 6
+
+
+class _FakeInterface:
+    """
+    Base class for the API surfaces hanging off FakeSapModel (File, Story, ...).
+    """
+
+    _prefix = ""
+
+    def __init__(self, model):
+        self._model = model
+
+    def _call(self, method):
+        self._model._call(self._prefix + "." + method)
+
+
+class FakeFile(_FakeInterface):
+    _prefix = "File"
+
+    def NewGridOnly(
+        self,
+        NumberStorys,
+        TypicalStoryHeight,
+        BottomStoryHeight,
+        NumberLinesX,
+        NumberLinesY,
+        SpacingX,
+        SpacingY,
+    ):
+        self._call("NewGridOnly")
+        model = self._model
+        model.stories = [
+            {
+                "name": "Base",
+                "elevation": 0.0,
+                "height": 0.0,
+                "is_master": False,
+                "similar_to": None,
+                "splice_above": False,
+                "splice_height": 0.0,
+            }
+        ]
+        top_story = "Story{}".format(NumberStorys)
+        elevation = 0.0
+        for i in range(NumberStorys):
+            height = BottomStoryHeight if i == 0 else TypicalStoryHeight
+            elevation += height
+            name = "Story{}".format(i + 1)
+            model.stories.append(
+                {
+                    "name": name,
+                    "elevation": elevation,
+                    "height": height,
+                    "is_master": name == top_story,
+                    "similar_to": None if name == top_story else top_story,
+                    "splice_above": False,
+                    "splice_height": 0.0,
+                }
+            )
+        # Grid lines as (label, ordinate, visible, bubble location)
+        model.grid_lines_x = [
+            (label, SpacingX * i, True, "End")
+            for i, label in enumerate(grid_line_labels(NumberLinesX, True))
+        ]
+        model.grid_lines_y = [
+            (label, SpacingY * i, True, "Start")
+            for i, label in enumerate(grid_line_labels(NumberLinesY, False))
+        ]
+        model.grid_systems = {"G1": (0.0, 0.0, 0.0)}
+        return 0
+
+    def Save(self, FileName=""):
+        self._call("Save")
+        model = self._model
+        path = FileName or model.model_filename
+        try:
+            with open(path, "wb") as f:
+                pickle.dump({key: getattr(model, key) for key in model.STATE}, f)
+        except OSError:
+            return 1
+        model.model_filename = path
+        return 0
+
+    def OpenFile(self, FileName):
+        self._call("OpenFile")
+        model = self._model
+        try:
+            with open(FileName, "rb") as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return 1
+        model._reset_model()
+        for key, value in state.items():
+            setattr(model, key, copy.deepcopy(value))
+        model.model_filename = FileName
+        return 0
+
+
+class FakeGridSys(_FakeInterface):
+    _prefix = "GridSys"
+
+    def SetGridSys(self, Name, x, y, RZ):
+        self._call("SetGridSys")
+        self._model.grid_systems[Name] = (x, y, RZ)
+        return 0
+
+    def GetGridSys(self, Name):
+        self._call("GetGridSys")
+        if Name not in self._model.grid_systems:
+            return [0.0, 0.0, 0.0, 1]
+        x, y, rz = self._model.grid_systems[Name]
+        return [x, y, rz, 0]
+
+    def GetGridSys_2(self, Name):
+        self._call("GetGridSys_2")
+        model = self._model
+        if Name not in model.grid_systems:
+            return [0.0, 0.0, 0.0, "", 0, 0, [], [], [], [], [], [], [], [], 1]
+        x, y, rz = model.grid_systems[Name]
+        lines_x, lines_y = model.grid_lines_x, model.grid_lines_y
+        return [
+            x, y, rz, "Cartesian", len(lines_x), len(lines_y),
+            [l[0] for l in lines_x], [l[0] for l in lines_y],
+            [l[1] for l in lines_x], [l[1] for l in lines_y],
+            [l[2] for l in lines_x], [l[2] for l in lines_y],
+            [l[3] for l in lines_x], [l[3] for l in lines_y],
+            0,
+        ]
+
+    def GetNameList(self):
+        self._call("GetNameList")
+        names = list(self._model.grid_systems)
+        return [len(names), names, 0]
+
+
+class FakeStory(_FakeInterface):
+    _prefix = "Story"
+
+    def GetStories(self):
+        self._call("GetStories")
+        stories = self._model.stories
+        return [
+            len(stories),
+            [s["name"] for s in stories],
+            [s["elevation"] for s in stories],
+            [s["height"] for s in stories],
+            [s["is_master"] for s in stories],
+            [s["similar_to"] for s in stories],
+            [s["splice_above"] for s in stories],
+            [s["splice_height"] for s in stories],
+            0,
+        ]
+
+    def GetStories_2(self):
+        self._call("GetStories_2")
+        stories = self._model.stories
+        base = stories[0]["elevation"] if stories else 0.0
+        above = stories[1:]
+        return [
+            base,
+            len(above),
+            [s["name"] for s in above],
+            [s["elevation"] for s in above],
+            [s["height"] for s in above],
+            [s["is_master"] for s in above],
+            [s["similar_to"] or "" for s in above],
+            [s["splice_above"] for s in above],
+            [s["splice_height"] for s in above],
+            [0] * len(above),
+            0,
+        ]
+
+    def SetStories_2(
+        self,
+        BaseElevation,
+        NumberStories,
+        StoryNames,
+        StoryHeights,
+        IsMasterStory,
+        SimilarToStory,
+        SpliceAbove,
+        SpliceHeight,
+        color,
+    ):
+        self._call("SetStories_2")
+        refs = [StoryNames, StoryHeights, IsMasterStory, SimilarToStory,
+                SpliceAbove, SpliceHeight, color]
+        if NumberStories < 1 or any(len(r) != NumberStories for r in refs[:6]):
+            return refs + [1]
+        if len(set(StoryNames)) != NumberStories or "Base" in StoryNames:
+            return refs + [1]
+        stories = [
+            {
+                "name": "Base",
+                "elevation": BaseElevation,
+                "height": 0.0,
+                "is_master": False,
+                "similar_to": None,
+                "splice_above": False,
+                "splice_height": 0.0,
+            }
+        ]
+        for k in range(NumberStories):
+            stories.append(
+                {
+                    "name": StoryNames[k],
+                    "elevation": 0.0,
+                    "height": StoryHeights[k],
+                    "is_master": IsMasterStory[k],
+                    "similar_to": SimilarToStory[k] or None,
+                    "splice_above": SpliceAbove[k],
+                    "splice_height": SpliceHeight[k],
+                }
+            )
+        self._model.stories = stories
+        self._restack()
+        return refs + [0]
+
+    def _find(self, Name):
+        for story in self._model.stories:
+            if story["name"] == Name:
+                return story
+        return None
+
+    def _restack(self):
+        # Elevations follow from the heights, bottom up
+        elevation = self._model.stories[0]["elevation"]
+        for story in self._model.stories[1:]:
+            elevation += story["height"]
+            story["elevation"] = elevation
+
+    def SetHeight(self, Name, Height):
+        self._call("SetHeight")
+        story = self._find(Name)
+        if story is None:
+            return 1
+        story["height"] = Height
+        self._restack()
+        return 0
+
+    def SetElevation(self, Name, Elevation):
+        self._call("SetElevation")
+        story = self._find(Name)
+        if story is None:
+            return 1
+        index = self._model.stories.index(story)
+        if index == 0:
+            story["elevation"] = Elevation
+        else:
+            story["height"] = Elevation - self._model.stories[index - 1]["elevation"]
+        self._restack()
+        return 0
+
+    def SetMasterStory(self, Name, IsMasterStory):
+        self._call("SetMasterStory")
+        story = self._find(Name)
+        if story is None:
+            return 1
+        story["is_master"] = IsMasterStory
+        return 0
+
+    def SetSimilarTo(self, Name, SimilarToStory):
+        self._call("SetSimilarTo")
+        story = self._find(Name)
+        if story is None:
+            return 1
+        story["similar_to"] = SimilarToStory or None
+        return 0
+
+    def SetSplice(self, Name, SpliceAbove, SpliceHeight):
+        self._call("SetSplice")
+        story = self._find(Name)
+        if story is None:
+            return 1
+        story["splice_above"] = SpliceAbove
+        story["splice_height"] = SpliceHeight
+        return 0
+
+
+class FakePointObj(_FakeInterface):
+    _prefix = "PointObj"
+
+    def AddCartesian(
+        self, x, y, z, Name="", UserName="", CSys="Global", MergeOff=False, MergeNumber=0
+    ):
+        self._call("AddCartesian")
+        name = self._model._add_point(x, y, z, UserName)
+        return [name, 0]
+
+    def Count(self):
+        self._call("Count")
+        return len(self._model.points)
+
+    def GetNameList(self):
+        self._call("GetNameList")
+        names = list(self._model.points)
+        return [len(names), names, 0]
+
+    def GetCoordCartesian(self, Name, CSys="Global"):
+        self._call("GetCoordCartesian")
+        if Name not in self._model.points:
+            return [0.0, 0.0, 0.0, 1]
+        x, y, z = self._model.points[Name]
+        return [x, y, z, 0]
+
+    def GetAllPoints(self, CSys="Global"):
+        self._call("GetAllPoints")
+        names = list(self._model.points)
+        coords = list(self._model.points.values())
+        return [
+            len(names),
+            names,
+            [c[0] for c in coords],
+            [c[1] for c in coords],
+            [c[2] for c in coords],
+            0,
+        ]
+
+
+class FakeAreaObj(_FakeInterface):
+    _prefix = "AreaObj"
+
+    def AddByCoord(
+        self,
+        NumberPoints,
+        X,
+        Y,
+        Z,
+        Name="",
+        PropName="Default",
+        UserName="",
+        CSys="Global",
+    ):
+        self._call("AddByCoord")
+        model = self._model
+        if NumberPoints < 3 or PropName not in model.area_props and PropName != "Default":
+            return [X, Y, Z, "", 1]
+        point_names = [
+            model._add_point(X[i], Y[i], Z[i]) for i in range(NumberPoints)
+        ]
+        name = UserName or model._next_name("area")
+        model.areas[name] = {"points": point_names, "prop": PropName}
+        return [X, Y, Z, name, 0]
+
+    def AddByPoint(self, NumberPoints, Point, Name="", PropName="Default", UserName=""):
+        self._call("AddByPoint")
+        model = self._model
+        if (
+            NumberPoints < 3
+            or any(p not in model.points for p in Point[:NumberPoints])
+            or PropName not in model.area_props and PropName != "Default"
+        ):
+            return [Point, "", 1]
+        name = UserName or model._next_name("area")
+        model.areas[name] = {"points": list(Point[:NumberPoints]), "prop": PropName}
+        return [Point, name, 0]
+
+    def Count(self):
+        self._call("Count")
+        return len(self._model.areas)
+
+    def GetNameList(self):
+        self._call("GetNameList")
+        names = list(self._model.areas)
+        return [len(names), names, 0]
+
+    def GetPoints(self, Name):
+        self._call("GetPoints")
+        if Name not in self._model.areas:
+            return [0, [], 1]
+        points = self._model.areas[Name]["points"]
+        return [len(points), list(points), 0]
+
+    def GetProperty(self, Name):
+        self._call("GetProperty")
+        if Name not in self._model.areas:
+            return ["", 1]
+        return [self._model.areas[Name]["prop"], 0]
+
+    def Delete(self, Name, ItemType=0):
+        self._call("Delete")
+        if self._model.areas.pop(Name, None) is None:
+            return 1
+        return 0
+
+    def SetProperty(self, Name, PropName, ItemType=0):
+        self._call("SetProperty")
+        model = self._model
+        items = model._items("area", Name, ItemType)
+        if items is None or PropName not in model.area_props and PropName != "Default":
+            return 1
+        for name in items:
+            model.areas[name]["prop"] = PropName
+        return 0
+
+    def SetLoadUniform(self, Name, LoadPat, Value, Dir, Replace=True, CSys="Global", ItemType=0):
+        self._call("SetLoadUniform")
+        model = self._model
+        items = model._items("area", Name, ItemType)
+        if items is None or LoadPat not in model.load_cases:
+            return 1
+        for name in items:
+            loads = model.areas[name].setdefault("loads", [])
+            if Replace:
+                loads[:] = [load for load in loads if load[0] != LoadPat]
+            loads.append((LoadPat, CSys, Dir, Value))
+        return 0
+
+    def GetLoadUniform(self, Name, ItemType=0):
+        self._call("GetLoadUniform")
+        model = self._model
+        items = model._items("area", Name, ItemType)
+        if items is None:
+            return [0, [], [], [], [], [], 1]
+        rows = [(name,) + load for name in items for load in model.areas[name].get("loads", ())]
+        columns = [list(column) for column in zip(*rows)] or [[], [], [], [], []]
+        return [len(rows)] + columns + [0]
+
+    def SetDiaphragm(self, Name, DiaphragmName, ItemType=0):
+        self._call("SetDiaphragm")
+        model = self._model
+        items = model._items("area", Name, ItemType)
+        if items is None:
+            return 1
+        for name in items:
+            model.areas[name]["diaphragm"] = DiaphragmName
+        return 0
+
+    def GetDiaphragm(self, Name):
+        self._call("GetDiaphragm")
+        if Name not in self._model.areas:
+            return ["", 1]
+        return [self._model.areas[Name].get("diaphragm", "None"), 0]
+
+    def SetGroupAssign(self, Name, GroupName, Remove=False, ItemType=0):
+        self._call("SetGroupAssign")
+        return self._model._group_assign("area", Name, GroupName, Remove, ItemType)
+
+
+class FakeFrameObj(_FakeInterface):
+    _prefix = "FrameObj"
+
+    def _add(self, point_i, point_j, PropName, UserName):
+        model = self._model
+        name = UserName or model._next_name("frame")
+        if name in model.frames:
+            return [name, 1]
+        model.frames[name] = {"points": [point_i, point_j], "prop": PropName}
+        return [name, 0]
+
+    def AddByCoord(
+        self, xi, yi, zi, xj, yj, zj, Name="", PropName="Default", UserName="", CSys="Global"
+    ):
+        self._call("AddByCoord")
+        point_i = self._model._add_point(xi, yi, zi)
+        point_j = self._model._add_point(xj, yj, zj)
+        return self._add(point_i, point_j, PropName, UserName)
+
+    def AddByPoint(self, Point1, Point2, Name="", PropName="Default", UserName=""):
+        self._call("AddByPoint")
+        if Point1 not in self._model.points or Point2 not in self._model.points:
+            return ["", 1]
+        return self._add(Point1, Point2, PropName, UserName)
+
+    def Count(self):
+        self._call("Count")
+        return len(self._model.frames)
+
+    def GetNameList(self):
+        self._call("GetNameList")
+        names = list(self._model.frames)
+        return [len(names), names, 0]
+
+    def GetPoints(self, Name):
+        self._call("GetPoints")
+        if Name not in self._model.frames:
+            return ["", "", 1]
+        point_i, point_j = self._model.frames[Name]["points"]
+        return [point_i, point_j, 0]
+
+    def Delete(self, Name, ItemType=0):
+        self._call("Delete")
+        if self._model.frames.pop(Name, None) is None:
+            return 1
+        return 0
+
+    def SetSection(self, Name, PropName, ItemType=0, SVarRelStartLoc=0, SVarTotalLength=0):
+        self._call("SetSection")
+        items = self._model._items("frame", Name, ItemType)
+        if items is None:
+            return 1
+        for name in items:
+            self._model.frames[name]["prop"] = PropName
+        return 0
+
+    def GetSection(self, Name):
+        self._call("GetSection")
+        if Name not in self._model.frames:
+            return ["", "", 1]
+        return [self._model.frames[Name]["prop"], "", 0]
+
+    def SetGroupAssign(self, Name, GroupName, Remove=False, ItemType=0):
+        self._call("SetGroupAssign")
+        return self._model._group_assign("frame", Name, GroupName, Remove, ItemType)
+
+
+class FakeGroupDef(_FakeInterface):
+    _prefix = "GroupDef"
+
+    def SetGroup(self, Name, color=-1, SpecifiedForSelection=True, *args):
+        self._call("SetGroup")
+        self._model.groups.setdefault(Name, {})
+        return 0
+
+    def GetNameList(self):
+        self._call("GetNameList")
+        names = list(self._model.groups)
+        return [len(names), names, 0]
+
+    def Delete(self, Name):
+        self._call("Delete")
+        if self._model.groups.pop(Name, None) is None:
+            return 1
+        return 0
+
+
+class FakeDatabaseTables(_FakeInterface):
+    """
+    Interactive table editing for the tables listed in TABLES. Records are flat
+    lists of strings, as in ETABS.
+    """
+
+    _prefix = "DatabaseTables"
+
+    TABLES = {
+        "Point Object Connectivity": ["UniqueName", "X", "Y", "Z"],
+        "Area Object Connectivity": [
+            "UniqueName", "NumOfPts", "UniquePt1", "UniquePt2", "UniquePt3", "UniquePt4",
+        ],
+        "Area Assignments - Section Properties": ["UniqueName", "SectionProperty"],
+        "Grid Definitions - Grid Lines": [
+            "Name", "LineType", "ID", "Ordinate", "BubbleLoc", "Visible",
+        ],
+        "Column Object Connectivity": ["UniqueName", "UniquePtI", "UniquePtJ", "Length"],
+        "Beam Object Connectivity": ["UniqueName", "UniquePtI", "UniquePtJ", "Length"],
+        "Frame Assignments - Section Properties": ["UniqueName", "SectionProperty"],
+        "Group Assignments": ["GroupName", "ObjectType", "UniqueName"],
+        "Material Properties - General": ["Material", "Type", "SymType", "Grade"],
+        "Material Properties - Basic Mechanical Properties": [
+            "Material", "UnitWeight", "E1", "U12", "A1",
+        ],
+        "Material Properties - Concrete Data": [
+            "Material", "Fc", "LtWtConc", "SSCurveOpt", "SSHysType", "SFc", "SCap",
+        ],
+        "Material Properties - Rebar Data": [
+            "Material", "Fy", "Fu", "Fye", "Fue", "SSCurveOpt", "SSHysType", "SHard",
+            "SCap", "FinalSlope", "UseCTDef",
+        ],
+    }
+
+    OBJECT_TYPES = {"point": "Joint", "frame": "Frame", "area": "Area"}
+
+    MAT_TYPES = {
+        1: "Steel", 2: "Concrete", 3: "NoDesign", 4: "Aluminum",
+        5: "ColdFormed", 6: "Rebar", 7: "Tendon", 8: "Masonry",
+    }
+    SS_CURVES = {2: {0: "User", 1: "Simple", 2: "Mander"}, 6: {0: "User", 1: "Simple", 2: "Park"}}
+    SS_HYS = {
+        0: "Elastic", 1: "Kinematic", 2: "Takeda", 3: "Pivot",
+        4: "Concrete", 5: "BRB Hardening", 6: "Degrading", 7: "Isotropic",
+    }
+
+    # Key field of every table, it must be part of the edited fields
+    KEY_FIELDS = {
+        "Grid Definitions - Grid Lines": "Name",
+        "Group Assignments": "GroupName",
+        "Material Properties - General": "Material",
+        "Material Properties - Basic Mechanical Properties": "Material",
+        "Material Properties - Concrete Data": "Material",
+        "Material Properties - Rebar Data": "Material",
+    }
+
+    def __init__(self, model):
+        super().__init__(model)
+        self._edited = {}
+
+    def _records(self, TableKey):
+        model = self._model
+        if TableKey == "Point Object Connectivity":
+            return [
+                [name, repr(x), repr(y), repr(z)]
+                for name, (x, y, z) in model.points.items()
+            ]
+        if TableKey == "Area Object Connectivity":
+            width = max([len(a["points"]) for a in model.areas.values()] + [4])
+            return [
+                [name, str(len(a["points"]))]
+                + a["points"]
+                + [""] * (width - len(a["points"]))
+                for name, a in model.areas.items()
+            ]
+        if TableKey == "Area Assignments - Section Properties":
+            return [[name, a["prop"]] for name, a in model.areas.items()]
+        if TableKey == "Frame Assignments - Section Properties":
+            return [[name, f["prop"]] for name, f in model.frames.items()]
+        if TableKey == "Grid Definitions - Grid Lines":
+            records = []
+            for name in model.grid_systems:
+                for line_type, lines in (
+                    ("X (Cartesian)", model.grid_lines_x),
+                    ("Y (Cartesian)", model.grid_lines_y),
+                ):
+                    for label, ordinate, visible, bubble_loc in lines:
+                        records.append(
+                            [name, line_type, label, repr(ordinate), bubble_loc,
+                             "Yes" if visible else "No"]
+                        )
+            return records
+        if TableKey == "Group Assignments":
+            return [
+                [group, self.OBJECT_TYPES[kind], name]
+                for group, members in model.groups.items()
+                for kind, names in members.items()
+                for name in names
+            ]
+        if TableKey.startswith("Material Properties - "):
+            return self._material_records(TableKey)
+        if TableKey in ("Column Object Connectivity", "Beam Object Connectivity"):
+            want_columns = TableKey == "Column Object Connectivity"
+            records = []
+            for name, frame in model.frames.items():
+                if self._is_column(frame) == want_columns:
+                    point_i, point_j = frame["points"]
+                    xi, yi, zi = model.points[point_i]
+                    xj, yj, zj = model.points[point_j]
+                    length = ((xi - xj) ** 2 + (yi - yj) ** 2 + (zi - zj) ** 2) ** 0.5
+                    records.append([name, point_i, point_j, repr(length)])
+            return records
+        return None
+
+    def _is_column(self, frame):
+        points = self._model.points
+        xi, yi, _ = points[frame["points"][0]]
+        xj, yj, _ = points[frame["points"][1]]
+        return abs(xi - xj) < 1e-9 and abs(yi - yj) < 1e-9
+
+    def _material_records(self, TableKey):
+        def text(value):
+            if isinstance(value, bool):
+                return "Yes" if value else "No"
+            return repr(value)
+
+        records = []
+        for name, mat in self._model.materials.items():
+            uniaxial = mat["mat_type"] in (6, 7)
+            if TableKey == "Material Properties - General":
+                records.append(
+                    [name, self.MAT_TYPES[mat["mat_type"]],
+                     "Uniaxial" if uniaxial else "Isotropic", mat["grade"]]
+                )
+            elif TableKey == "Material Properties - Basic Mechanical Properties":
+                weight = text(mat["weight_mass"][0]) if "weight_mass" in mat else ""
+                if uniaxial and "uniaxial" in mat:
+                    e, a = mat["uniaxial"]
+                    records.append([name, weight, text(e), "", text(a)])
+                elif "isotropic" in mat:
+                    e, u, a = mat["isotropic"][:3]
+                    records.append([name, weight, text(e), text(u), text(a)])
+                else:
+                    records.append([name, weight, "", "", ""])
+            elif TableKey == "Material Properties - Concrete Data" and "concrete" in mat:
+                c = mat["concrete"]
+                records.append(
+                    [name, text(c[0]), text(bool(c[1])), self.SS_CURVES[2][c[3]],
+                     self.SS_HYS[c[4]], text(c[5]), text(c[6])]
+                )
+            elif TableKey == "Material Properties - Rebar Data" and "rebar" in mat:
+                r = mat["rebar"]
+                records.append(
+                    [name] + [text(v) for v in r[:4]]
+                    + [self.SS_CURVES[6][r[4]], self.SS_HYS[r[5]]]
+                    + [text(v) for v in r[6:9]] + [text(bool(r[9]))]
+                )
+        return records
+
+    def _apply_material_tables(self, edited, log):
+        model = self._model
+        type_codes = {name: code for code, name in self.MAT_TYPES.items()}
+        hys_codes = {name: code for code, name in self.SS_HYS.items()}
+
+        records = edited.get("Material Properties - General")
+        if records is not None:
+            materials = {}
+            for record in records:
+                name = record["Material"]
+                mat_type = type_codes.get(record.get("Type"))
+                if mat_type is None:
+                    log.append("Material {} has an unknown type".format(name))
+                    continue
+                mat = model.materials.get(name)
+                if mat is None or mat["mat_type"] != mat_type:
+                    mat = {"mat_type": mat_type, "region": "", "standard": "", "grade": ""}
+                mat["grade"] = record.get("Grade", mat["grade"])
+                materials[name] = mat
+            model.materials = materials
+
+        def number(record, field, default=0.0):
+            value = record.get(field, "")
+            return float(value) if value != "" else default
+
+        for table_key, apply in (
+            ("Material Properties - Basic Mechanical Properties", "mechanical"),
+            ("Material Properties - Concrete Data", "concrete"),
+            ("Material Properties - Rebar Data", "rebar"),
+        ):
+            for record in edited.get(table_key) or ():
+                name = record["Material"]
+                mat = model.materials.get(name)
+                if mat is None:
+                    log.append("Material {} not found".format(name))
+                    continue
+                try:
+                    if apply == "mechanical":
+                        if record.get("UnitWeight", "") != "":
+                            weight = float(record["UnitWeight"])
+                            mat["weight_mass"] = [weight, weight / 9.80665]
+                        if record.get("E1", "") != "":
+                            e, a = number(record, "E1"), number(record, "A1")
+                            if mat["mat_type"] in (6, 7):
+                                mat["uniaxial"] = [e, a]
+                            else:
+                                u = number(record, "U12")
+                                mat["isotropic"] = [e, u, a, e / (2 * (1 + u))]
+                    elif apply == "concrete":
+                        curves = {v: k for k, v in self.SS_CURVES[2].items()}
+                        mat["concrete"] = [
+                            number(record, "Fc"), record.get("LtWtConc") == "Yes", 0.0,
+                            curves[record["SSCurveOpt"]], hys_codes[record["SSHysType"]],
+                            number(record, "SFc"), number(record, "SCap"), 0.0, 0.0, 0.0,
+                        ]
+                    else:
+                        curves = {v: k for k, v in self.SS_CURVES[6].items()}
+                        mat["rebar"] = [
+                            number(record, "Fy"), number(record, "Fu"),
+                            number(record, "Fye"), number(record, "Fue"),
+                            curves[record["SSCurveOpt"]], hys_codes[record["SSHysType"]],
+                            number(record, "SHard"), number(record, "SCap"),
+                            number(record, "FinalSlope"), record.get("UseCTDef") == "Yes",
+                        ]
+                except (KeyError, ValueError):
+                    log.append("Invalid material record {}".format(record))
+
+    def GetTableForEditingArray(self, TableKey, GroupName=""):
+        self._call("GetTableForEditingArray")
+        records = self._records(TableKey)
+        if records is None:
+            return [0, [], 0, [], 1]
+        fields = list(self.TABLES[TableKey])
+        if TableKey == "Area Object Connectivity" and records:
+            width = len(records[0]) - 2
+            fields = fields[:2] + ["UniquePt{}".format(k + 1) for k in range(width)]
+        data = [value for record in records for value in record]
+        return [1, fields, len(records), data, 0]
+
+    def SetTableForEditingArray(
+        self, TableKey, TableVersion, FieldsKeysIncluded, NumberRecords, TableData
+    ):
+        self._call("SetTableForEditingArray")
+        key_field = self.KEY_FIELDS.get(TableKey, "UniqueName")
+        if TableKey not in self.TABLES or key_field not in FieldsKeysIncluded:
+            return [TableVersion, FieldsKeysIncluded, TableData, 1]
+        width = len(FieldsKeysIncluded)
+        if len(TableData) != width * NumberRecords:
+            return [TableVersion, FieldsKeysIncluded, TableData, 1]
+        records = [
+            dict(zip(FieldsKeysIncluded, TableData[r * width : (r + 1) * width]))
+            for r in range(NumberRecords)
+        ]
+        self._edited[TableKey] = records
+        return [TableVersion, FieldsKeysIncluded, TableData, 0]
+
+    def CancelTableEditing(self):
+        self._call("CancelTableEditing")
+        self._edited = {}
+        return 0
+
+    def ApplyEditedTables(self, FillImportLog=True):
+        self._call("ApplyEditedTables")
+        model = self._model
+        log = []
+        edited = self._edited
+        self._edited = {}
+
+        records = edited.get("Point Object Connectivity")
+        if records is not None:
+            points = {}
+            for record in records:
+                try:
+                    points[record["UniqueName"]] = (
+                        float(record["X"]), float(record["Y"]), float(record["Z"])
+                    )
+                except (KeyError, ValueError):
+                    log.append("Invalid point record {}".format(record))
+            model.points = points
+
+        records = edited.get("Area Object Connectivity")
+        if records is not None:
+            areas = {}
+            for record in records:
+                name = record["UniqueName"]
+                num_points = int(record.get("NumOfPts") or 0)
+                point_names = [
+                    record.get("UniquePt{}".format(k + 1), "") for k in range(num_points)
+                ]
+                if num_points < 3 or any(p not in model.points for p in point_names):
+                    log.append("Area {} refers to undefined points".format(name))
+                    continue
+                # Assignments other than the connectivity are kept
+                area = dict(model.areas.get(name, {"prop": "Default"}))
+                area["points"] = point_names
+                areas[name] = area
+            model.areas = areas
+
+        records = edited.get("Area Assignments - Section Properties")
+        if records is not None:
+            for record in records:
+                name = record["UniqueName"]
+                prop = record.get("SectionProperty", "Default")
+                if name not in model.areas:
+                    log.append("Area {} not found".format(name))
+                elif prop != "Default" and prop not in model.area_props:
+                    log.append("Area property {} not defined".format(prop))
+                else:
+                    model.areas[name]["prop"] = prop
+
+        for table_key, columns in (
+            ("Column Object Connectivity", True),
+            ("Beam Object Connectivity", False),
+        ):
+            records = edited.get(table_key)
+            if records is None:
+                continue
+            # The table replaces the frames of its kind, the others are kept
+            frames = {
+                name: frame for name, frame in model.frames.items()
+                if self._is_column(frame) != columns
+            }
+            for record in records:
+                name = record["UniqueName"]
+                point_names = [record.get("UniquePtI", ""), record.get("UniquePtJ", "")]
+                if any(p not in model.points for p in point_names):
+                    log.append("Frame {} refers to undefined points".format(name))
+                    continue
+                frame = dict(model.frames.get(name, {"prop": "Default"}))
+                frame["points"] = point_names
+                frames[name] = frame
+            model.frames = frames
+
+        records = edited.get("Frame Assignments - Section Properties")
+        if records is not None:
+            for record in records:
+                name = record["UniqueName"]
+                if name not in model.frames:
+                    log.append("Frame {} not found".format(name))
+                else:
+                    model.frames[name]["prop"] = record.get("SectionProperty", "Default")
+
+        records = edited.get("Grid Definitions - Grid Lines")
+        if records is not None:
+            lines = {"X (Cartesian)": [], "Y (Cartesian)": []}
+            for record in records:
+                if record["Name"] not in model.grid_systems:
+                    log.append("Grid system {} not found".format(record["Name"]))
+                    continue
+                try:
+                    lines[record["LineType"]].append(
+                        (
+                            record["ID"],
+                            float(record["Ordinate"]),
+                            record.get("Visible", "Yes") == "Yes",
+                            record.get("BubbleLoc", "End"),
+                        )
+                    )
+                except (KeyError, ValueError):
+                    log.append("Invalid grid line record {}".format(record))
+            model.grid_lines_x = sorted(lines["X (Cartesian)"], key=lambda l: l[1])
+            model.grid_lines_y = sorted(lines["Y (Cartesian)"], key=lambda l: l[1])
+
+        records = edited.get("Group Assignments")
+        if records is not None:
+            kinds = {v: k for k, v in self.OBJECT_TYPES.items()}
+            objects = {"point": model.points, "frame": model.frames, "area": model.areas}
+            groups = {group: {} for group in model.groups}
+            for record in records:
+                group, kind = record["GroupName"], kinds.get(record.get("ObjectType"))
+                name = record.get("UniqueName", "")
+                if group not in groups:
+                    log.append("Group {} not defined".format(group))
+                elif kind is None or name not in objects[kind]:
+                    log.append("Object {} {} not found".format(record.get("ObjectType"), name))
+                else:
+                    groups[group].setdefault(kind, []).append(name)
+            model.groups = groups
+
+        self._apply_material_tables(edited, log)
+
+        num_fatal = len(log)
+        import_log = "\n".join(log) if FillImportLog else ""
+        return [num_fatal, 0, 0, len(edited), import_log, 0 if num_fatal == 0 else 1]
+
+
+class FakePropArea(_FakeInterface):
+    _prefix = "PropArea"
+
+    def SetSlab(
+        self, Name, SlabType, ShellType, MatProp, Thickness, color=-1, notes="", GUID=""
+    ):
+        self._call("SetSlab")
+        self._model.area_props[Name] = {
+            "slab_type": SlabType,
+            "shell_type": ShellType,
+            "mat_prop": MatProp,
+            "thickness": Thickness,
+            "color": color,
+            "notes": notes,
+            "guid": GUID,
+        }
+        return 0
+
+    def GetSlab(self, Name):
+        self._call("GetSlab")
+        prop = self._model.area_props.get(Name)
+        if prop is None:
+            return [0, 0, "", 0.0, -1, "", "", 1]
+        return [
+            prop["slab_type"],
+            prop["shell_type"],
+            prop["mat_prop"],
+            prop["thickness"],
+            prop["color"],
+            prop["notes"],
+            prop["guid"],
+            0,
+        ]
+
+    def GetNameList(self):
+        self._call("GetNameList")
+        names = list(self._model.area_props)
+        return [len(names), names, 0]
+
+
+class FakePropMaterial(_FakeInterface):
+    _prefix = "PropMaterial"
+
+    def _get(self, Name):
+        return self._model.materials.get(Name)
+
+    def GetNameList(self, MatType=0):
+        self._call("GetNameList")
+        names = [
+            name
+            for name, mat in self._model.materials.items()
+            if MatType == 0 or mat["mat_type"] == MatType
+        ]
+        return [len(names), names, 0]
+
+    def GetMaterial(self, Name):
+        self._call("GetMaterial")
+        mat = self._get(Name)
+        if mat is None:
+            return [0, -1, "", "", 1]
+        return [mat["mat_type"], -1, "", "", 0]
+
+    def AddMaterial(self, Name, MatType, Region, Standard, Grade, UserName=""):
+        self._call("AddMaterial")
+        name = UserName or Name
+        if name in self._model.materials:
+            return [name, 1]
+        self._model.materials[name] = {
+            "mat_type": MatType,
+            "region": Region,
+            "standard": Standard,
+            "grade": Grade,
+        }
+        return [name, 0]
+
+    def Delete(self, Name):
+        self._call("Delete")
+        if self._model.materials.pop(Name, None) is None:
+            return 1
+        return 0
+
+    def SetOConcrete(
+        self,
+        Name,
+        Fc,
+        IsLightweight,
+        FcsFactor,
+        SSType,
+        SSHysType,
+        StrainAtFc,
+        StrainUltimate,
+        FrictionAngle=0,
+        DilatationalAngle=0,
+        Temp=0,
+    ):
+        self._call("SetOConcrete")
+        return self._set_concrete(
+            Name, Fc, IsLightweight, FcsFactor, SSType, SSHysType,
+            StrainAtFc, StrainUltimate, 0.0, FrictionAngle, DilatationalAngle,
+        )
+
+    def SetOConcrete_1(
+        self,
+        Name,
+        Fc,
+        IsLightweight,
+        FcsFactor,
+        SSType,
+        SSHysType,
+        StrainAtFc,
+        StrainUltimate,
+        FinalSlope,
+        FrictionAngle=0,
+        DilatationalAngle=0,
+        Temp=0,
+    ):
+        self._call("SetOConcrete_1")
+        return self._set_concrete(
+            Name, Fc, IsLightweight, FcsFactor, SSType, SSHysType,
+            StrainAtFc, StrainUltimate, FinalSlope, FrictionAngle, DilatationalAngle,
+        )
+
+    def _set_concrete(self, Name, *values):
+        mat = self._get(Name)
+        if mat is None:
+            return 1
+        mat["concrete"] = list(values)
+        return 0
+
+    def GetOConcrete_1(self, Name, Temp=0):
+        self._call("GetOConcrete_1")
+        mat = self._get(Name)
+        if mat is None or "concrete" not in mat:
+            return [0.0, False, 0.0, 0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 1]
+        return mat["concrete"] + [0]
+
+    def SetOSteel_1(
+        self,
+        Name,
+        Fy,
+        Fu,
+        EFy,
+        EFu,
+        SSType,
+        SSHysType,
+        StrainAtHardening,
+        StrainAtMaxStress,
+        StrainAtRupture,
+        FinalSlope,
+        Temp=0,
+    ):
+        self._call("SetOSteel_1")
+        mat = self._get(Name)
+        if mat is None:
+            return 1
+        mat["steel"] = [
+            Fy, Fu, EFy, EFu, SSType, SSHysType,
+            StrainAtHardening, StrainAtMaxStress, StrainAtRupture, FinalSlope,
+        ]
+        return 0
+
+    def GetOSteel_1(self, Name, Temp=0):
+        self._call("GetOSteel_1")
+        mat = self._get(Name)
+        if mat is None or "steel" not in mat:
+            return [0.0, 0.0, 0.0, 0.0, 0, 0, 0.0, 0.0, 0.0, 0.0, 1]
+        return mat["steel"] + [0]
+
+    def SetORebar_1(
+        self,
+        Name,
+        Fy,
+        Fu,
+        EFy,
+        EFu,
+        SSType,
+        SSHysType,
+        StrainAtHardening,
+        StrainUltimate,
+        FinalSlope,
+        UseCaltransSSDefaults,
+        Temp=0,
+    ):
+        self._call("SetORebar_1")
+        mat = self._get(Name)
+        if mat is None:
+            return 1
+        mat["rebar"] = [
+            Fy, Fu, EFy, EFu, SSType, SSHysType,
+            StrainAtHardening, StrainUltimate, FinalSlope, UseCaltransSSDefaults,
+        ]
+        return 0
+
+    def GetORebar_1(self, Name, Temp=0):
+        self._call("GetORebar_1")
+        mat = self._get(Name)
+        if mat is None or "rebar" not in mat:
+            return [0.0, 0.0, 0.0, 0.0, 0, 0, 0.0, 0.0, 0.0, False, 1]
+        return mat["rebar"] + [0]
+
+    def SetMPIsotropic(self, Name, E, U, A, Temp=0):
+        self._call("SetMPIsotropic")
+        mat = self._get(Name)
+        if mat is None:
+            return 1
+        mat["isotropic"] = [E, U, A, E / (2 * (1 + U))]
+        return 0
+
+    def GetMPIsotropic(self, Name, Temp=0):
+        self._call("GetMPIsotropic")
+        mat = self._get(Name)
+        if mat is None or "isotropic" not in mat:
+            return [0.0, 0.0, 0.0, 0.0, 1]
+        return mat["isotropic"] + [0]
+
+    def SetMPUniaxial(self, Name, E, A, Temp=0):
+        self._call("SetMPUniaxial")
+        mat = self._get(Name)
+        if mat is None:
+            return 1
+        mat["uniaxial"] = [E, A]
+        return 0
+
+    def GetMPUniaxial(self, Name, Temp=0):
+        self._call("GetMPUniaxial")
+        mat = self._get(Name)
+        if mat is None or "uniaxial" not in mat:
+            return [0.0, 0.0, 1]
+        return mat["uniaxial"] + [0]
+
+    def SetWeightAndMass(self, Name, MyOption, Value, Temp=0):
+        self._call("SetWeightAndMass")
+        mat = self._get(Name)
+        if mat is None:
+            return 1
+        # MyOption 1: weight per unit volume is given, 2: mass per unit volume is given
+        gravity = 9.80665
+        if MyOption == 1:
+            mat["weight_mass"] = [Value, Value / gravity]
+        else:
+            mat["weight_mass"] = [Value * gravity, Value]
+        return 0
+
+    def GetWeightAndMass(self, Name, Temp=0):
+        self._call("GetWeightAndMass")
+        mat = self._get(Name)
+        if mat is None or "weight_mass" not in mat:
+            return [0.0, 0.0, 1]
+        return mat["weight_mass"] + [0]
+
+
+class FakeAnalyze(_FakeInterface):
+    _prefix = "Analyze"
+
+    def RunAnalysis(self):
+        self._call("RunAnalysis")
+        self._model.analysed = True
+        return 0
+
+
+class FakeLoadCases(_FakeInterface):
+    _prefix = "LoadCases"
+
+    def GetNameList(self):
+        self._call("GetNameList")
+        names = list(self._model.load_cases)
+        return [len(names), names, 0]
+
+
+class FakeRespCombo(_FakeInterface):
+    _prefix = "RespCombo"
+
+    def Add(self, Name, ComboType):
+        self._call("Add")
+        if Name in self._model.combos or Name in self._model.load_cases:
+            return 1
+        self._model.combos[Name] = {}
+        return 0
+
+    def SetCaseList(self, Name, CNameType, CName, SF):
+        self._call("SetCaseList")
+        if Name not in self._model.combos:
+            return [CNameType, 1]
+        self._model.combos[Name][CName] = SF
+        return [CNameType, 0]
+
+    def GetNameList(self):
+        self._call("GetNameList")
+        names = list(self._model.combos)
+        return [len(names), names, 0]
+
+
+class FakeResultsSetup(_FakeInterface):
+    _prefix = "Results.Setup"
+
+    def DeselectAllCasesAndCombosForOutput(self):
+        self._call("DeselectAllCasesAndCombosForOutput")
+        self._model.selected_output = []
+        return 0
+
+    def SetCaseSelectedForOutput(self, Name, Selected=True):
+        self._call("SetCaseSelectedForOutput")
+        return self._select(Name, Selected, Name in self._model.load_cases)
+
+    def SetComboSelectedForOutput(self, Name, Selected=True):
+        self._call("SetComboSelectedForOutput")
+        return self._select(Name, Selected, Name in self._model.combos)
+
+    def _select(self, Name, Selected, exists):
+        if not exists:
+            return 1
+        selected = self._model.selected_output
+        if Selected and Name not in selected:
+            selected.append(Name)
+        elif not Selected and Name in selected:
+            selected.remove(Name)
+        return 0
+
+
+class FakeResults(_FakeInterface):
+    """
+    Synthetic analysis results, available after Analyze.RunAnalysis.
+
+    Values are simple deterministic functions of the geometry and a load factor
+    (the position of the load case, or the factored sum for a combination), e.g.
+    U1 = 0.001 * factor * z. They are meant for exercising the extraction code,
+    not for checking mechanics.
+    """
+
+    _prefix = "Results"
+
+    def __init__(self, model):
+        super().__init__(model)
+        self.Setup = FakeResultsSetup(model)
+
+    def _factor(self, name):
+        model = self._model
+        if name in model.load_cases:
+            return 1.0 + model.load_cases.index(name)
+        return sum(sf * self._factor(case) for case, sf in model.combos[name].items())
+
+    def _members(self, kind, group):
+        objects = {"point": self._model.points, "frame": self._model.frames, "area": self._model.areas}[kind]
+        if group == "All":
+            return list(objects)
+        if group not in self._model.groups:
+            return None
+        return [name for name in self._model.groups[group].get(kind, ()) if name in objects]
+
+    def JointDispl(self, Name, ItemTypeElm):
+        self._call("JointDispl")
+        members = self._members("point", Name)
+        if not self._model.analysed or members is None:
+            return [0] + [[] for _ in range(11)] + [1]
+        rows = []
+        for case in self._model.selected_output:
+            factor = self._factor(case)
+            for point in members:
+                x, y, z = self._model.points[point]
+                rows.append(
+                    (point, point, case, "", 0.0, 1e-3 * factor * z, 5e-4 * factor * z,
+                     -1e-4 * factor * (1.0 + abs(x) + abs(y)), 0.0, 0.0, 1e-5 * factor)
+                )
+        columns = [list(column) for column in zip(*rows)] or [[] for _ in range(11)]
+        return [len(rows)] + columns + [0]
+
+    def FrameForce(self, Name, ItemTypeElm):
+        self._call("FrameForce")
+        members = self._members("frame", Name)
+        if not self._model.analysed or members is None:
+            return [0] + [[] for _ in range(13)] + [1]
+        points = self._model.points
+        rows = []
+        for case in self._model.selected_output:
+            factor = self._factor(case)
+            for frame in members:
+                point_i, point_j = self._model.frames[frame]["points"]
+                length = sum((a - b) ** 2 for a, b in zip(points[point_i], points[point_j])) ** 0.5
+                for station in (0.0, length):
+                    moment = 10.0 * factor * (station - length / 2)
+                    rows.append(
+                        (frame, station, frame, station, case, "", 0.0,
+                         -100.0 * factor, 20.0 * factor, 0.0, 0.0, 0.0, moment)
+                    )
+        columns = [list(column) for column in zip(*rows)] or [[] for _ in range(13)]
+        return [len(rows)] + columns + [0]
+
+    def AreaStressShell(self, Name, ItemTypeElm):
+        self._call("AreaStressShell")
+        members = self._members("area", Name)
+        if not self._model.analysed or members is None:
+            return [0] + [[] for _ in range(24)] + [1]
+        rows = []
+        for case in self._model.selected_output:
+            factor = self._factor(case)
+            for area in members:
+                for point in self._model.areas[area]["points"]:
+                    s = 1000.0 * factor
+                    top = [s, 0.5 * s, 0.1 * s, s, 0.5 * s, 0.0, 0.9 * s]
+                    bottom = [-v for v in top]
+                    rows.append(
+                        (area, area, point, case, "", 0.0, *top, *bottom, 0.05 * s, 0.05 * s, 0.07 * s, 0.0)
+                    )
+        columns = [list(column) for column in zip(*rows)] or [[] for _ in range(24)]
+        return [len(rows)] + columns + [0]
+
+    def StoryDrifts(self):
+        self._call("StoryDrifts")
+        if not self._model.analysed:
+            return [0] + [[] for _ in range(10)] + [1]
+        stories = [s for s in self._model.stories if s["name"] != "Base"]
+        rows = []
+        for case in self._model.selected_output:
+            factor = self._factor(case)
+            for k, story in enumerate(stories):
+                for direction, share in (("X", 1.0), ("Y", 0.6)):
+                    drift = 1e-3 * factor * share * (len(stories) - k) / len(stories)
+                    rows.append(
+                        (story["name"], case, "", 0.0, direction, drift, "", 0.0, 0.0, story["elevation"])
+                    )
+        columns = [list(column) for column in zip(*rows)] or [[] for _ in range(10)]
+        return [len(rows)] + columns + [0]
+
+
+class FakeSapModel:
+    """
+    Pure-Python stand-in for the SapModel object returned by connect_to_etabs.
+
+    Parameters:
+    - latency (float, optional): Seconds added to every API call. Default is 0.
+    - latency_overrides (dict, optional): Per-method latency keyed by method path,
+        e.g. "AreaObj.AddByCoord".
+    - sleep (bool, optional): If True (default) the latency is actually waited,
+        otherwise it is only accumulated in simulated_time.
+    - model_filename (str, optional): Value returned by GetModelFilename.
+    """
+
+    # Attributes saved by File.Save and restored by File.OpenFile
+    STATE = (
+        "stories", "grid_lines_x", "grid_lines_y", "grid_systems", "points", "areas",
+        "frames", "area_props", "materials", "groups", "load_cases", "combos",
+        "units", "_counters",
+    )
+
+    def __init__(
+        self,
+        latency=0.0,
+        latency_overrides=None,
+        sleep=True,
+        model_filename="C:\\Models\\FakeModel.EDB",
+    ):
+        self.latency = latency
+        self.latency_overrides = dict(latency_overrides or {})
+        self.sleep = sleep
+        self.model_filename = model_filename
+        self.call_counts = Counter()
+        self.simulated_time = 0.0
+
+        self.File = FakeFile(self)
+        self.GridSys = FakeGridSys(self)
+        self.Story = FakeStory(self)
+        self.PointObj = FakePointObj(self)
+        self.AreaObj = FakeAreaObj(self)
+        self.FrameObj = FakeFrameObj(self)
+        self.GroupDef = FakeGroupDef(self)
+        self.DatabaseTables = FakeDatabaseTables(self)
+        self.PropArea = FakePropArea(self)
+        self.PropMaterial = FakePropMaterial(self)
+        self.Analyze = FakeAnalyze(self)
+        self.LoadCases = FakeLoadCases(self)
+        self.RespCombo = FakeRespCombo(self)
+        self.Results = FakeResults(self)
+
+        self.units = 6
+        self._reset_model()
+
+    def _reset_model(self):
+        self.stories = []
+        self.grid_lines_x = []
+        self.grid_lines_y = []
+        self.grid_systems = {}
+        self.points = {}
+        self.areas = {}
+        self.frames = {}
+        self.area_props = {}
+        self.materials = {}
+        self.groups = {}
+        self.load_cases = ["Dead", "Live"]
+        self.combos = {}
+        self.selected_output = []
+        self.analysed = False
+        self._counters = Counter()
+
+    def _call(self, method):
+        self.call_counts[method] += 1
+        delay = self.latency_overrides.get(method, self.latency)
+        if delay:
+            self.simulated_time += delay
+            if self.sleep:
+                time.sleep(delay)
+
+    def _next_name(self, kind):
+        self._counters[kind] += 1
+        return str(self._counters[kind])
+
+    def _add_point(self, x, y, z, user_name=""):
+        # Every AddByCoord corner becomes a new joint, coincident or not
+        name = user_name or self._next_name("point")
+        self.points[name] = (x, y, z)
+        return name
+
+    def _items(self, kind, name, item_type):
+        """
+        Objects addressed by an API call: the object itself (ItemType 0) or the
+        members of a group (ItemType 1). None if it does not exist.
+        """
+        objects = {"point": self.points, "frame": self.frames, "area": self.areas}[kind]
+        if item_type == 0:
+            return [name] if name in objects else None
+        if item_type == 1 and name in self.groups:
+            return [n for n in self.groups[name].get(kind, ()) if n in objects]
+        return None
+
+    def _group_assign(self, kind, name, group, remove, item_type):
+        items = self._items(kind, name, item_type)
+        if items is None or group not in self.groups:
+            return 1
+        members = self.groups[group].setdefault(kind, [])
+        for item in items:
+            if remove and item in members:
+                members.remove(item)
+            elif not remove and item not in members:
+                members.append(item)
+        return 0
+
+    @property
+    def total_calls(self):
+        """Total number of API calls made since the last reset_counters()."""
+        return sum(self.call_counts.values())
+
+    def reset_counters(self):
+        self.call_counts.clear()
+        self.simulated_time = 0.0
+
+    def InitializeNewModel(self, Units=6):
+        self._call("InitializeNewModel")
+        self._reset_model()
+        self.units = Units
+        return 0
+
+    def SetPresentUnits(self, Units):
+        self._call("SetPresentUnits")
+        self.units = Units
+        return 0
+
+    def GetPresentUnits(self):
+        self._call("GetPresentUnits")
+        return self.units
+
+    def GetModelFilename(self, IncludePath=True):
+        self._call("GetModelFilename")
+        if IncludePath:
+            return self.model_filename
+        return self.model_filename.replace("/", "\\").split("\\")[-1]
+
+
+class FakeEtabsObject:
+    """
+    Stand-in for the ETABS application object returned by connect_to_etabs.
+    """
+
+    def __init__(self, sap_model=None):
+        self.SapModel = sap_model if sap_model is not None else FakeSapModel()
+        self.exited = False
+
+    def ApplicationExit(self, FileSave):
+        self.exited = True
+        return 0
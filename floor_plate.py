@@ -0,0 +1,409 @@
+"""
+Floor plates: slab outlines with openings, balconies and edge offsets, merged into
+as few area objects as possible.
+
+draw_slab draws one rectangle between two grid index pairs. A FloorPlate collects
+the pieces of a floor instead:
+- slab regions over bay ranges (with the outward edge offset of draw_slab) or
+  given by coordinates, each with its own slab property,
+- openings (stairs, shafts) cut out of the regions,
+- balconies sticking out of an edge of the plate, centred on grid lines.
+
+The pieces are combined with an exact boolean on a compressed raster: the cell
+edges are the distinct X and Y coordinates of all pieces, every cell is labelled
+with the property painted last over it (regions and balconies in the order they
+were added, openings last) and the whole plate is a small integer array.
+panels() then merges adjacent cells of the same property:
+- merge="polygons" (default): one polygon per connected region of a property,
+  e.g. a floor with its balconies becomes one area object. A region enclosing an
+  opening, or touching itself at a corner, cannot be one ETABS area: it is split
+  into rectangles which are joined again as long as their union is a simple
+  polygon, e.g. a floor around a stair core becomes two area objects.
+- merge="rectangles": as few rectangles as the greedy strip merge finds.
+- merge="bays": no merging, one rectangle per cell.
+
+Fewer, larger area objects mean fewer AddByCoord calls and a smaller mesh for
+ETABS to generate. Only axis-aligned (rectilinear) geometry is supported, as for
+the rest of the grid based generators.
+
+Example:
+>>> plate = FloorPlate(grid_points, "MyRC125mmSlab", offset=0.25)
+>>> plate.add_bays(0, 7, 0, 3)
+>>> plate.add_opening_bays(3, 4, 1, 2)  # stair core
+>>> plate.add_balconies("south", [1, 3, 5, 7], width=4, depth=2, shift=-4.05)
+>>> slab_names = draw_floor_plates(sap_model, plate)
+>>> slab_names[("Story1", 0)]
+'1'
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from geometry_backends import ApiGeometryBackend
+
+Panel = namedtuple("Panel", ["prop_name", "x", "y"])
+
+EDGES = ("south", "north", "west", "east")
+
+# Outgoing boundary edges of a cell (i, j), counterclockwise: (neighbour, start, end)
+_CELL_EDGES = (
+    ((0, -1), (0, 0), (1, 0)),
+    ((1, 0), (1, 0), (1, 1)),
+    ((0, 1), (1, 1), (0, 1)),
+    ((-1, 0), (0, 1), (0, 0)),
+)
+
+
+class FloorPlate:
+    """
+    Slab outline of one floor.
+
+    Parameters:
+    - grid (Grid): Grid returned by create_grid_system.
+    - prop_name (str): Default slab property.
+    - offset (float, optional): Default outward offset of the edges of bay ranges,
+        as in draw_slab. Default is 0.
+    - decimals (int, optional): Coordinates are rounded to this many decimals
+        before they are compared. Default is 6.
+    """
+
+    def __init__(self, grid, prop_name, offset=0.0, decimals=6):
+        self.grid = grid
+        self.prop_name = prop_name
+        self.offset = offset
+        self.decimals = decimals
+        self.regions = []  # (x1, x2, y1, y2, prop name)
+        self.openings = []  # (x1, x2, y1, y2)
+
+    def _rect(self, x1, x2, y1, y2):
+        x1, x2 = sorted((round(float(x1), self.decimals), round(float(x2), self.decimals)))
+        y1, y2 = sorted((round(float(y1), self.decimals), round(float(y2), self.decimals)))
+        if x1 == x2 or y1 == y2:
+            raise ValueError(f"Empty rectangle {x1}, {x2}, {y1}, {y2}")
+        return x1, x2, y1, y2
+
+    def _bay_rect(self, start_x, end_x, start_y, end_y, offset):
+        grid = self.grid
+        return (
+            grid.x[start_x] - offset,
+            grid.x[end_x] + offset,
+            grid.y[start_y] - offset,
+            grid.y[end_y] + offset,
+        )
+
+    def add_region(self, x1, x2, y1, y2, prop_name=None):
+        """Add a slab rectangle given by coordinates."""
+        self.regions.append(self._rect(x1, x2, y1, y2) + (prop_name or self.prop_name,))
+
+    def add_bays(self, start_x, end_x, start_y, end_y, prop_name=None, offset=None):
+        """
+        Add a slab over the bays between grid line indices [start_x, end_x] and
+        [start_y, end_y], the indices draw_slab takes.
+        """
+        offset = self.offset if offset is None else offset
+        self.add_region(*self._bay_rect(start_x, end_x, start_y, end_y, offset), prop_name)
+
+    def add_opening(self, x1, x2, y1, y2):
+        """Cut a rectangle given by coordinates out of the plate."""
+        self.openings.append(self._rect(x1, x2, y1, y2))
+
+    def add_opening_bays(self, start_x, end_x, start_y, end_y):
+        """Cut the bays between the grid line indices out of the plate."""
+        self.add_opening(*self._bay_rect(start_x, end_x, start_y, end_y, 0.0))
+
+    def add_balconies(self, edge, lines, width, depth, shift=0.0, prop_name=None):
+        """
+        Add balconies sticking out of an edge of the plate.
+
+        Parameters:
+        - edge (str): "south" / "north" (min / max Y edge, balconies centred on X grid
+            lines) or "west" / "east" (min / max X edge, centred on Y grid lines).
+        - lines (list): Grid line indices the balconies are centred on.
+        - width (float): Balcony width along the edge.
+        - depth (float): Distance the balcony sticks out of the edge.
+        - shift (float, optional): Shift of the centres along the edge, e.g. half a
+            bay to centre the balconies between grid lines. Default is 0.
+        - prop_name (str, optional): Slab property. Default is the plate property.
+        """
+        if edge not in EDGES:
+            raise ValueError(f"Unknown edge {edge!r}, use one of {EDGES}")
+        if not self.regions:
+            raise ValueError("Add the slab regions before the balconies")
+        x1, x2, y1, y2 = self.bounds()
+        along = self.grid.x if edge in ("south", "north") else self.grid.y
+        for line in lines:
+            centre = along[line] + shift
+            a1, a2 = centre - width / 2.0, centre + width / 2.0
+            if edge == "south":
+                self.add_region(a1, a2, y1 - depth, y1, prop_name)
+            elif edge == "north":
+                self.add_region(a1, a2, y2, y2 + depth, prop_name)
+            elif edge == "west":
+                self.add_region(x1 - depth, x1, a1, a2, prop_name)
+            else:
+                self.add_region(x2, x2 + depth, a1, a2, prop_name)
+
+    def bounds(self):
+        """(x1, x2, y1, y2) of all regions added so far."""
+        rects = np.array([r[:4] for r in self.regions], dtype=float)
+        return rects[:, 0].min(), rects[:, 1].max(), rects[:, 2].min(), rects[:, 3].max()
+
+    def raster(self):
+        """
+        Label every cell of the compressed raster.
+
+        Returns:
+        - xs, ys (array): Sorted distinct cell edge coordinates.
+        - labels (array): (len(xs) - 1, len(ys) - 1) int array, 0 for no slab, k for
+            props[k - 1].
+        - props (list): Property names in order of first use.
+        """
+        pieces = [r[:4] for r in self.regions] + self.openings
+        if not pieces:
+            return np.empty(0), np.empty(0), np.zeros((0, 0), dtype=int), []
+        rects = np.array(pieces, dtype=float)
+        xs = np.unique(rects[:, :2])
+        ys = np.unique(rects[:, 2:])
+        index = np.column_stack(
+            (np.searchsorted(xs, rects[:, :2]), np.searchsorted(ys, rects[:, 2:]))
+        )
+        props = list(dict.fromkeys(r[4] for r in self.regions))
+        values = [props.index(r[4]) + 1 for r in self.regions] + [0] * len(self.openings)
+
+        labels = np.zeros((len(xs) - 1, len(ys) - 1), dtype=int)
+        for (i1, i2, j1, j2), value in zip(index.tolist(), values):
+            labels[i1:i2, j1:j2] = value
+        return xs, ys, labels, props
+
+    def panels(self, merge="polygons"):
+        """
+        Slab panels of the plate.
+
+        Parameters:
+        - merge (str, optional): "polygons", "rectangles" or "bays", see the module
+            docstring. Default is "polygons".
+
+        Returns:
+        - panels (list): Panel(prop_name, x, y) with the corner coordinates of every
+            panel, counterclockwise.
+        """
+        xs, ys, labels, props = self.raster()
+        if merge == "bays":
+            i, j = np.nonzero(labels)
+            rects = [(a, a + 1, b, b + 1, labels[a, b]) for a, b in zip(i.tolist(), j.tolist())]
+            return [_rect_panel(xs, ys, r, props) for r in rects]
+        if merge == "rectangles":
+            return [_rect_panel(xs, ys, r, props) for r in merge_rectangles(labels)]
+        if merge != "polygons":
+            raise ValueError(f"Unknown merge {merge!r}")
+
+        panels = []
+        for label, cells in _components(labels):
+            outline = _outline(cells)
+            if outline is not None:
+                pieces = [outline]
+            else:
+                mask = np.zeros_like(labels)
+                mask[tuple(np.array(list(cells)).T)] = label
+                pieces = _merge_pieces(merge_rectangles(mask))
+            panels.extend(Panel(props[label - 1], xs[p[:, 0]], ys[p[:, 1]]) for p in pieces)
+        return panels
+
+
+def _rect_panel(xs, ys, rect, props):
+    i1, i2, j1, j2, label = rect
+    x1, x2, y1, y2 = xs[i1], xs[i2], ys[j1], ys[j2]
+    return Panel(props[label - 1], np.array([x1, x2, x2, x1]), np.array([y1, y1, y2, y2]))
+
+
+def _strips(labels):
+    # Greedy strip merge: runs of equal labels along Y in every column, extended
+    # along X while the next column has the same run
+    rects = []
+    open_runs = {}  # (j1, j2, label) -> start column
+    num_x, num_y = labels.shape
+    for i in range(num_x + 1):
+        runs = set()
+        if i < num_x:
+            column = labels[i]
+            starts = np.flatnonzero(np.diff(np.concatenate(([0], column))) != 0)
+            ends = np.append(starts[1:], num_y)
+            runs = {(j1, j2, column[j1]) for j1, j2 in zip(starts.tolist(), ends.tolist()) if column[j1]}
+        for run in list(open_runs):
+            if run not in runs:
+                j1, j2, label = run
+                rects.append((open_runs.pop(run), i, j1, j2, int(label)))
+        for run in runs:
+            open_runs.setdefault(run, i)
+    return rects
+
+
+def merge_rectangles(labels):
+    """
+    Cover the labelled cells with few rectangles of equal label, trying strips
+    along both axes.
+
+    Returns:
+    - rects (list): (i1, i2, j1, j2, label) cell index ranges.
+    """
+    along_y = _strips(labels)
+    along_x = [(i1, i2, j1, j2, label) for j1, j2, i1, i2, label in _strips(labels.T)]
+    return along_x if len(along_x) < len(along_y) else along_y
+
+
+def _components(labels):
+    # Connected (edge sharing) cells of equal label: [(label, set of (i, j))]
+    seen = np.zeros(labels.shape, dtype=bool)
+    components = []
+    num_x, num_y = labels.shape
+    for i, j in zip(*np.nonzero(labels)):
+        if seen[i, j]:
+            continue
+        label = labels[i, j]
+        cells = set()
+        stack = [(int(i), int(j))]
+        seen[i, j] = True
+        while stack:
+            a, b = stack.pop()
+            cells.add((a, b))
+            for da, db in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                na, nb = a + da, b + db
+                if 0 <= na < num_x and 0 <= nb < num_y and not seen[na, nb] and labels[na, nb] == label:
+                    seen[na, nb] = True
+                    stack.append((na, nb))
+        components.append((int(label), cells))
+    return components
+
+
+def _outline(cells):
+    # Counterclockwise corner indices of the outline of the cells, None if the
+    # outline is not a single simple loop (holes or corner contacts)
+    edges = {}
+    for a, b in cells:
+        for (da, db), (sa, sb), (ea, eb) in _CELL_EDGES:
+            if (a + da, b + db) not in cells:
+                start = (a + sa, b + sb)
+                if start in edges:
+                    return None
+                edges[start] = (a + ea, b + eb)
+    start = min(edges)
+    loop = [start]
+    point = edges[start]
+    while point != start:
+        loop.append(point)
+        point = edges[point]
+    if len(loop) != len(edges):
+        return None
+    # Keep the corners only
+    corners = [
+        p for k, p in enumerate(loop)
+        if (p[0] - loop[k - 1][0]) * (loop[(k + 1) % len(loop)][1] - p[1])
+        != (p[1] - loop[k - 1][1]) * (loop[(k + 1) % len(loop)][0] - p[0])
+    ]
+    return np.array(corners)
+
+
+def _merge_pieces(rects):
+    # Join the rectangles of a region which is not one simple polygon greedily into
+    # larger simple polygons, as long as their union stays one loop
+    pieces = [
+        {(i, j) for i in range(i1, i2) for j in range(j1, j2)} for i1, i2, j1, j2, _ in rects
+    ]
+    outlines = [_outline(cells) for cells in pieces]
+    joined = True
+    while joined:
+        joined = False
+        for a in range(len(pieces)):
+            for b in range(a + 1, len(pieces)):
+                union = pieces[a] | pieces[b]
+                outline = _outline(union)
+                if outline is not None:
+                    pieces[a], outlines[a] = union, outline
+                    del pieces[b], outlines[b]
+                    joined = True
+                    break
+            if joined:
+                break
+    return outlines
+
+
+def draw_floor_plates(
+    sap_model,
+    plate,
+    story_elevations=None,
+    story_names=None,
+    merge="polygons",
+    joints=None,
+    backend=None,
+):
+    """
+    Draw the panels of a floor plate on every storey.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - plate (FloorPlate): Floor plate.
+    - story_elevations (list, optional): Elevations to draw at. Default is every
+        storey level of the grid above the base.
+    - story_names (list, optional): Names used in the returned table. Default is
+        "Story1", "Story2", ... as created by NewGridOnly.
+    - merge (str, optional): Panel merge, see FloorPlate.panels. Default is "polygons".
+    - joints (JointIndex, optional): If given, corner joints are shared through the
+        index and the panels are added with AreaObj.AddByPoint.
+        Not together with backend.
+    - backend (optional): Geometry backend from make_geometry_backend, see draw_slabs.
+
+    Returns:
+    - slab_names (dict): {(story name, panel index): slab name}, the panel index
+        into plate.panels(merge).
+    """
+    if story_elevations is None:
+        story_elevations = plate.grid.z[1:]
+    story_elevations = np.asarray(story_elevations, dtype=float)
+    if story_names is None:
+        story_names = ["Story{}".format(k + 1) for k in range(len(story_elevations))]
+    if backend is None:
+        backend = ApiGeometryBackend(sap_model, joints)
+    elif joints is not None:
+        raise ValueError(
+            "joints is only used without a backend, pass the JointIndex to "
+            "make_geometry_backend instead (the tables backend shares joints itself)"
+        )
+
+    panels = plate.panels(merge)
+    num_of_storeys = len(story_elevations)
+
+    # One add_areas call per number of corners and property, all storeys at once
+    batches = {}
+    for k, panel in enumerate(panels):
+        batches.setdefault((len(panel.x), panel.prop_name), []).append(k)
+    slab_names = {}
+    failed = 0
+    for (num_points, prop_name), indices in batches.items():
+        x = np.tile(np.array([panels[k].x for k in indices]), (num_of_storeys, 1))
+        y = np.tile(np.array([panels[k].y for k in indices]), (num_of_storeys, 1))
+        z = np.repeat(story_elevations, len(indices))[:, None].repeat(num_points, axis=1)
+        names = backend.add_areas(x, y, z, prop_name)
+        for n, name in enumerate(names):
+            if not name:
+                failed += 1
+                continue
+            story, k = divmod(n, len(indices))
+            slab_names[(story_names[story], indices[k])] = name
+
+    api_function = backend.api_function
+    if getattr(backend, "deferred", False):
+        print(
+            f"{len(slab_names)} floor plate panels on {num_of_storeys} storeys queued "
+            f"for {api_function}, call apply() to add them"
+        )
+    elif failed == 0:
+        print(
+            f"Function {api_function} was successful for {len(panels)} floor plate "
+            f"panels on {num_of_storeys} storeys"
+        )
+    else:
+        print(
+            f"Error running function {api_function} for {failed} of "
+            f"{len(panels) * num_of_storeys} floor plate panels"
+        )
+    return slab_names
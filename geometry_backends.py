@@ -0,0 +1,388 @@
+"""
+Geometry backends: how generated slabs, columns and beams are submitted to ETABS.
+
+Two interchangeable backends with the same interface are provided:
+- ApiGeometryBackend: one AreaObj.AddByCoord / FrameObj.AddByCoord (or AddByPoint
+  with a JointIndex) call per object. Objects exist in the model as soon as
+  add_areas / add_frames returns.
+- TableGeometryBackend: builds the joint-coordinate, area- and frame-connectivity
+  and section-assignment tables as flat arrays in Python. apply() pushes each
+  table with one DatabaseTables.SetTableForEditingArray call and applies them all
+  with a single ApplyEditedTables, so 10k slabs or 100k members cost a handful of
+  round-trips.
+
+Interface:
+- add_areas(x, y, z, prop_name) -> list of area names ("" where adding failed)
+- add_frames(start, end, prop_name, user_names, kind) -> list of frame names,
+  kind being "column" or "beam"
+- apply() -> 0 on success
+- api_function: name of the submission path, used in the status prints
+- deferred: True if objects only reach the model in apply()
+
+Usage:
+>>> backend = make_geometry_backend(sap_model, "tables")
+>>> slab_names = draw_slabs(sap_model, grid_points, [(0, 7, 0, 3)], "MyRC125mmSlab", backend=backend)
+>>> ret = backend.apply()
+
+Notes:
+- Table editing replaces the content of a table, so apply() first reads the current
+  table and appends the new records to it.
+- Before naming the first new object TableGeometryBackend reads the joints, areas
+  and frames already in the model: generated names skip the names in use, new
+  corners at existing joints reuse those joints and frames whose user name is
+  taken fail as FrameObj.AddByCoord would.
+- The table and field keys below follow the ETABS v21 database tables; check them
+  with DatabaseTables.GetAllFieldsInTable when targeting another version.
+"""
+import numpy as np
+
+from joint_index import JointIndex, add_areas_by_point
+
+POINT_TABLE = "Point Object Connectivity"
+POINT_FIELDS = ["UniqueName", "X", "Y", "Z"]
+
+AREA_TABLE = "Area Object Connectivity"
+AREA_FIELDS = ["UniqueName", "NumOfPts", "UniquePt1", "UniquePt2", "UniquePt3", "UniquePt4"]
+
+AREA_SECTION_TABLE = "Area Assignments - Section Properties"
+AREA_SECTION_FIELDS = ["UniqueName", "SectionProperty"]
+
+COLUMN_TABLE = "Column Object Connectivity"
+BEAM_TABLE = "Beam Object Connectivity"
+FRAME_FIELDS = ["UniqueName", "UniquePtI", "UniquePtJ"]
+FRAME_TABLES = {"column": COLUMN_TABLE, "beam": BEAM_TABLE}
+
+FRAME_SECTION_TABLE = "Frame Assignments - Section Properties"
+FRAME_SECTION_FIELDS = ["UniqueName", "SectionProperty"]
+
+
+def add_areas_by_coord(sap_model, x, y, z, prop_name):
+    """
+    Add one area object per row of the coordinate arrays with AreaObj.AddByCoord.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - x, y, z (array): (n, number of points) corner coordinates.
+    - prop_name: Area property name.
+
+    Returns:
+    - names (list): Area name of every row, "" where AddByCoord failed.
+    """
+    add_by_coord = sap_model.AreaObj.AddByCoord
+    names = []
+    for xs, ys, zs in zip(x.tolist(), y.tolist(), z.tolist()):
+        ret = add_by_coord(len(xs), xs, ys, zs, "", prop_name)
+        names.append(ret[3] if ret[-1] == 0 else "")
+    return names
+
+
+class ApiGeometryBackend:
+    """
+    Per-object backend, one API call per area.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - joints (JointIndex, optional): If given, corners are shared and areas are
+        added with AreaObj.AddByPoint.
+    """
+
+    deferred = False
+
+    def __init__(self, sap_model, joints=None):
+        self.sap_model = sap_model
+        self.joints = joints
+        self.api_function = "AddByCoord" if joints is None else "AddByPoint"
+
+    def add_areas(self, x, y, z, prop_name):
+        if self.joints is None:
+            return add_areas_by_coord(self.sap_model, x, y, z, prop_name)
+        num_points = x.shape[1]
+        corners = np.stack((x, y, z), axis=-1).reshape(-1, 3)
+        point_names = self.joints.get_or_add_many(corners)
+        return add_areas_by_point(
+            self.sap_model,
+            [
+                point_names[k : k + num_points]
+                for k in range(0, len(point_names), num_points)
+            ],
+            prop_name,
+        )
+
+    def add_frames(self, start, end, prop_name, user_names, kind="beam"):
+        names = []
+        if self.joints is None:
+            add_by_coord = self.sap_model.FrameObj.AddByCoord
+            for (xi, yi, zi), (xj, yj, zj), user_name in zip(
+                start.tolist(), end.tolist(), user_names
+            ):
+                ret = add_by_coord(xi, yi, zi, xj, yj, zj, "", prop_name, user_name)
+                names.append(ret[0] if ret[-1] == 0 else "")
+        else:
+            add_by_point = self.sap_model.FrameObj.AddByPoint
+            point_i = self.joints.get_or_add_many(start)
+            point_j = self.joints.get_or_add_many(end)
+            for pi, pj, user_name in zip(point_i, point_j, user_names):
+                ret = add_by_point(pi, pj, "", prop_name, user_name)
+                names.append(ret[0] if ret[-1] == 0 else "")
+        return names
+
+    def apply(self):
+        return 0  # objects are already in the model
+
+
+class _TableJointIndex(JointIndex):
+    """
+    JointIndex which only names new joints and queues them for the point table.
+    """
+
+    def __init__(self, backend, tolerance):
+        super().__init__(None, tolerance)
+        self._backend = backend
+
+    def _create(self, x, y, z):
+        return self._backend._queue_point(x, y, z)
+
+
+class TableGeometryBackend:
+    """
+    Bulk backend writing the geometry through the interactive database tables.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - tolerance (float, optional): Joint merge tolerance. Default is 0.001.
+    - name_prefix (str, optional): Prefix of the generated unique names, to keep
+        them apart from existing objects. Default is "T".
+    """
+
+    api_function = "DatabaseTables"
+    deferred = True
+
+    def __init__(self, sap_model, tolerance=0.001, name_prefix="T"):
+        self.sap_model = sap_model
+        self.name_prefix = name_prefix
+        self.joints = _TableJointIndex(self, tolerance)
+        self._points = []  # [name, x, y, z]
+        self._areas = []  # [name, point names, prop]
+        self._frames = {"column": [], "beam": []}  # [name, point i, point j, prop]
+        self._frame_names = set()
+        self._num_points = 0
+        self._num_areas = 0
+        self._loaded = False
+
+    def _read_table(self, table_key, fields):
+        # Columns of the current table as [[values of fields[0]], ...], empty lists if
+        # the table cannot be read
+        ret = self.sap_model.DatabaseTables.GetTableForEditingArray(table_key, "")
+        existing_fields, num_records, data = list(ret[1]), ret[2], list(ret[3])
+        if ret[-1] != 0 or not num_records:
+            return [[] for _ in fields]
+        width = len(existing_fields)
+        return [
+            data[existing_fields.index(f) :: width][:num_records] if f in existing_fields else [""] * num_records
+            for f in fields
+        ]
+
+    def load_existing(self):
+        """
+        Read the joints, areas and frames of the model, so that generated names do not
+        clash with them and new corners reuse the existing joints. Called before the
+        first object is queued.
+        """
+        self._loaded = True
+        point_names, x, y, z = self._read_table(POINT_TABLE, POINT_FIELDS)
+        for name, px, py, pz in zip(point_names, x, y, z):
+            self.joints.register(name, float(px), float(py), float(pz))
+        (area_names,) = self._read_table(AREA_TABLE, AREA_FIELDS[:1])
+        self.reserve_names(point_names, area_names)
+        for table_key in FRAME_TABLES.values():
+            self._frame_names.update(self._read_table(table_key, FRAME_FIELDS[:1])[0])
+
+    def _queue_point(self, x, y, z):
+        self._num_points += 1
+        name = "{}J{}".format(self.name_prefix, self._num_points)
+        self._points.append((name, x, y, z))
+        return name
+
+    def add_areas(self, x, y, z, prop_name):
+        if not self._loaded:
+            self.load_existing()
+        num_points = x.shape[1]
+        corners = np.stack((x, y, z), axis=-1).reshape(-1, 3)
+        point_names = self.joints.get_or_add_many(corners)
+        names = []
+        for k in range(0, len(point_names), num_points):
+            self._num_areas += 1
+            name = "{}A{}".format(self.name_prefix, self._num_areas)
+            self._areas.append((name, point_names[k : k + num_points], prop_name))
+            names.append(name)
+        return names
+
+    def add_frames(self, start, end, prop_name, user_names, kind="beam"):
+        if not self._loaded:
+            self.load_existing()
+        records = self._frames[kind]
+        point_i = self.joints.get_or_add_many(start)
+        point_j = self.joints.get_or_add_many(end)
+        names = []
+        for pi, pj, user_name in zip(point_i, point_j, user_names):
+            if user_name in self._frame_names:
+                names.append("")  # name in use, FrameObj.AddByCoord fails as well
+                continue
+            self._frame_names.add(user_name)
+            records.append((user_name, pi, pj, prop_name))
+            names.append(user_name)
+        return names
+
+    def reserve_names(self, point_names=(), area_names=()):
+        """
+        Make sure generated names do not clash with the given existing names, e.g.
+        those of an earlier run with the same prefix. load_existing does this for the
+        names in the model.
+        """
+        for names, attribute, letter in (
+            (point_names, "_num_points", "J"),
+            (area_names, "_num_areas", "A"),
+        ):
+            prefix = self.name_prefix + letter
+            for name in names:
+                if name.startswith(prefix) and name[len(prefix):].isdigit():
+                    number = int(name[len(prefix):])
+                    if number > getattr(self, attribute):
+                        setattr(self, attribute, number)
+
+    def table_records(self):
+        """
+        Records of the queued joints and areas.
+
+        Returns:
+        - point_records (list): [name, x, y, z] rows of POINT_FIELDS.
+        - area_fields (list): AREA_FIELDS, widened to the largest number of points.
+        - area_records (list): Rows of area_fields.
+        - section_records (list): [name, property] rows of AREA_SECTION_FIELDS.
+        - frame_records (dict): {"column"/"beam": [name, point i, point j] rows of
+            FRAME_FIELDS}.
+        - frame_section_records (list): [name, property] rows of FRAME_SECTION_FIELDS.
+        """
+        points = np.array([p[1:] for p in self._points], dtype=float).reshape(-1, 3)
+        point_records = np.column_stack(
+            (
+                np.array([p[0] for p in self._points], dtype=object),
+                np.char.mod("%.6f", points).astype(object),
+            )
+        ).tolist()
+
+        max_points = max((len(a[1]) for a in self._areas), default=4)
+        area_fields = AREA_FIELDS[:2] + [
+            "UniquePt{}".format(k + 1) for k in range(max_points)
+        ]
+        area_records = [
+            [name, str(len(pts))] + list(pts) + [""] * (max_points - len(pts))
+            for name, pts, _ in self._areas
+        ]
+        section_records = [[name, prop] for name, _, prop in self._areas]
+        frame_records = {
+            kind: [list(frame[:3]) for frame in frames] for kind, frames in self._frames.items()
+        }
+        frame_section_records = [
+            [frame[0], frame[3]] for frames in self._frames.values() for frame in frames
+        ]
+        return (
+            point_records, area_fields, area_records, section_records,
+            frame_records, frame_section_records,
+        )
+
+    def clear(self):
+        """Drop the queued joints, areas and frames, e.g. after they were applied."""
+        self._points = []
+        self._areas = []
+        self._frames = {"column": [], "beam": []}
+
+    def _merge_table(self, table_key, fields, new_records):
+        """
+        Read the current table, append the new records and set it for editing.
+
+        The written fields are those of the current table followed by the fields of
+        the new records it does not have (e.g. UniquePt5 for the first area with 5
+        corners), so existing rows keep all their columns. Rows are padded with "".
+        """
+        tables = self.sap_model.DatabaseTables
+        ret = tables.GetTableForEditingArray(table_key, "")
+        existing_fields, num_records, data = list(ret[1]), ret[2], list(ret[3])
+        if ret[-1] != 0 or not num_records:
+            existing_fields, num_records = [], 0
+        written_fields = existing_fields + [f for f in fields if f not in existing_fields]
+        width = len(existing_fields)
+        padding = [""] * (len(written_fields) - width)
+        records = [data[r * width : (r + 1) * width] + padding for r in range(num_records)]
+        columns = [fields.index(f) if f in fields else -1 for f in written_fields]
+        for record in new_records:
+            records.append([record[c] if 0 <= c < len(record) else "" for c in columns])
+        flat = [value for record in records for value in record]
+        ret = tables.SetTableForEditingArray(
+            table_key, 0, written_fields, len(records), flat
+        )
+        if ret[-1] != 0:
+            print(f"Error setting table {table_key}. Return code: {ret[-1]}")
+        return ret[-1]
+
+    def apply(self):
+        """
+        Push the queued tables and apply them in one ApplyEditedTables call.
+
+        Returns:
+        - ret: 0 on success, nonzero if setting a table or applying failed.
+        """
+        num_frames = sum(len(frames) for frames in self._frames.values())
+        if not self._areas and not self._points and not num_frames:
+            return 0
+
+        (
+            point_records, area_fields, area_records, section_records,
+            frame_records, frame_section_records,
+        ) = self.table_records()
+
+        ret = 0
+        ret |= self._merge_table(POINT_TABLE, POINT_FIELDS, point_records)
+        if area_records:
+            ret |= self._merge_table(AREA_TABLE, area_fields, area_records)
+            ret |= self._merge_table(AREA_SECTION_TABLE, AREA_SECTION_FIELDS, section_records)
+        for kind, records in frame_records.items():
+            if records:
+                ret |= self._merge_table(FRAME_TABLES[kind], FRAME_FIELDS, records)
+        if frame_section_records:
+            ret |= self._merge_table(FRAME_SECTION_TABLE, FRAME_SECTION_FIELDS, frame_section_records)
+        if ret != 0:
+            self.sap_model.DatabaseTables.CancelTableEditing()
+            return ret
+
+        result = self.sap_model.DatabaseTables.ApplyEditedTables(True)
+        num_fatal, num_errors = result[0], result[1]
+        if result[-1] != 0 or num_fatal:
+            print(
+                f"Error running function ApplyEditedTables: {num_fatal} fatal errors, "
+                f"{num_errors} errors\n{result[4]}"
+            )
+            return result[-1] or 1
+        print(
+            f"Function ApplyEditedTables was successful for {len(self._points)} joints, "
+            f"{len(self._areas)} areas and {num_frames} frames"
+        )
+        self.clear()
+        return 0
+
+
+def make_geometry_backend(sap_model, kind="api", joints=None):
+    """
+    Returns the geometry backend for a job.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - kind (str): "api" for per-object API calls or "tables" for the bulk
+        database table import.
+    - joints (JointIndex, optional): Shared joints for the "api" backend.
+    """
+    if kind == "api":
+        return ApiGeometryBackend(sap_model, joints)
+    if kind == "tables":
+        return TableGeometryBackend(sap_model)
+    raise ValueError(f"Unknown geometry backend {kind!r}")
@@ -0,0 +1,192 @@
+"""
+Streaming extraction of analysis results into NumPy column blocks.
+
+Like get_story_data, the functions here call the Results API and convert the COM
+tuples, but instead of building nested lists they yield ResultChunk blocks of NumPy
+columns one at a time, so only the results of one case and group are in memory at
+once. Callers reduce the chunks as they arrive (see envelope and max_abs_by).
+
+A chunk is one API call: one load case or combination for one group of objects.
+The Results API returns a whole call at once, so the groups are what bounds the
+memory: with the default group "All" every object of the model is in one chunk,
+pass smaller groups (e.g. one per storey, see AssignmentEngine in group_assign.py)
+for large models.
+
+Tables:
+- "joint_displacements": Results.JointDispl
+- "frame_forces": Results.FrameForce
+- "area_stresses": Results.AreaStressShell
+- "story_drifts": Results.StoryDrifts (not per group)
+
+Example:
+>>> chunks = iter_results(sap_model, "story_drifts", combos=["ULS1", "ULS2"])
+>>> stories, low, high = envelope(chunks, "Drift", by="Story")
+>>> chunks = iter_results(sap_model, "joint_displacements", groups=story_groups)
+>>> max_abs_by(chunks, "U1", by="group")
+{'Story1': 0.0041, 'Story2': 0.0083, ...}
+"""
+from collections import namedtuple
+
+import numpy as np
+
+ResultChunk = namedtuple("ResultChunk", ["table", "case", "group", "columns"])
+
+# Table: (Results function, takes a group name, output fields, text fields)
+RESULT_TABLES = {
+    "joint_displacements": (
+        "JointDispl",
+        True,
+        ["Obj", "Elm", "LoadCase", "StepType", "StepNum", "U1", "U2", "U3", "R1", "R2", "R3"],
+        {"Obj", "Elm", "LoadCase", "StepType"},
+    ),
+    "frame_forces": (
+        "FrameForce",
+        True,
+        [
+            "Obj", "ObjSta", "Elm", "ElmSta", "LoadCase", "StepType", "StepNum",
+            "P", "V2", "V3", "T", "M2", "M3",
+        ],
+        {"Obj", "Elm", "LoadCase", "StepType"},
+    ),
+    "area_stresses": (
+        "AreaStressShell",
+        True,
+        [
+            "Obj", "Elm", "PointElm", "LoadCase", "StepType", "StepNum",
+            "S11Top", "S22Top", "S12Top", "SMaxTop", "SMinTop", "SAngleTop", "SVMTop",
+            "S11Bot", "S22Bot", "S12Bot", "SMaxBot", "SMinBot", "SAngleBot", "SVMBot",
+            "S13Avg", "S23Avg", "SMaxAvg", "SAngleAvg",
+        ],
+        {"Obj", "Elm", "PointElm", "LoadCase", "StepType"},
+    ),
+    "story_drifts": (
+        "StoryDrifts",
+        False,
+        ["Story", "LoadCase", "StepType", "StepNum", "Direction", "Drift", "Label", "X", "Y", "Z"],
+        {"Story", "LoadCase", "StepType", "Direction", "Label"},
+    ),
+}
+
+ITEM_TYPE_GROUP = 2  # eItemTypeElm.GroupElm
+
+
+def _select_for_output(sap_model, case, is_combo):
+    setup = sap_model.Results.Setup
+    setup.DeselectAllCasesAndCombosForOutput()
+    if is_combo:
+        return setup.SetComboSelectedForOutput(case)
+    return setup.SetCaseSelectedForOutput(case)
+
+
+def _to_columns(fields, text_fields, result):
+    columns = {}
+    for k, field in enumerate(fields):
+        values = result[1 + k]
+        if field in text_fields:
+            columns[field] = np.asarray(values, dtype=str)
+        else:
+            columns[field] = np.asarray(values, dtype=float)
+    return columns
+
+
+def iter_results(sap_model, table, cases=(), combos=(), groups=("All",)):
+    """
+    Yield the results of a table in chunks of NumPy columns.
+
+    Parameters:
+    - sap_model: ETABS model object (analysis must have been run).
+    - table (str): One of RESULT_TABLES.
+    - cases, combos (list, optional): Load cases and load combinations to extract,
+        one at a time. If both are empty the combinations in the model are used.
+    - groups (list, optional): Groups to extract, one at a time, each one chunk.
+        Default is "All".
+
+    Returns:
+    - Generator of ResultChunk(table, case, group, columns), columns being a dict
+        {field: array}.
+    """
+    function_name, per_group, fields, text_fields = RESULT_TABLES[table]
+    function = getattr(sap_model.Results, function_name)
+    if not cases and not combos:
+        combo_list = sap_model.RespCombo.GetNameList()
+        combos = combo_list[1][: combo_list[0]]
+    if not per_group:
+        groups = (None,)
+
+    for case, is_combo in [(c, False) for c in cases] + [(c, True) for c in combos]:
+        ret = _select_for_output(sap_model, case, is_combo)
+        if ret != 0:
+            print(f"Error selecting {case} for output. Return code: {ret}")
+            continue
+        for group in groups:
+            if per_group:
+                result = function(group, ITEM_TYPE_GROUP)
+            else:
+                result = function()
+            if result[-1] != 0:
+                print(f"Error running function {function_name} for {case}, group {group}")
+                continue
+            if result[0] == 0:
+                continue
+            columns = _to_columns(fields, text_fields, result)
+            del result  # release the COM arrays before the chunk is processed
+            yield ResultChunk(table, case, group, columns)
+
+
+def _chunk_keys(chunk, by):
+    if by == "group":
+        # Tables which are not extracted per group (story_drifts) cover all objects
+        group = "All" if chunk.group is None else chunk.group
+        return np.full(len(next(iter(chunk.columns.values()))), group, dtype=object)
+    if by == "case":
+        return np.full(len(next(iter(chunk.columns.values()))), chunk.case, dtype=object)
+    return chunk.columns[by]
+
+
+def envelope(chunks, field, by):
+    """
+    Minimum and maximum of a result field per key, reduced chunk by chunk.
+
+    Parameters:
+    - chunks: Generator returned by iter_results.
+    - field (str): Numeric field, e.g. "U1", "M3" or "Drift".
+    - by (str): Key field, e.g. "Obj", "Story", or "group" / "case" for the group
+        or load case of the chunk ("All" for tables not extracted per group).
+
+    Returns:
+    - keys (array), minimum (array), maximum (array)
+    """
+    minimum = {}
+    maximum = {}
+    for chunk in chunks:
+        keys, inverse = np.unique(_chunk_keys(chunk, by), return_inverse=True)
+        values = chunk.columns[field]
+        chunk_min = np.full(len(keys), np.inf)
+        chunk_max = np.full(len(keys), -np.inf)
+        np.minimum.at(chunk_min, inverse, values)
+        np.maximum.at(chunk_max, inverse, values)
+        for key, low, high in zip(keys.tolist(), chunk_min.tolist(), chunk_max.tolist()):
+            if key in minimum:
+                minimum[key] = min(minimum[key], low)
+                maximum[key] = max(maximum[key], high)
+            else:
+                minimum[key] = low
+                maximum[key] = high
+    keys = list(minimum)
+    return (
+        np.asarray(keys),
+        np.array([minimum[k] for k in keys]),
+        np.array([maximum[k] for k in keys]),
+    )
+
+
+def max_abs_by(chunks, field, by):
+    """
+    Maximum absolute value of a result field per key, e.g. the largest drift or
+    displacement per storey.
+
+    Returns:
+    - maxima (dict): {key: max abs value}
+    """
+    keys, low, high = envelope(chunks, field, by)
+    return dict(zip(keys.tolist(), np.maximum(np.abs(low), np.abs(high)).tolist()))
@@ -1,3 +1,6 @@
+from story_table import StoryTable
+
+
 def get_story_data(sap_model):
     """
     returns:
@@ -7,11 +10,6 @@ def get_story_data(sap_model):
     """
     # Get the data using API
     story_in = sap_model.Story.GetStories()
-    # print(f"{dir(sap_model) = }")
-    # print(f"{dir(sap_model.Story) = }")
-    # print(f"{type(sap_model.Story) = }")
-    print(f"{sap_model.Story.__doc__ = }")
-    # print(f"{story_in[0] = }")
     # Separate the data to lists
     nos_stories = story_in[0]
     story_nms = story_in[1]
@@ -38,3 +36,13 @@ def get_story_data(sap_model):
             ]
         )
     return story_data
+
+
+def get_story_table(sap_model):
+    """
+    returns:
+    story_table (StoryTable). The storey names, elevations and heights as NumPy
+    arrays, bottom up with the base first, with bisect-based elevation lookups
+    (see story_table.py). Reads the stories with one Story.GetStories call.
+    """
+    return StoryTable.from_model(sap_model)
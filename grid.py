@@ -0,0 +1,237 @@
+"""
+Grid of the model backed by NumPy coordinate arrays.
+
+A Grid holds the sorted X and Y grid line coordinates and the storey elevations.
+It replaces the nested list of (x, y) tuples previously returned by
+create_grid_system:
+- grid[i][j] still returns the (x, y) tuple of intersection i, j, so draw_slab and
+  other consumers of the nested list work unchanged,
+- coordinates are rounded to 'decimals' places, so 8.1 * 3 is stored as 24.3,
+- grid lines may be spaced non-uniformly,
+- intersections and bays are enumerated as arrays in one vectorised pass,
+- coordinate-to-index lookups are O(log n) binary searches with a tolerance.
+
+Example:
+>>> grid = Grid([0, 8.1, 16.2, 24.3], [0, 4.365, 8.73], [0, 3.88, 7.76])
+>>> grid[3][1]
+(24.3, 4.365)
+>>> grid.index_x(24.2999999)
+3
+>>> i, j, corners = grid.bays()
+>>> corners.shape
+(6, 4, 2)
+"""
+import string
+
+import numpy as np
+
+
+def grid_line_labels(num_of_lines, alphabetic):
+    """
+    Default ETABS grid line labels: A, B, ..., Z, AA, AB, ... along X and
+    1, 2, 3, ... along Y.
+    """
+    if not alphabetic:
+        return [str(i + 1) for i in range(num_of_lines)]
+    labels = []
+    for i in range(num_of_lines):
+        label = ""
+        n = i + 1
+        while n > 0:
+            n, rem = divmod(n - 1, 26)
+            label = string.ascii_uppercase[rem] + label
+        labels.append(label)
+    return labels
+
+
+class _GridLine:
+    """
+    Intersections along one X grid line, i.e. grid[i]. Indexing with j returns the
+    (x, y) tuple of intersection i, j as the nested list did.
+    """
+
+    __slots__ = ("_grid", "_i")
+
+    def __init__(self, grid, i):
+        self._grid = grid
+        self._i = i
+
+    def __getitem__(self, j):
+        return (float(self._grid.x[self._i]), float(self._grid.y[j]))
+
+    def __len__(self):
+        return len(self._grid.y)
+
+    def __iter__(self):
+        x = float(self._grid.x[self._i])
+        return ((x, float(y)) for y in self._grid.y)
+
+
+class Grid:
+    """
+    Grid lines and storey elevations of a model.
+
+    Parameters:
+    - x_coordinates (list or array): Coordinates of the X grid lines.
+    - y_coordinates (list or array): Coordinates of the Y grid lines.
+    - story_elevations (list or array, optional): Elevations of the storey levels,
+        base included.
+    - decimals (int, optional): Coordinates are rounded to this many decimals to
+        remove floating point drift. Default is 6.
+    """
+
+    def __init__(self, x_coordinates, y_coordinates, story_elevations=(), decimals=6):
+        self.decimals = decimals
+        self.x = np.sort(np.round(np.asarray(x_coordinates, dtype=float), decimals))
+        self.y = np.sort(np.round(np.asarray(y_coordinates, dtype=float), decimals))
+        self.z = np.sort(np.round(np.asarray(story_elevations, dtype=float), decimals))
+
+    @classmethod
+    def from_spacings(cls, x_spacings, y_spacings, story_heights=(), origin=(0.0, 0.0, 0.0)):
+        """
+        Build a grid from the bay widths and storey heights instead of coordinates.
+
+        Parameters:
+        - x_spacings, y_spacings (list): Bay widths along X and Y.
+        - story_heights (list, optional): Storey heights from the base up.
+        - origin (tuple, optional): X, Y of the first grid lines and base elevation.
+        """
+        x0, y0, z0 = origin
+        x = x0 + np.concatenate(([0.0], np.cumsum(x_spacings, dtype=float)))
+        y = y0 + np.concatenate(([0.0], np.cumsum(y_spacings, dtype=float)))
+        z = z0 + np.concatenate(([0.0], np.cumsum(story_heights, dtype=float)))
+        return cls(x, y, z if len(story_heights) else ())
+
+    def __getitem__(self, i):
+        if isinstance(i, tuple):
+            i, j = i
+            return (float(self.x[i]), float(self.y[j]))
+        if i < -len(self.x) or i >= len(self.x):
+            raise IndexError("grid line index out of range")
+        return _GridLine(self, i)
+
+    def __len__(self):
+        return len(self.x)
+
+    def __iter__(self):
+        return (_GridLine(self, i) for i in range(len(self.x)))
+
+    def __repr__(self):
+        return "Grid({} x {} lines, {} levels)".format(
+            len(self.x), len(self.y), len(self.z)
+        )
+
+    @property
+    def shape(self):
+        """Number of X and Y grid lines."""
+        return len(self.x), len(self.y)
+
+    @property
+    def x_spacings(self):
+        return np.diff(self.x)
+
+    @property
+    def y_spacings(self):
+        return np.diff(self.y)
+
+    @property
+    def story_heights(self):
+        return np.diff(self.z)
+
+    def to_list(self):
+        """
+        Returns the nested list of (x, y) tuples create_grid_system used to return.
+        """
+        return [[(x, y) for y in self.y.tolist()] for x in self.x.tolist()]
+
+    def intersections(self):
+        """
+        Returns:
+        - points (array): (nx * ny, 2) array of the x, y of every intersection,
+            ordered like grid[i][j] with j running fastest.
+        """
+        xx, yy = np.meshgrid(self.x, self.y, indexing="ij")
+        return np.column_stack((xx.ravel(), yy.ravel()))
+
+    def bays(self, start_x=0, end_x=None, start_y=0, end_y=None, offset=0.0):
+        """
+        Enumerate the bays between grid line indices [start_x, end_x] and
+        [start_y, end_y].
+
+        Parameters:
+        - start_x, end_x, start_y, end_y (int, optional): Grid line index ranges.
+            By default all bays are returned.
+        - offset (float, optional): Outward offset applied to every bay edge, as in
+            draw_slab.
+
+        Returns:
+        - i, j (array): Index of the lower-left grid line of every bay.
+        - corners (array): (n, 4, 2) corner coordinates, counterclockwise from the
+            lower-left corner (the order draw_slab uses).
+        """
+        if end_x is None:
+            end_x = len(self.x) - 1
+        if end_y is None:
+            end_y = len(self.y) - 1
+        i, j = np.meshgrid(
+            np.arange(start_x, end_x), np.arange(start_y, end_y), indexing="ij"
+        )
+        i = i.ravel()
+        j = j.ravel()
+        x1 = self.x[i] - offset
+        x2 = self.x[i + 1] + offset
+        y1 = self.y[j] - offset
+        y2 = self.y[j + 1] + offset
+        corners = np.empty((len(i), 4, 2))
+        corners[:, 0, 0] = x1
+        corners[:, 0, 1] = y1
+        corners[:, 1, 0] = x2
+        corners[:, 1, 1] = y1
+        corners[:, 2, 0] = x2
+        corners[:, 2, 1] = y2
+        corners[:, 3, 0] = x1
+        corners[:, 3, 1] = y2
+        return i, j, corners
+
+    @staticmethod
+    def _index(lines, values, tol):
+        values = np.asarray(values, dtype=float)
+        if len(lines) == 0:
+            index = np.full(values.shape, -1)
+            return int(index) if index.ndim == 0 else index
+        right = np.clip(np.searchsorted(lines, values), 0, len(lines) - 1)
+        left = np.clip(right - 1, 0, len(lines) - 1)
+        nearest = np.where(
+            np.abs(lines[left] - values) <= np.abs(lines[right] - values), left, right
+        )
+        index = np.where(np.abs(lines[nearest] - values) <= tol, nearest, -1)
+        if index.ndim == 0:
+            return int(index)
+        return index
+
+    def index_x(self, x, tol=1e-6):
+        """
+        Index of the X grid line at coordinate x (scalar or array), -1 where there is
+        no grid line within tol.
+        """
+        return self._index(self.x, x, tol)
+
+    def index_y(self, y, tol=1e-6):
+        """
+        Index of the Y grid line at coordinate y (scalar or array), -1 where there is
+        no grid line within tol.
+        """
+        return self._index(self.y, y, tol)
+
+    def index_z(self, z, tol=1e-6):
+        """
+        Index of the storey level at elevation z (scalar or array), -1 where there is
+        no level within tol.
+        """
+        return self._index(self.z, z, tol)
+
+    def index_of(self, x, y, tol=1e-6):
+        """
+        Returns the (i, j) indices of the intersection at x, y, -1 where there is none.
+        """
+        return self.index_x(x, tol), self.index_y(y, tol)
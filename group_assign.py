@@ -0,0 +1,275 @@
+"""
+Group-based bulk assignment of properties, loads and diaphragms.
+
+Assigning a property, a uniform load or a diaphragm to every slab drawn by
+draw_slabs is one API call per slab. AssignmentEngine instead tracks the generated
+object names by type, storey and bay and puts them in named groups:
+- "<TYPE>" for all objects of a type, e.g. "SLAB",
+- "<TYPE>_<story>" per storey, e.g. "SLAB_Story1",
+- "<TYPE>_B<start_x>-<end_x>_<start_y>-<end_y>" per bay range over all storeys
+  (slabs), or "<TYPE>_<direction><line>" per grid line (beams) and
+  "<TYPE>_<i>-<j>" per grid intersection (columns).
+Only the groups which are the target of an assignment are written to the model,
+each with one GroupDef.SetGroup, and all their members with one "Group Assignments"
+table edit. Every assignment is then one call on the group (ItemType 1), whatever
+the number of objects in it.
+
+Assignments are queued and sent by flush(). Repeated assignments of the same kind
+to the same target are coalesced, only the last one is sent: setting the slab
+property of "SLAB" twice costs one call. A load with replace=True also drops the
+queued loads of the same load pattern on that target. Assignments keep the order
+in which they were last made, so a later assignment to an overlapping group still
+wins.
+
+Example:
+>>> slab_names = draw_slabs(sap_model, grid_points, [(0, 7, 0, 3)], "MyRC125mmSlab")
+>>> with AssignmentEngine(sap_model) as engine:
+...     engine.track_slabs(slab_names)
+...     engine.set_area_property("SLAB", "MyRC150mmSlab")
+...     engine.set_area_load("SLAB", "Live", 0.003)
+...     engine.set_area_load("SLAB_Story3", "Live", 0.0015)  # roof
+...     engine.set_area_diaphragm("SLAB", "D1")
+"""
+import itertools
+
+GROUP_TABLE = "Group Assignments"
+GROUP_FIELDS = ["GroupName", "ObjectType", "UniqueName"]
+OBJECT_TYPES = {"point": "Joint", "frame": "Frame", "area": "Area"}
+
+# eItemType
+ITEM_OBJECT = 0
+ITEM_GROUP = 1
+
+# Direction of gravity loads (eDir, 10 = gravity direction)
+GRAVITY = 10
+
+
+class AssignmentEngine:
+    """
+    Groups generated objects and sends assignments once per group.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - prefix (str, optional): Prefix of the group names, e.g. "B1_" to keep the
+        groups of several buildings apart. Default is "".
+
+    Attributes:
+    - groups (dict): {group name: {"area"/"frame"/"point": [object names]}}.
+    - coalesced (int): Number of queued assignments replaced by a later one.
+    """
+
+    def __init__(self, sap_model, prefix=""):
+        self.sap_model = sap_model
+        self.prefix = prefix
+        self.groups = {}
+        self.coalesced = 0
+        self._new_members = {}  # group -> kind -> names not yet in the model
+        self._pending = {}  # coalescing key -> (path, args)
+        self._sequence = itertools.count()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    # Tracking
+
+    def track(self, names, kind="area", type_name="SLAB", story=None, key=None):
+        """
+        Add objects to the type group, and to the storey group and the group of key
+        if given.
+
+        Parameters:
+        - names (iterable): Object names, "" entries (failed adds) are skipped.
+        - kind (str): "area", "frame" or "point".
+        - type_name (str): Type group, e.g. "SLAB", "COLUMN".
+        - story (str, optional): Storey name.
+        - key (str, optional): Further group suffix, e.g. a bay range "B0-7_0-3".
+
+        Returns:
+        - group names (list) the objects were added to.
+        """
+        if kind not in OBJECT_TYPES:
+            raise ValueError(f"Unknown object kind {kind}")
+        names = [name for name in names if name]
+        group_names = [self.prefix + type_name]
+        if story is not None:
+            group_names.append("{}{}_{}".format(self.prefix, type_name, story))
+        if key is not None:
+            group_names.append("{}{}_{}".format(self.prefix, type_name, key))
+        for group in group_names:
+            members = self.groups.setdefault(group, {}).setdefault(kind, [])
+            new = self._new_members.setdefault(group, {}).setdefault(kind, [])
+            members.extend(names)
+            new.extend(names)
+        return group_names
+
+    def track_slabs(self, slab_names, type_name="SLAB"):
+        """
+        Track the result of draw_slabs: {(story, (start_x, end_x, start_y, end_y)): name}.
+        """
+        for (story, bays), name in slab_names.items():
+            self.track([name], "area", type_name, story, "B{}-{}_{}-{}".format(*bays))
+
+    def track_frames(self, frames, column_type="COLUMN", beam_type="BEAM"):
+        """
+        Track the result of draw_frames: columns by storey and grid intersection,
+        beams by storey and grid line.
+        """
+        for (story, i, j), name in frames.get("columns", {}).items():
+            self.track([name], "frame", column_type, story, "{}-{}".format(i, j))
+        for (story, direction, line, _), name in frames.get("beams", {}).items():
+            self.track([name], "frame", beam_type, story, "{}{}".format(direction, line))
+
+    def define_groups(self, groups=None):
+        """
+        Create the groups with new members and add the members with one table edit.
+        Called by flush() for the groups its assignments use.
+
+        Parameters:
+        - groups (iterable, optional): Groups to define. Default is all tracked groups.
+
+        Returns:
+        - ret: 0 on success.
+        """
+        groups = self._new_members if groups is None else groups
+        new_members = {
+            group: self._new_members[group]
+            for group in groups
+            if any(self._new_members.get(group, {}).values())
+        }
+        if not new_members:
+            return 0
+        sap_model = self.sap_model
+        existing = sap_model.GroupDef.GetNameList()
+        existing = set(existing[1]) if existing[-1] == 0 else set()
+        for group in new_members:
+            if group not in existing:
+                ret = sap_model.GroupDef.SetGroup(group)
+                if ret != 0:
+                    print(f"Error defining group {group}. Return code: {ret}")
+                    return ret
+
+        tables = sap_model.DatabaseTables
+        ret = tables.GetTableForEditingArray(GROUP_TABLE, "")
+        fields, num_records, data = list(ret[1]), ret[2], list(ret[3])
+        records = []
+        if ret[-1] == 0 and num_records:
+            width = len(fields)
+            columns = [fields.index(f) for f in GROUP_FIELDS]
+            for r in range(num_records):
+                row = data[r * width : (r + 1) * width]
+                records.append([row[c] for c in columns])
+        known = {tuple(record) for record in records}
+        for group, kinds in new_members.items():
+            for kind, names in kinds.items():
+                for name in names:
+                    record = (group, OBJECT_TYPES[kind], name)
+                    if record not in known:
+                        known.add(record)
+                        records.append(list(record))
+        flat = [value for record in records for value in record]
+        ret = tables.SetTableForEditingArray(GROUP_TABLE, 0, GROUP_FIELDS, len(records), flat)
+        if ret[-1] != 0:
+            print(f"Error setting table {GROUP_TABLE}. Return code: {ret[-1]}")
+            tables.CancelTableEditing()
+            return ret[-1]
+        result = tables.ApplyEditedTables(True)
+        if result[-1] != 0 or result[0]:
+            print(f"Error running function ApplyEditedTables: {result[0]} fatal errors\n{result[4]}")
+            return result[-1] or 1
+        print(f"Function ApplyEditedTables was successful for {len(new_members)} groups")
+        for group in new_members:
+            del self._new_members[group]
+        return 0
+
+    # Assignments
+
+    def _item_type(self, target):
+        return ITEM_GROUP if target in self.groups else ITEM_OBJECT
+
+    def _queue(self, key, path, args, drop=None):
+        if key in self._pending:
+            del self._pending[key]  # re-queued at the end, it is the latest assignment
+            self.coalesced += 1
+        if drop is not None:
+            for other in [k for k in self._pending if drop(k)]:
+                del self._pending[other]
+                self.coalesced += 1
+        self._pending[key] = (path, args)
+
+    def set_area_property(self, target, prop_name):
+        """Assign an area property to a group or an area object."""
+        self._queue(
+            ("area_property", target),
+            "AreaObj.SetProperty",
+            (target, prop_name, self._item_type(target)),
+        )
+
+    def set_area_diaphragm(self, target, diaphragm_name):
+        """Assign a diaphragm to a group or an area object."""
+        self._queue(
+            ("area_diaphragm", target),
+            "AreaObj.SetDiaphragm",
+            (target, diaphragm_name, self._item_type(target)),
+        )
+
+    def set_area_load(self, target, load_pattern, value, direction=GRAVITY, replace=True, csys="Global"):
+        """
+        Assign a uniform load to a group or an area object. With replace=True it
+        replaces the loads of the pattern, else it is added to them.
+        """
+        args = (target, load_pattern, value, direction, replace, csys, self._item_type(target))
+        if replace:
+            self._queue(
+                ("area_load", target, load_pattern),
+                "AreaObj.SetLoadUniform",
+                args,
+                drop=lambda k: k[:3] == ("area_load_add", target, load_pattern),
+            )
+        else:
+            key = ("area_load_add", target, load_pattern, next(self._sequence))
+            self._queue(key, "AreaObj.SetLoadUniform", args)
+
+    def set_frame_section(self, target, prop_name):
+        """Assign a frame section to a group or a frame object."""
+        self._queue(
+            ("frame_section", target),
+            "FrameObj.SetSection",
+            (target, prop_name, self._item_type(target)),
+        )
+
+    @property
+    def pending(self):
+        """Queued API calls as (path, args), in the order they will be sent."""
+        return list(self._pending.values())
+
+    def flush(self):
+        """
+        Define the groups and send the queued assignments.
+
+        Returns:
+        - failed (list): (path, args, return code) of the calls which failed.
+        """
+        ret = self.define_groups(
+            list(dict.fromkeys(args[0] for _, args in self._pending.values() if args[-1] == ITEM_GROUP))
+        )
+        if ret != 0:
+            raise RuntimeError(f"Groups could not be defined. Return code: {ret}")
+        failed = []
+        for path, args in self._pending.values():
+            function = self.sap_model
+            for name in path.split("."):
+                function = getattr(function, name)
+            ret = function(*args)
+            if ret != 0:
+                failed.append((path, args, ret))
+        sent = len(self._pending)
+        self._pending = {}
+        print(f"{sent} assignments sent, {self.coalesced} coalesced, {len(failed)} failed")
+        self.coalesced = 0
+        for path, args, ret in failed:
+            print(f"Error running function {path} on {args[0]}. Return code: {ret}")
+        return failed
@@ -0,0 +1,153 @@
+"""
+Shared joint index: create every model joint once and reuse it.
+
+AreaObj.AddByCoord creates new corner points for every slab, so neighbouring slabs
+(and later beams and columns) get duplicate joints which ETABS has to merge, or
+which stay unconnected. JointIndex keeps a spatial hash of the joints created so
+far, keyed on the coordinates snapped to the tolerance. Each unique location is
+created once with PointObj.AddCartesian and slabs are then built from point names
+with AreaObj.AddByPoint.
+
+Example:
+>>> joints = JointIndex(sap_model)
+>>> names = joints.get_or_add_many(np.array([[0, 0, 3.88], [8.1, 0, 3.88], [0, 0, 3.88]]))
+>>> names
+['1', '2', '1']
+"""
+import itertools
+
+import numpy as np
+
+# Offsets of the 26 neighbouring cells checked when a point is close to a cell border
+_NEIGHBOURS = [
+    offset for offset in itertools.product((-1, 0, 1), repeat=3) if offset != (0, 0, 0)
+]
+
+
+class JointIndex:
+    """
+    Tolerance-aware spatial hash of the joints of a model.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - tolerance (float, optional): Points closer than this are the same joint.
+        Default is 0.001 (1 mm in m units).
+    - load_existing (bool, optional): If True the joints already in the model are
+        read with PointObj.GetAllPoints and reused too. Default is False.
+
+    Attributes:
+    - created (int): Number of joints created through the index.
+    - reused (int): Number of requests answered with an existing joint.
+    """
+
+    def __init__(self, sap_model, tolerance=0.001, load_existing=False):
+        self.sap_model = sap_model
+        self.tolerance = tolerance
+        self._cells = {}
+        self.created = 0
+        self.reused = 0
+        if load_existing:
+            self.load_existing()
+
+    def __len__(self):
+        return len(self._cells)
+
+    def _key(self, x, y, z):
+        tol = self.tolerance
+        return (round(x / tol), round(y / tol), round(z / tol))
+
+    def _find(self, key, x, y, z):
+        entry = self._cells.get(key)
+        if entry is not None:
+            return entry[0]
+        # A point within tolerance may have been snapped to a neighbouring cell
+        for dx, dy, dz in _NEIGHBOURS:
+            entry = self._cells.get((key[0] + dx, key[1] + dy, key[2] + dz))
+            if entry is not None:
+                px, py, pz = entry[1]
+                if max(abs(px - x), abs(py - y), abs(pz - z)) <= self.tolerance:
+                    return entry[0]
+        return None
+
+    def register(self, name, x, y, z):
+        """
+        Add an existing joint of the model to the index.
+        """
+        self._cells[self._key(x, y, z)] = (name, (x, y, z))
+
+    def load_existing(self):
+        """
+        Read all joints of the model into the index with one PointObj.GetAllPoints call.
+        """
+        ret = self.sap_model.PointObj.GetAllPoints()
+        if ret[-1] != 0:
+            print(f"Error running function GetAllPoints. Return code: {ret[-1]}")
+            return
+        for name, x, y, z in zip(ret[1], ret[2], ret[3], ret[4]):
+            self.register(name, x, y, z)
+
+    def _create(self, x, y, z):
+        ret = self.sap_model.PointObj.AddCartesian(x, y, z, "")
+        if ret[-1] != 0:
+            print(f"Error running function AddCartesian at ({x}, {y}, {z})")
+            return ""
+        return ret[0]
+
+    def get_or_add(self, x, y, z):
+        """
+        Returns the name of the joint at x, y, z, creating it if there is none.
+        """
+        key = self._key(x, y, z)
+        name = self._find(key, x, y, z)
+        if name is not None:
+            self.reused += 1
+            return name
+        name = self._create(x, y, z)
+        if not name:
+            return ""
+        self._cells[key] = (name, (x, y, z))
+        self.created += 1
+        return name
+
+    def get_or_add_many(self, points):
+        """
+        Vectorised get_or_add.
+
+        Parameters:
+        - points (array): (n, 3) x, y, z coordinates.
+
+        Returns:
+        - names (list): Joint name of every row. Coincident rows share one joint
+            and each unique location is looked up or created only once.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        snapped = np.round(points / self.tolerance).astype(np.int64)
+        _, first, inverse = np.unique(
+            snapped, axis=0, return_index=True, return_inverse=True
+        )
+        unique_names = [
+            self.get_or_add(*points[row].tolist()) for row in first.tolist()
+        ]
+        # Rows after the first one at a location are reuses as well
+        self.reused += len(points) - len(first)
+        return [unique_names[k] for k in inverse.ravel().tolist()]
+
+
+def add_areas_by_point(sap_model, point_names, prop_name):
+    """
+    Add one area object per row of joint names with AreaObj.AddByPoint.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - point_names (list): Lists of corner joint names, one per area.
+    - prop_name: Area property name.
+
+    Returns:
+    - names (list): Area name of every row, "" where AddByPoint failed.
+    """
+    add_by_point = sap_model.AreaObj.AddByPoint
+    names = []
+    for points in point_names:
+        ret = add_by_point(len(points), list(points), "", prop_name)
+        names.append(ret[1] if ret[-1] == 0 else "")
+    return names
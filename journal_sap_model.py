@@ -0,0 +1,273 @@
+"""
+Record-and-replay journal of SapModel API calls.
+
+JournalingSapModel wraps the SapModel and appends every call made through it
+(method path, arguments, returned value and elapsed time) to a compact binary log.
+The log can later be replayed against a FakeSapModel or another ETABS instance, to
+reproduce a slow build offline, or summarised to compare call counts between two
+versions of the scripts.
+
+File format:
+- Header: the 8 bytes b"SAPJRNL" + format version.
+- Records: 1 byte record kind, 4 bytes little endian payload length, marshal payload.
+    kind 1 (method path): (path_id, path)
+    kind 2 (call): (path_id, args, kwargs, result, elapsed)
+  Method paths are written once and referred to by id afterwards. A truncated last
+  record (e.g. after a crash) is ignored when reading.
+
+Usage:
+    etabs_object, sap_model = connect_to_etabs(journal="build.sapjrnl")
+    ...
+    python journal_sap_model.py summary build.sapjrnl
+    python journal_sap_model.py compare old.sapjrnl new.sapjrnl
+    python journal_sap_model.py replay build.sapjrnl --latency 0.0005
+"""
+import argparse
+import marshal
+import struct
+import time
+from collections import Counter, namedtuple
+
+from sap_model_proxy import SapModelProxy
+
+JOURNAL_MAGIC = b"SAPJRNL\x01"
+_RECORD_HEADER = struct.Struct("<BI")
+_KIND_PATH = 1
+_KIND_CALL = 2
+
+JournalEntry = namedtuple(
+    "JournalEntry", ["seq", "path", "args", "kwargs", "result", "elapsed"]
+)
+
+
+def _plain(value):
+    # marshal only handles built-in types, anything else is journaled as its repr
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return type(value)(_plain(v) for v in value)
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    return repr(value)
+
+
+class JournalingSapModel(SapModelProxy):
+    """
+    SapModel wrapper appending every API call to a binary journal.
+
+    Parameters:
+    - sap_model: SapModel object (refer to function connect_to_etabs) or FakeSapModel.
+    - journal_path: File the journal is appended to.
+    - flush_every (int, optional): Flush the file every n calls. Default is 1000.
+    """
+
+    def __init__(self, sap_model, journal_path, flush_every=1000):
+        super().__init__(sap_model)
+        self.journal_path = journal_path
+        self._flush_every = flush_every
+        self._path_ids = {}
+        self._calls = 0
+        self._file = open(journal_path, "wb")
+        self._file.write(JOURNAL_MAGIC)
+
+    def _write(self, kind, payload):
+        data = marshal.dumps(payload)
+        self._file.write(_RECORD_HEADER.pack(kind, len(data)))
+        self._file.write(data)
+
+    def _invoke(self, path, method, args, kwargs):
+        start = time.perf_counter()
+        result = method(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        if self._file is None:
+            return result
+        path_id = self._path_ids.get(path)
+        if path_id is None:
+            path_id = self._path_ids[path] = len(self._path_ids)
+            self._write(_KIND_PATH, (path_id, path))
+        self._write(
+            _KIND_CALL,
+            (path_id, _plain(args), _plain(kwargs), _plain(result), elapsed),
+        )
+        self._calls += 1
+        if self._calls % self._flush_every == 0:
+            self._file.flush()
+        return result
+
+    def close_journal(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            print(f"{self._calls} API calls journaled to {self.journal_path}")
+
+
+def read_journal(journal_path):
+    """
+    Read a journal written by JournalingSapModel.
+
+    Parameters:
+    - journal_path: Journal file.
+
+    Returns:
+    - Generator of JournalEntry(seq, path, args, kwargs, result, elapsed).
+    """
+    paths = {}
+    seq = 0
+    with open(journal_path, "rb") as f:
+        if f.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+            raise ValueError(f"{journal_path} is not a SapModel journal")
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            kind, length = _RECORD_HEADER.unpack(header)
+            data = f.read(length)
+            if len(data) < length:
+                return  # truncated last record
+            payload = marshal.loads(data)
+            if kind == _KIND_PATH:
+                path_id, path = payload
+                paths[path_id] = path
+            elif kind == _KIND_CALL:
+                path_id, args, kwargs, result, elapsed = payload
+                yield JournalEntry(seq, paths[path_id], args, kwargs, result, elapsed)
+                seq += 1
+
+
+def journal_call_counts(journal_path):
+    """
+    Returns:
+    - counts (Counter): Number of calls per method path in the journal.
+    """
+    return Counter(entry.path for entry in read_journal(journal_path))
+
+
+def compare_call_counts(old_journal_path, new_journal_path):
+    """
+    Compare the call counts of two journals.
+
+    Returns:
+    - changes (dict): {path: (old_count, new_count)} for every method whose count
+        differs, sorted by the size of the change.
+    """
+    old = journal_call_counts(old_journal_path)
+    new = journal_call_counts(new_journal_path)
+    changes = {
+        path: (old[path], new[path])
+        for path in set(old) | set(new)
+        if old[path] != new[path]
+    }
+    return dict(
+        sorted(changes.items(), key=lambda item: abs(item[1][1] - item[1][0]), reverse=True)
+    )
+
+
+def _return_code(result):
+    # The return code is the last element of a ref-argument result, or the result itself
+    if isinstance(result, (list, tuple)):
+        return result[-1] if result else None
+    if isinstance(result, int) and not isinstance(result, bool):
+        return result
+    return None
+
+
+def _resolve_method(sap_model, path):
+    target = sap_model
+    for name in path.split("."):
+        target = getattr(target, name)
+    return target
+
+
+def replay_journal(journal_path, sap_model, check=True):
+    """
+    Re-drive the calls of a journal against a SapModel or FakeSapModel.
+
+    Parameters:
+    - journal_path: Journal file.
+    - sap_model: Model the calls are replayed against.
+    - check (bool, optional): If True, the return code of every call is compared to
+        the journaled one and differences are collected.
+
+    Returns:
+    - summary (dict): Number of calls replayed, wall time of the replay, journaled
+        API time and the list of mismatches (seq, path, journaled code, new code).
+    """
+    mismatches = []
+    calls = 0
+    journaled_time = 0.0
+    start = time.perf_counter()
+    for entry in read_journal(journal_path):
+        method = _resolve_method(sap_model, entry.path)
+        result = method(*entry.args, **entry.kwargs)
+        calls += 1
+        journaled_time += entry.elapsed
+        if check:
+            expected = _return_code(entry.result)
+            actual = _return_code(result)
+            if expected != actual:
+                mismatches.append((entry.seq, entry.path, expected, actual))
+    return {
+        "calls": calls,
+        "replay_s": time.perf_counter() - start,
+        "journaled_s": journaled_time,
+        "mismatches": mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SapModel journal tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    summary = commands.add_parser("summary", help="Call counts and time per method.")
+    summary.add_argument("journal")
+
+    compare = commands.add_parser("compare", help="Compare call counts of two journals.")
+    compare.add_argument("old_journal")
+    compare.add_argument("new_journal")
+
+    replay = commands.add_parser("replay", help="Replay a journal against FakeSapModel.")
+    replay.add_argument("journal")
+    replay.add_argument("--latency", type=float, default=0.0)
+    replay.add_argument(
+        "--etabs", action="store_true", help="Replay against the running ETABS instead."
+    )
+    args = parser.parse_args()
+
+    if args.command == "summary":
+        counts = Counter()
+        times = Counter()
+        for entry in read_journal(args.journal):
+            counts[entry.path] += 1
+            times[entry.path] += entry.elapsed
+        for path, count in counts.most_common():
+            print(f"{path:<36} {count:>8} {times[path]:>10.3f} s")
+        print(f"{'total':<36} {sum(counts.values()):>8} {sum(times.values()):>10.3f} s")
+
+    elif args.command == "compare":
+        changes = compare_call_counts(args.old_journal, args.new_journal)
+        if not changes:
+            print("Call counts are identical")
+        for path, (old, new) in changes.items():
+            print(f"{path:<36} {old:>8} -> {new:<8} ({new - old:+d})")
+
+    elif args.command == "replay":
+        if args.etabs:
+            from create_object import connect_to_etabs
+
+            _, sap_model = connect_to_etabs()
+        else:
+            from fake_sap_model import FakeSapModel
+
+            sap_model = FakeSapModel(latency=args.latency)
+        result = replay_journal(args.journal, sap_model)
+        print(
+            "Replayed {} calls in {:.3f} s (journaled API time {:.3f} s)".format(
+                result["calls"], result["replay_s"], result["journaled_s"]
+            )
+        )
+        for seq, path, expected, actual in result["mismatches"]:
+            print(f"Call {seq} {path}: return code {expected} journaled, {actual} replayed")
+
+
+if __name__ == "__main__":
+    main()
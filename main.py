@@ -2,27 +2,34 @@ from create_object import *
 from set_units import *
 from create_grid_system import *
 from draw_slab import *
+from draw_slabs import *
+from floor_plate import *
+from draw_frames import *
 from material_prop import *
 from set_slab_prop import *
 from get_storey_data import *
 import comtypes.client
 
-# Connect to Etabs model
-etabs_object, sap_model = connect_to_etabs()
+# Connect to Etabs model, repeated reads of materials and stories are cached and
+# unit switches to the units the model is already in are skipped
+etabs_object, sap_model = connect_to_etabs(cache=True, track_units=True)
 print_model_name(sap_model)
 disconnect_from_etabs(etabs_object, sap_model)
 
 # Set the present units kN for force and m for length
 set_etabs_units(sap_model)
 
-# Adding the most common used concrete C25/30, C30/37, C32/40, C40/50 from EC2 code for Singapore Industry Design
-add_eurocode_conc_materials(sap_model, delete_existing=True)
+# Adding the most common used concrete C25/30, C30/37, C32/40, C40/50 and rebar type fy=500Mpa
+# from EC2 code for Singapore Industry Design. Only the materials which differ from the model are written.
+# The definitions are in N, mm & MPa and converted to the present units, the model stays in kN, m.
+sync_eurocode_materials(sap_model, delete_existing=True)
 
-# Adding the most common used rebar type fy=500Mpa from EC2 code for Singapore Industry Design
-add_eurocode_rebar_materials(sap_model, delete_existing=True)
+# # Delete all existing concrete / rebar materials and add them again
+# add_eurocode_conc_materials(sap_model, delete_existing=True)
+# add_eurocode_rebar_materials(sap_model, delete_existing=True)
 
 # Generate the grid line by given value
-# storey_heights = [3.88, 3.88, 3.88]  #Only can set the two types of height
+# storey_heights = [3.88, 3.88, 3.88]  # Any number of storey heights, e.g. [4.5, 3.88, 3.88, 6.0]
 # x_coordinates = [0] + [8.1 * i for i in range(1, 8)]
 # y_coordinates = [0] + [4.365, 8.73, 13.095]
 
@@ -47,14 +54,25 @@ add_eurocode_rebar_materials(sap_model, delete_existing=True)
 # # Add slabs
 # slab_offset = 0
 # prop_name = "MyRC125mmSlab"
-# # balcony_axis = [[1, 3, 5, 7], [1, 3]]  # Offset horizontal indices by -1
-# # balcony_width = 4
-# # balcony_depth = 2
-# # balcony_offset = 4.05
-
-# for z, story_height in enumerate(storey_heights):
-#     z_coordinate = sum(storey_heights[:z + 1]) #{1:3.88, 2:3.88, 3:3.88}
-#     draw_slab(sap_model, grid_points, 0, len(x_coordinates) - 1, 0, len(y_coordinates) - 1, slab_offset, z_coordinate, prop_name)
+# balcony_axis = [[1, 3, 5, 7], [1, 3]]  # Offset horizontal indices by -1
+# balcony_width = 4
+# balcony_depth = 2
+# balcony_offset = 4.05
+
+# # One slab over the whole grid on every storey, slab_names[("Story1", (0, 7, 0, 3))] -> slab name
+# slab_names = draw_slabs(sap_model, grid_points, [(0, len(x_coordinates) - 1, 0, len(y_coordinates) - 1)], prop_name, offset=slab_offset)
+
+# # Or a floor plate with balconies and openings, merged into as few area objects as possible
+# plate = FloorPlate(grid_points, prop_name, offset=slab_offset)
+# plate.add_bays(0, len(x_coordinates) - 1, 0, len(y_coordinates) - 1)
+# plate.add_balconies("south", balcony_axis[0], balcony_width, balcony_depth, shift=-balcony_offset)
+# plate.add_balconies("west", balcony_axis[1], balcony_width, balcony_depth)
+# plate.add_opening_bays(3, 4, 1, 2)  # stair core
+# slab_names = draw_floor_plates(sap_model, plate)
+
+
+# # Add columns at every grid intersection and beams along every grid line on all storeys
+# frames = draw_frames(sap_model, grid_points, get_story_data(sap_model), "C600x600", "B300x600")
 
 
 # Close ETABS
@@ -0,0 +1,203 @@
+"""
+Precomputed EN 1992-1-1 material catalog.
+
+The concrete properties of EN 1992-1-1 Table 3.1 (fck, fck,cube, fcm, fctm, fctk,
+Ecm and the strains of the stress-strain relations) are computed for all grades
+C12/15 to C90/105 at once with NumPy, together with the B500A/B/C reinforcement
+classes of Annex C. The result is stored in ec2_material_catalog.json next to this
+module and only recomputed when the file is missing or of an older version.
+
+catalog_definitions turns any subset of the catalog into material definitions in
+the format of snapshot_materials (N, mm & MPa), which sync_eurocode_materials or
+apply_material_tables (one table edit for any number of materials) write to the
+model.
+
+Example:
+>>> catalog = load_catalog()
+>>> catalog["concrete"]["Ecm"][catalog["concrete"]["Grade"].index("C30/37")]
+33000.0
+>>> definitions = catalog_definitions(["EC-C30/37", "EC-C50/60", "EC-B500B"])
+>>> apply_material_tables(sap_model, definitions)
+
+Notes:
+- The values are computed with the expressions of Table 3.1 and rounded to its
+  precision: fctm and fctk to 0.1 MPa, Ecm to 1 GPa, strains to 0.1 per mille and n
+  to 0.05. Some tabulated values (fctk,0.05 of C60/75, eps_c1 of C35/45) were
+  rounded differently in the code and differ by one digit.
+- C32/40 is not in Table 3.1, it is computed with the same expressions as it is the
+  grade used by the project.
+"""
+import json
+import os
+
+import numpy as np
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ec2_material_catalog.json")
+CATALOG_VERSION = 1
+
+# Cylinder / cube strengths in MPa
+EC2_CONCRETE_GRADES = [
+    (12, 15), (16, 20), (20, 25), (25, 30), (30, 37), (32, 40), (35, 45), (40, 50),
+    (45, 55), (50, 60), (55, 67), (60, 75), (70, 85), (80, 95), (90, 105),
+]
+
+# Class: (fyk, k = (ft/fy)k, characteristic strain at maximum force)
+EC2_REBAR_CLASSES = {"B500A": (500.0, 1.05, 0.025), "B500B": (500.0, 1.08, 0.05), "B500C": (500.0, 1.15, 0.075)}
+
+REBAR_E = 200000.0  # MPa
+CONCRETE_POISSON = 0.2
+CONCRETE_THERMAL = 10 * 10**-6  # 1/C
+CONCRETE_WEIGHT = 25 * 10**-6  # N/mm3
+
+_catalog = None
+
+
+def compute_ec2_catalog():
+    """
+    Compute the catalog.
+
+    Returns:
+    - catalog (dict): {"version", "concrete": {column: list}, "rebar": {column: list}},
+        stresses in MPa, strains as ratios.
+    """
+    fck = np.array([g[0] for g in EC2_CONCRETE_GRADES], dtype=float)
+    fck_cube = np.array([g[1] for g in EC2_CONCRETE_GRADES], dtype=float)
+    fcm = fck + 8.0
+    high = fck > 50.0
+    fctm = np.where(high, 2.12 * np.log(1.0 + fcm / 10.0), 0.30 * fck ** (2.0 / 3.0))
+    ecm = np.round(22.0 * (fcm / 10.0) ** 0.3) * 1000.0
+    # Strains in per mille, high strength concrete relations of Table 3.1
+    eps_c1 = np.minimum(0.7 * fcm**0.31, 2.8)
+    eps_cu1 = np.where(high, 2.8 + 27.0 * ((98.0 - fcm) / 100.0) ** 4, 3.5)
+    eps_c2 = np.where(high, 2.0 + 0.085 * np.maximum(fck - 50.0, 0.0) ** 0.53, 2.0)
+    eps_cu2 = np.where(high, 2.6 + 35.0 * ((90.0 - fck) / 100.0) ** 4, 3.5)
+    n = np.where(high, 1.4 + 23.4 * ((90.0 - fck) / 100.0) ** 4, 2.0)
+    eps_c3 = np.where(high, 1.75 + 0.55 * (fck - 50.0) / 40.0, 1.75)
+
+    def per_mille(values):
+        return (np.round(values, 1) / 1000.0).round(6).tolist()
+
+    concrete = {
+        "Grade": ["C{:g}/{:g}".format(a, b) for a, b in zip(fck, fck_cube)],
+        "fck": fck.tolist(),
+        "fck_cube": fck_cube.tolist(),
+        "fcm": fcm.tolist(),
+        "fctm": np.round(fctm, 1).tolist(),
+        "fctk_005": np.round(0.7 * fctm, 1).tolist(),
+        "fctk_095": np.round(1.3 * fctm, 1).tolist(),
+        "Ecm": ecm.tolist(),
+        "eps_c1": per_mille(eps_c1),
+        "eps_cu1": per_mille(eps_cu1),
+        "eps_c2": per_mille(eps_c2),
+        "eps_cu2": per_mille(eps_cu2),
+        "n": (np.round(n * 20.0) / 20.0).tolist(),
+        "eps_c3": per_mille(eps_c3),
+        "eps_cu3": per_mille(eps_cu2),
+    }
+
+    classes = list(EC2_REBAR_CLASSES)
+    fyk = np.array([EC2_REBAR_CLASSES[c][0] for c in classes])
+    k = np.array([EC2_REBAR_CLASSES[c][1] for c in classes])
+    rebar = {
+        "Grade": classes,
+        "fyk": fyk.tolist(),
+        "k": k.tolist(),
+        "ftk": np.round(fyk * k, 1).tolist(),
+        "eps_uk": [EC2_REBAR_CLASSES[c][2] for c in classes],
+        "Es": [REBAR_E] * len(classes),
+    }
+    return {"version": CATALOG_VERSION, "concrete": concrete, "rebar": rebar}
+
+
+def load_catalog(path=CATALOG_FILE):
+    """
+    The catalog from the data file, computed and written first if the file is
+    missing or outdated. Loaded once per process.
+    """
+    global _catalog
+    if _catalog is not None and path == CATALOG_FILE:
+        return _catalog
+    catalog = None
+    if os.path.exists(path):
+        with open(path) as f:
+            catalog = json.load(f)
+        if catalog.get("version") != CATALOG_VERSION:
+            catalog = None
+    if catalog is None:
+        catalog = compute_ec2_catalog()
+        with open(path, "w") as f:
+            json.dump(catalog, f, indent=1)
+        print(f"Material catalog written to {path}")
+    if path == CATALOG_FILE:
+        _catalog = catalog
+    return catalog
+
+
+def catalog_names():
+    """Material names of the catalog: "EC-C12/15", ..., "EC-B500C"."""
+    catalog = load_catalog()
+    return ["EC-" + grade for grade in catalog["concrete"]["Grade"] + catalog["rebar"]["Grade"]]
+
+
+def catalog_definitions(names=None):
+    """
+    Material definitions of catalog materials in the format of snapshot_materials,
+    in N, mm & MPa.
+
+    Parameters:
+    - names (list, optional): Material names ("EC-C30/37", "EC-B500B") or grades
+        ("C30/37", "B500B"). Default is the whole catalog.
+
+    Returns:
+    - definitions (dict): {material name: definition}, in the order of names.
+    """
+    catalog = load_catalog()
+    concrete, rebar = catalog["concrete"], catalog["rebar"]
+    if names is None:
+        names = catalog_names()
+    definitions = {}
+    for name in names:
+        grade = name[3:] if name.startswith("EC-") else name
+        mat_name = "EC-" + grade
+        if grade in concrete["Grade"]:
+            i = concrete["Grade"].index(grade)
+            definitions[mat_name] = {
+                "mat_type": 2,
+                "add": ("Europe", "EN 1992-1-1 per 206-1", grade),
+                # fc, isLightweight, fcsFact, SSType, SSHysType, strainAtFc, strainAtUlt
+                "concrete": (concrete["fck"][i], False, 0.0, 2, 4, concrete["eps_c2"][i], concrete["eps_cu2"][i]),
+                # E, U, A
+                "isotropic": (concrete["Ecm"][i], CONCRETE_POISSON, CONCRETE_THERMAL),
+                # weight per unit volume
+                "weight": CONCRETE_WEIGHT,
+            }
+        elif grade in rebar["Grade"]:
+            i = rebar["Grade"].index(grade)
+            fy, fu = rebar["fyk"][i], rebar["ftk"][i]
+            definitions[mat_name] = {
+                "mat_type": 6,
+                "add": ("Europe", "User", grade),
+                # Fy, Fu, Efy, Efu, SSType, SSHysType, StrainAtHardening, StrainUltimate,
+                # FinalSlope, UseCaltransSSDefaults
+                "rebar": (fy, fu, fy, fu, 1, 1, 0.01, rebar["eps_uk"][i], 0, False),
+                # E, A
+                "uniaxial": (rebar["Es"][i], 0),
+            }
+        else:
+            raise ValueError(f"{name} is not in the EC2 material catalog")
+    return definitions
+
+
+if __name__ == "__main__":
+    if os.path.exists(CATALOG_FILE):
+        os.remove(CATALOG_FILE)
+    catalog = load_catalog()
+    concrete = catalog["concrete"]
+    print("Grade     fcm  fctm   Ecm  eps_c2 eps_cu2")
+    for i, grade in enumerate(concrete["Grade"]):
+        print(
+            "{:8} {:4g} {:5.1f} {:5.0f} {:7.4f} {:7.4f}".format(
+                grade, concrete["fcm"][i], concrete["fctm"][i], concrete["Ecm"][i] / 1000,
+                concrete["eps_c2"][i], concrete["eps_cu2"][i],
+            )
+        )
@@ -9,7 +9,8 @@ Note:
 Author: Chen Fangting
 Date: 13/Mar/2024
 """
-import re
+from material_catalog import catalog_definitions, catalog_names
+from unit_state import conversion_factor
 
 
 def get_all_materials(sap_model):
@@ -22,8 +23,9 @@ def get_all_materials(sap_model):
     Returns
     materials : Type dict
     """
-    # Set the Etabs units, all strength of materials will be returned in MPa
-    sap_model.SetPresentUnits(9)
+    # Strengths are read in the present units and converted to MPa, the present
+    # units of the model are left as they are
+    to_mpa = conversion_factor("stress", sap_model.GetPresentUnits(), 9)
     # Etabs material type enumerators
     mat_types = {
         1: "Steel",
@@ -43,7 +45,7 @@ def get_all_materials(sap_model):
         mat_type = mat_types[mat_props[0]]
         if mat_type == "Concrete":
             mat_conc_prop = sap_model.PropMaterial.GetOConcrete_1(mat_name)
-            conc_fc = mat_conc_prop[0]
+            conc_fc = mat_conc_prop[0] * to_mpa
             materials[mat_name] = {
                 "mat_name": mat_name,
                 "mat_type": mat_type,
@@ -51,8 +53,8 @@ def get_all_materials(sap_model):
             }
         elif mat_type == "Steel":
             mat_steel_prop = sap_model.PropMaterial.GetOSteel_1(mat_name)
-            steel_fy = mat_steel_prop[0]
-            steel_fu = mat_steel_prop[1]
+            steel_fy = mat_steel_prop[0] * to_mpa
+            steel_fu = mat_steel_prop[1] * to_mpa
             materials[mat_name] = {
                 "mat_name": mat_name,
                 "mat_type": mat_type,
@@ -64,22 +66,23 @@ def get_all_materials(sap_model):
     return materials
 
 
-def add_eurocode_conc_materials(sap_model, delete_existing=False):
+def add_eurocode_conc_materials(sap_model, delete_existing=False, grades=None):
     """
     This will set all the concrete grades with material properties to Eurocode,
-    C25/30, C30/37, C32/40, C40/50. The materials will have the
-    designation 'EC-C32/40' etc.
+    by default C25/30, C30/37, C32/40, C40/50. The materials will have the
+    designation 'EC-C32/40' etc. The properties are taken from the EC2 material
+    catalog (see material_catalog.py) and all grades are written with one table
+    edit (see apply_material_tables).
 
     Parameters
     SapModel : Pointer (refer to function connect_to_etabs)
     delete_existing : Boolean. If True will delete all existing concrete
                       materials
+    grades : list, optional. Any concrete grades of the catalog, C12/15 to C90/105
 
     Returns None
     """
-    conc_grades = ["C25/30", "C30/37", "C32/40", "C40/50"]
-
-    gravity_weight = 25.0  # kN/m³
+    conc_grades = EC2_CONC_GRADES if grades is None else grades
 
     conc_mat_to_del = []
     # Get existing concrete materials to be deleted
@@ -95,121 +98,34 @@ def add_eurocode_conc_materials(sap_model, delete_existing=False):
         if prop_del == 1:
             print("Deleting material {} unsuccessful".format(mat))
 
-    # Add new Eurocode concrete materials
-    for grade in conc_grades:
-        conc_nm = "EC-" + grade
-        numeric_part = re.search(
-            r"\d+", grade
-        ).group()  # Extract numeric part using regex
-        new_prop = sap_model.PropMaterial.AddMaterial(
-            conc_nm, 2, "Europe", "EN 1992-1-1 per 206-1", grade, UserName=conc_nm
-        )
-
-        # Check if the material was added successfully
-        if new_prop[1] != 0:
-            print(
-                "Adding material {} unsuccessful. Return code: {}".format(
-                    conc_nm, new_prop[1]
-                )
-            )
-            continue
-
-        isLightweight = False
-        fcsFact = 0.0
-        SSType = 2
-        SSHysType = 4
-        strainAtFc = 0.003
-        strainAtUlt = 0.0035
-
-        return_code = sap_model.PropMaterial.SetOConcrete(
-            conc_nm,
-            float(numeric_part),  # Convert to float
-            isLightweight,
-            fcsFact,
-            SSType,
-            SSHysType,
-            strainAtFc,
-            strainAtUlt,
-        )
-        if return_code != 0:
-            print(
-                "Setting properties for material {} unsuccessful. Return code: {}".format(
-                    conc_nm, return_code
-                )
-            )
-            continue
-
-        conc_E = {"C25/30": 31000, "C30/37": 33000, "C32/40": 33400, "C40/50": 35000}
-        concU = 0.2
-        concA = 10 * 10**-6
-        return_code = sap_model.PropMaterial.SetMPIsotropic(
-            conc_nm, conc_E[grade], concU, concA
-        )
-        if return_code != 0:
-            print(
-                "Setting properties for material {} unsuccessful. Return code: {}".format(
-                    conc_nm, return_code
-                )
-            )
-            continue
-
-        sap_model.PropMaterial.SetWeightAndMass(conc_nm, 1, 25 * 10**-6)
-        if return_code != 0:
-            print(
-                "Setting properties for material {} unsuccessful. Return code: {}".format(
-                    conc_nm, return_code
-                )
-            )
-            continue
-
-        # Check if setting concrete properties was successful
-        # Rest of the code...
-        print("Material {} added successfully".format(conc_nm))
+    # Add the Eurocode concrete materials in one go
+    apply_material_tables(sap_model, catalog_definitions(conc_grades))
 
     return None
 
 
-def add_eurocode_rebar_materials(sap_model, delete_existing=False):
+def add_eurocode_rebar_materials(sap_model, delete_existing=False, grades=None):
     '''
     Adds Eurocode-compliant rebar material to the specified SAP model.
 
     Parameters:
     - sap_model: Pointer to the SAP model.
     - delete_existing (optional): If True, deletes existing rebar materials.
+    - grades (optional): Reinforcement classes of the EC2 material catalog, e.g.
+        ["B500B", "B500C"]. Default is the project rebar fy500.
 
     Returns:
     None
 
     Workflow:
     - Deletes existing rebar materials if delete_existing is True.
-    - Adds a new material for the rebar with Eurocode specifications:
-        - Material type: 6 (Assuming material type 6 is suitable for rebar).
-        - Region: "Europe" (Modify based on the appropriate region).
-        - Standard: "User" (Modify based on the appropriate standard).
-        - Grade designation: "Grade 500" (Customizable).
-    - Sets isotropic mechanical properties for the rebar:
-        - Elastic modulus (E): 200,000 MPa (Assuming E = 200 GPa).
-        - Thermal coefficient: 0.
-    - Sets Eurocode rebar material properties:
-        - Yield strength (Fy), Ultimate strength (Fu), Elastic yield strain (Efy), Ultimate strain (Efu),
-            Stress-strain type (SSType), Stress-strain hysteresis type (SSHysType),
-            Strain at the start of hardening (StrainAtHardening), Strain at ultimate (StrainUltimate),
-            Final slope (FinalSlope), UseCaltransSSDefaults, and Temperature (Temp).
+    - Adds the rebar materials with one table edit (see apply_material_tables):
+        - fy500: Fy 500 MPa, Fu 540 MPa, ultimate strain 0.09 (FY500_DEFINITION).
+        - EC-B500A/B/C: fyk 500 MPa with k and the strain at maximum force of the
+          class, from the EC2 material catalog.
+        - Elastic modulus (E): 200,000 MPa, thermal coefficient 0.
     '''
 
-    rebar_nm = "fy500"
-    Fy = 500
-    Fu = 540
-    Efy = 500
-    Efu = 540
-    SSType = 1
-    SSHysType = 1
-    StrainAtHardening = 0.01
-    StrainUltimate = 0.09
-    FinalSlope = 0
-    UseCaltransSSDefaults = False
-    Temp = 0
-
     # List of existing rebar materials to be deleted
     rebar_mat_to_del = []
 
@@ -226,56 +142,406 @@ def add_eurocode_rebar_materials(sap_model, delete_existing=False):
         if prop_del == 1:
             print(f"Deleting material {mat} unsuccessful")
 
-    # Add new material for the rebar
-    new_prop = sap_model.PropMaterial.AddMaterial(
-        rebar_nm,
-        6,  # material type 6 is  for rebar
-        "Europe",  # Add appropriate region
-        "User",  # Add appropriate standard
-        f"Grade 500",  # Customize as needed
-        UserName=rebar_nm,
-    )
-    if new_prop[1] != 0:
-        print(
-            "Adding material {} unsuccessful. Return code: {}".format(
-                rebar_nm, new_prop[1]
+    if grades is None:
+        definitions = {"fy500": dict(FY500_DEFINITION)}
+    else:
+        definitions = catalog_definitions(grades)
+    apply_material_tables(sap_model, definitions)
+
+    return None
+
+
+# Concrete grades synced by sync_eurocode_materials, their definitions come from
+# material_catalog (catalog_definitions)
+EC2_CONC_GRADES = ["C25/30", "C30/37", "C32/40", "C40/50"]
+
+# The project rebar, with the ductility of the former definition
+FY500_DEFINITION = {
+    "mat_type": 6,
+    "add": ("Europe", "User", "Grade 500"),
+    # Fy, Fu, Efy, Efu, SSType, SSHysType, StrainAtHardening, StrainUltimate,
+    # FinalSlope, UseCaltransSSDefaults
+    "rebar": (500, 540, 500, 540, 1, 1, 0.01, 0.09, 0, False),
+    # E, A
+    "uniaxial": (200000, 0),
+}
+
+
+def eurocode_material_definitions():
+    """
+    Returns the desired Eurocode materials in the format of snapshot_materials.
+
+    Returns
+    definitions : Type dict, {material name: definition}
+    """
+    definitions = catalog_definitions(EC2_CONC_GRADES)
+    definitions["fy500"] = dict(FY500_DEFINITION)
+    return definitions
+
+
+def material_definitions(names="all"):
+    """
+    Returns the definitions of materials by name, from eurocode_material_definitions
+    or the EC2 material catalog (any of catalog_names()).
+
+    Parameters
+    names : "all" for eurocode_material_definitions(), or a list of names
+
+    Returns
+    definitions : Type dict, {material name: definition}
+    """
+    defaults = eurocode_material_definitions()
+    if names == "all":
+        return defaults
+    definitions = {}
+    for name in names:
+        if name in defaults:
+            definitions[name] = defaults[name]
+        elif name in catalog_names():
+            definitions.update(catalog_definitions([name]))
+        else:
+            raise ValueError("Unknown Eurocode material {}".format(name))
+    return definitions
+
+
+def snapshot_materials(sap_model):
+    """
+    Reads the concrete and rebar materials of the model with all the properties
+    compared by sync_eurocode_materials. Will return in units mm, N & MPa.
+
+    Returns
+    snapshot : Type dict, {material name: definition}. Materials of other types
+               only have the "mat_type" entry.
+    """
+    present = sap_model.GetPresentUnits()
+    mat_name_list = sap_model.PropMaterial.GetNameList()
+    snapshot = {}
+    for i in range(mat_name_list[0]):
+        mat_name = mat_name_list[1][i]
+        mat_type = sap_model.PropMaterial.GetMaterial(mat_name)[0]
+        snapshot[mat_name] = {"mat_type": mat_type}
+        if mat_type == 2:
+            conc = sap_model.PropMaterial.GetOConcrete_1(mat_name)
+            isotropic = sap_model.PropMaterial.GetMPIsotropic(mat_name)
+            weight = sap_model.PropMaterial.GetWeightAndMass(mat_name)
+            snapshot[mat_name]["concrete"] = tuple(conc[:7])
+            snapshot[mat_name]["isotropic"] = tuple(isotropic[:3])
+            snapshot[mat_name]["weight"] = weight[0]
+        elif mat_type == 6:
+            rebar = sap_model.PropMaterial.GetORebar_1(mat_name)
+            uniaxial = sap_model.PropMaterial.GetMPUniaxial(mat_name)
+            snapshot[mat_name]["rebar"] = tuple(rebar[:10])
+            snapshot[mat_name]["uniaxial"] = tuple(uniaxial[:2])
+    # Read in the present units, converted here instead of switching the model
+    factors = _section_factors(present, 9)
+    for definition in snapshot.values():
+        for section in list(definition):
+            if section in factors:
+                definition[section] = _convert_section(definition[section], factors[section])
+    return snapshot
+
+
+# Quantity of every value of the material property groups, None for unitless values
+MATERIAL_SECTION_QUANTITIES = {
+    "concrete": ("stress", None, None, None, None, None, None),
+    "isotropic": ("stress", None, "thermal_coefficient"),
+    "weight": "weight_density",
+    "rebar": ("stress", "stress", "stress", "stress", None, None, None, None, None, None),
+    "uniaxial": ("stress", "thermal_coefficient"),
+}
+
+
+def _section_factors(from_units, to_units):
+    factors = {}
+    for section, quantities in MATERIAL_SECTION_QUANTITIES.items():
+        if isinstance(quantities, str):
+            factors[section] = conversion_factor(quantities, from_units, to_units)
+        else:
+            factors[section] = tuple(
+                1.0 if q is None else conversion_factor(q, from_units, to_units)
+                for q in quantities
             )
-        )
+    return factors
 
-    # Set isotropic mechanical properties for the rebar
-    return_code_isotropic = sap_model.PropMaterial.SetMPUniaxial(
-        rebar_nm,
-        200000,  # Elastic modulus (E) in MPa (200 GPa = 200,000 MPa)
-        0,  # The thermal coefficient. [1/T]
-        Temp=0,
-    )
-    if return_code_isotropic != 0:
-        print(
-            f"Set isotropic mechanical properties for rebar {rebar_nm} unsuccessful. Return code: {return_code}"
-        )
 
-    # Set Eurocode rebar material
-    return_code = sap_model.PropMaterial.SetORebar_1(
-        rebar_nm,
-        Fy,
-        Fu,
-        Efy,
-        Efu,
-        SSType,
-        SSHysType,
-        StrainAtHardening,
-        StrainUltimate,
-        FinalSlope,
-        UseCaltransSSDefaults,
-        Temp,
+def _convert_section(values, factors):
+    if not isinstance(values, tuple):
+        return values * factors
+    return tuple(
+        v if f == 1.0 or isinstance(v, bool) else v * f for v, f in zip(values, factors)
     )
 
-    if return_code != 0:
-        print(
-            f"Setting properties for material {rebar_nm} unsuccessful. Return code: {return_code}"
-        )  # Return code 1 means didnt add the material for the rebar
 
+def _same_values(current, desired, rel_tol=1e-6):
+    if current is None:
+        return False
+    if not isinstance(desired, tuple):
+        current, desired = (current,), (desired,)
+    if len(current) != len(desired):
+        return False
+    for a, b in zip(current, desired):
+        if isinstance(b, bool):
+            if bool(a) != b:
+                return False
+        elif abs(a - b) > rel_tol * max(abs(a), abs(b), 1.0):
+            return False
+    return True
+
+
+def _set_material_section(sap_model, mat_name, section, values):
+    if section == "concrete":
+        return sap_model.PropMaterial.SetOConcrete(mat_name, *values)
+    if section == "isotropic":
+        return sap_model.PropMaterial.SetMPIsotropic(mat_name, *values)
+    if section == "weight":
+        return sap_model.PropMaterial.SetWeightAndMass(mat_name, 1, values)
+    if section == "rebar":
+        return sap_model.PropMaterial.SetORebar_1(mat_name, *values, 0)
+    if section == "uniaxial":
+        return sap_model.PropMaterial.SetMPUniaxial(mat_name, *values, Temp=0)
+    raise ValueError(f"Unknown material section {section}")
+
+
+def sync_eurocode_materials(sap_model, delete_existing=False, definitions=None):
+    """
+    Brings the Eurocode concrete and rebar materials of the model in line with
+    the desired definitions, issuing only the API calls for what differs.
+
+    The materials are read once with snapshot_materials, then:
+    - missing materials are added with all their properties,
+    - existing materials only get the property groups that differ re-set,
+    - materials of the wrong type are deleted and re-added,
+    - if delete_existing is True, other concrete and rebar materials are deleted.
+    Re-running against an unchanged model makes no write calls.
+
+    Parameters
+    SapModel : Pointer (refer to function connect_to_etabs)
+    delete_existing : Boolean. If True will delete the concrete and rebar
+                      materials which are not in the definitions
+    definitions : dict, optional. Defaults to eurocode_material_definitions()
+
+    Returns
+    summary : Type dict with the lists of "added", "updated", "deleted" and
+              "unchanged" material names
+    """
+    if definitions is None:
+        definitions = eurocode_material_definitions()
+    current = snapshot_materials(sap_model)
+    # The definitions are in N, mm & MPa, they are written in the present units
+    to_present = _section_factors(9, sap_model.GetPresentUnits())
+    summary = {"added": [], "updated": [], "deleted": [], "unchanged": []}
+
+    def delete(mat):
+        if sap_model.PropMaterial.Delete(mat) == 0:
+            summary["deleted"].append(mat)
+            return True
+        print(f"Deleting material {mat} unsuccessful")
+        return False
+
+    if delete_existing:
+        for mat, props in current.items():
+            if props["mat_type"] in (2, 6) and mat not in definitions:
+                delete(mat)
+
+    for mat, desired in definitions.items():
+        existing = current.get(mat)
+        if existing is not None and existing["mat_type"] != desired["mat_type"]:
+            if not delete(mat):
+                continue
+            existing = None
+
+        if existing is None:
+            new_prop = sap_model.PropMaterial.AddMaterial(
+                mat, desired["mat_type"], *desired["add"], UserName=mat
+            )
+            if new_prop[1] != 0:
+                print(
+                    "Adding material {} unsuccessful. Return code: {}".format(
+                        mat, new_prop[1]
+                    )
+                )
+                continue
+            existing = {}
+
+        changed = False
+        for section, values in desired.items():
+            if section in ("mat_type", "add"):
+                continue
+            if _same_values(existing.get(section), values):
+                continue
+            return_code = _set_material_section(
+                sap_model, mat, section, _convert_section(values, to_present[section])
+            )
+            changed = True
+            if return_code != 0:
+                print(
+                    "Setting {} properties for material {} unsuccessful. Return code: {}".format(
+                        section, mat, return_code
+                    )
+                )
+
+        if mat not in current or mat in summary["deleted"]:
+            summary["added"].append(mat)
+        elif changed:
+            summary["updated"].append(mat)
+        else:
+            summary["unchanged"].append(mat)
+
+    print(
+        "Materials synchronised: {} added, {} updated, {} deleted, {} unchanged".format(
+            len(summary["added"]),
+            len(summary["updated"]),
+            len(summary["deleted"]),
+            len(summary["unchanged"]),
+        )
+    )
+    return summary
+
+
+# Database tables written by apply_material_tables: (table key, fields)
+MATERIAL_TABLES = {
+    "general": ("Material Properties - General", ["Material", "Type", "SymType", "Grade"]),
+    "mechanical": (
+        "Material Properties - Basic Mechanical Properties",
+        ["Material", "UnitWeight", "E1", "U12", "A1"],
+    ),
+    "concrete": (
+        "Material Properties - Concrete Data",
+        ["Material", "Fc", "LtWtConc", "SSCurveOpt", "SSHysType", "SFc", "SCap"],
+    ),
+    "rebar": (
+        "Material Properties - Rebar Data",
+        ["Material", "Fy", "Fu", "Fye", "Fue", "SSCurveOpt", "SSHysType", "SHard", "SCap",
+         "FinalSlope", "UseCTDef"],
+    ),
+}
+MAT_TYPE_NAMES = {
+    1: "Steel", 2: "Concrete", 3: "NoDesign", 4: "Aluminum",
+    5: "ColdFormed", 6: "Rebar", 7: "Tendon", 8: "Masonry",
+}
+SS_CURVE_NAMES = {
+    "concrete": {0: "User", 1: "Simple", 2: "Mander"},
+    "rebar": {0: "User", 1: "Simple", 2: "Park"},
+}
+SS_HYS_NAMES = {
+    0: "Elastic", 1: "Kinematic", 2: "Takeda", 3: "Pivot",
+    4: "Concrete", 5: "BRB Hardening", 6: "Degrading", 7: "Isotropic",
+}
+
+
+def _table_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, str):
+        return value
+    return repr(float(value))
+
+
+def _material_table_rows(name, definition):
+    """
+    Rows of one material in the tables of MATERIAL_TABLES, {table: row}.
+    """
+    mat_type = definition["mat_type"]
+    rows = {
+        "general": [
+            name,
+            MAT_TYPE_NAMES[mat_type],
+            "Uniaxial" if "uniaxial" in definition else "Isotropic",
+            definition["add"][2],
+        ]
+    }
+    if "isotropic" in definition:
+        e, u, a = definition["isotropic"]
+    elif "uniaxial" in definition:
+        (e, a), u = definition["uniaxial"], None
     else:
-        print(f"Material {rebar_nm} added successfully")
+        e = u = a = None
+    rows["mechanical"] = [name] + [_table_text(v) for v in (definition.get("weight"), e, u, a)]
+    if "concrete" in definition:
+        fc, lightweight, _, ss_type, ss_hys_type, strain_at_fc, strain_ultimate = definition["concrete"]
+        rows["concrete"] = [
+            name, _table_text(fc), _table_text(bool(lightweight)),
+            SS_CURVE_NAMES["concrete"][ss_type], SS_HYS_NAMES[ss_hys_type],
+            _table_text(strain_at_fc), _table_text(strain_ultimate),
+        ]
+    if "rebar" in definition:
+        fy, fu, efy, efu, ss_type, ss_hys_type, strain_hardening, strain_ultimate, slope, caltrans = definition["rebar"]
+        rows["rebar"] = [name] + [_table_text(v) for v in (fy, fu, efy, efu)] + [
+            SS_CURVE_NAMES["rebar"][ss_type], SS_HYS_NAMES[ss_hys_type],
+            _table_text(strain_hardening), _table_text(strain_ultimate),
+            _table_text(slope), _table_text(bool(caltrans)),
+        ]
+    return rows
+
+
+def _upsert_table(sap_model, table_key, fields, new_rows):
+    """
+    Read the current table, replace or append the rows of the new materials and set
+    it for editing.
+    """
+    tables = sap_model.DatabaseTables
+    ret = tables.GetTableForEditingArray(table_key, "")
+    existing_fields, num_records, data = list(ret[1]), ret[2], list(ret[3])
+    records = {}
+    if ret[-1] == 0 and num_records:
+        width = len(existing_fields)
+        columns = [existing_fields.index(f) if f in existing_fields else -1 for f in fields]
+        for r in range(num_records):
+            row = data[r * width : (r + 1) * width]
+            record = [row[c] if c >= 0 else "" for c in columns]
+            records[record[0]] = record
+    records.update(new_rows)
+    flat = [value for record in records.values() for value in record]
+    ret = tables.SetTableForEditingArray(table_key, 0, list(fields), len(records), flat)
+    if ret[-1] != 0:
+        print(f"Error setting table {table_key}. Return code: {ret[-1]}")
+    return ret[-1]
+
+
+def apply_material_tables(sap_model, definitions):
+    """
+    Adds or redefines any number of materials with one database table edit instead
+    of an AddMaterial, SetOConcrete / SetORebar_1, SetMPIsotropic / SetMPUniaxial and
+    SetWeightAndMass chain per material: the general, mechanical, concrete and rebar
+    tables are each read and set once, then applied with one ApplyEditedTables.
 
-    return None
+    Parameters
+    SapModel : Pointer (refer to function connect_to_etabs)
+    definitions : dict, {material name: definition} in N, mm & MPa, e.g. from
+                  catalog_definitions or eurocode_material_definitions. The
+                  values are written in the present units of the model.
+
+    Returns
+    ret : 0 on success
+    """
+    if not definitions:
+        return 0
+    factors = _section_factors(9, sap_model.GetPresentUnits())
+    new_rows = {table: {} for table in MATERIAL_TABLES}
+    for name, definition in definitions.items():
+        converted = {
+            section: _convert_section(values, factors[section]) if section in factors else values
+            for section, values in definition.items()
+        }
+        for table, row in _material_table_rows(name, converted).items():
+            new_rows[table][name] = row
+
+    ret = 0
+    for table, (table_key, fields) in MATERIAL_TABLES.items():
+        if new_rows[table]:
+            ret |= _upsert_table(sap_model, table_key, fields, new_rows[table])
+    if ret != 0:
+        sap_model.DatabaseTables.CancelTableEditing()
+        return ret
+
+    result = sap_model.DatabaseTables.ApplyEditedTables(True)
+    if result[-1] != 0 or result[0]:
+        print(
+            f"Error running function ApplyEditedTables: {result[0]} fatal errors, "
+            f"{result[1]} errors\n{result[4]}"
+        )
+        return result[-1] or 1
+    print("Materials {} added successfully".format(", ".join(definitions)))
+    return 0
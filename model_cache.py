@@ -0,0 +1,447 @@
+"""
+Persistent on-disk cache of data extracted from a model file.
+
+Post-processing scripts and reporting jobs re-read the same geometry, storeys,
+materials and results of a model through COM on every run. ModelCache stores them
+once as NumPy .npy files (fixed-width numeric and text columns) in a cache directory
+keyed by the model file: its path, size, modification time and a fingerprint of its
+content. Later runs, including parallel jobs, open the columns memory-mapped, which
+costs milliseconds and no COM calls at all.
+
+Layout:
+    <cache_root>/<model name>-<key hash>/key.json
+    <cache_root>/<model name>-<key hash>/<dataset>/index.json
+    <cache_root>/<model name>-<key hash>/<dataset>/part-00000/<field>.npy
+
+All datasets are stored in N, mm & MPa whatever the present units of the job
+which extracted them, so jobs running in other units read the same numbers (convert
+them with unit_state.convert if needed). The units are recorded in index.json, and
+datasets stored in other units count as not cached.
+
+A dataset is written under a temporary name and renamed when complete, so readers
+never see half-written data. Saving the model changes its size or mtime, which gives
+a new cache directory; prune() removes the stale ones.
+
+Datasets filled by the extract_* functions below:
+- "points": Name, X, Y, Z
+- "areas": Name, NumOfPts, Pt1 ... Pt4, Prop
+- "frames": Name, PtI, PtJ, Length, IsColumn
+- "stories": the StoryTable columns, StoryTable(**cache.get("stories")) rebuilds it
+- "materials": Name, MatType, Fc, Fy, Fu, E, U, A, Weight
+- results: one part per ResultChunk, see cached_results (fields converted as
+  listed in RESULT_QUANTITIES)
+
+Example:
+>>> cache = ModelCache.for_model(sap_model)
+>>> points = cache.get_or_extract("points", extract_points, sap_model)
+>>> points["X"]
+memmap([ 0. ,  8.1, 16.2, ...])
+>>> chunks = cached_results(cache, sap_model, "story_drifts", combos=["ULS1"])
+>>> max_abs_by(chunks, "Drift", by="Story")
+"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+from geometry_backends import AREA_SECTION_TABLE, AREA_TABLE, BEAM_TABLE, COLUMN_TABLE
+from get_results import ResultChunk, iter_results
+from material_prop import snapshot_materials
+from story_table import StoryTable
+from unit_state import UNIT_NAMES, convert
+
+DEFAULT_CACHE_ROOT = os.path.join(os.path.expanduser("~"), ".etabs_model_cache")
+
+# eUnits code all datasets are stored in
+CACHE_UNITS = 9  # N, mm
+
+# Result table: {field: quantity} of the fields converted to CACHE_UNITS, the other
+# numeric fields (rotations, drifts, angles, step numbers) have no units
+RESULT_QUANTITIES = {
+    "joint_displacements": {"U1": "length", "U2": "length", "U3": "length"},
+    "frame_forces": {
+        "ObjSta": "length", "ElmSta": "length", "P": "force", "V2": "force", "V3": "force",
+        "T": "moment", "M2": "moment", "M3": "moment",
+    },
+    "area_stresses": {
+        field: "stress"
+        for field in (
+            "S11Top", "S22Top", "S12Top", "SMaxTop", "SMinTop", "SVMTop",
+            "S11Bot", "S22Bot", "S12Bot", "SMaxBot", "SMinBot", "SVMBot",
+            "S13Avg", "S23Avg", "SMaxAvg",
+        )
+    },
+    "story_drifts": {"X": "length", "Y": "length", "Z": "length"},
+}
+
+
+def file_fingerprint(path, block_size=1 << 20):
+    """
+    SHA-1 of the file size and three blocks (start, middle, end) of the file.
+    Cheap for model files of hundreds of MB, and catches edits which keep the size
+    and the modification time.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(path, "rb") as f:
+        for offset in sorted({0, max(size // 2 - block_size // 2, 0), max(size - block_size, 0)}):
+            f.seek(offset)
+            digest.update(f.read(block_size))
+    return digest.hexdigest()
+
+
+def model_cache_key(model_path):
+    """
+    Returns the key of a model file: normalised path, size, mtime and fingerprint.
+    """
+    stat = os.stat(model_path)
+    return {
+        "model_path": os.path.normcase(os.path.abspath(model_path)),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "fingerprint": file_fingerprint(model_path),
+    }
+
+
+def _write_json(path, data):
+    temp_path = "{}.{}.tmp".format(path, uuid.uuid4().hex)
+    with open(temp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def _fixed_width(values):
+    array = np.asarray(values)
+    if array.dtype == object:
+        array = array.astype(str)
+    return np.ascontiguousarray(array)
+
+
+class ModelCache:
+    """
+    Cache directory of one version of a model file.
+
+    Parameters:
+    - model_path (str): Model file (.EDB), it must exist.
+    - cache_root (str, optional): Directory holding the caches of all models.
+        Default is ~/.etabs_model_cache.
+    """
+
+    def __init__(self, model_path, cache_root=DEFAULT_CACHE_ROOT):
+        self.key = model_cache_key(model_path)
+        self.cache_root = cache_root
+        digest = hashlib.sha1(json.dumps(self.key, sort_keys=True).encode()).hexdigest()
+        self._stem = os.path.splitext(os.path.basename(model_path))[0]
+        self.directory = os.path.join(cache_root, "{}-{}".format(self._stem, digest[:16]))
+        os.makedirs(self.directory, exist_ok=True)
+        key_path = os.path.join(self.directory, "key.json")
+        if not os.path.exists(key_path):
+            _write_json(key_path, self.key)
+
+    @classmethod
+    def for_model(cls, sap_model, cache_root=DEFAULT_CACHE_ROOT):
+        """
+        Cache of the model open in ETABS (one GetModelFilename call).
+        """
+        model_path = sap_model.GetModelFilename()
+        if not model_path:
+            raise ValueError("The model has not been saved, it has no file to key the cache on")
+        return cls(model_path, cache_root)
+
+    def __repr__(self):
+        return "ModelCache({!r})".format(self.directory)
+
+    def __contains__(self, dataset):
+        try:
+            index = self._index(dataset)
+        except (OSError, ValueError):
+            return False
+        # Datasets of older versions were stored in the units of the extracting job
+        return index.get("units") == UNIT_NAMES[CACHE_UNITS]
+
+    def datasets(self):
+        return sorted(name for name in os.listdir(self.directory) if name in self)
+
+    def put(self, dataset, columns, meta=None):
+        """
+        Store a dataset of one part. columns is a dict {field: array}, all of the
+        same length.
+        """
+        self.put_parts(dataset, [(meta or {}, columns)])
+
+    def put_parts(self, dataset, parts):
+        """
+        Store a dataset of several parts, e.g. one per result chunk. The columns must
+        be in CACHE_UNITS.
+
+        Parameters:
+        - dataset (str): Dataset name, also its directory name.
+        - parts: Iterable of (meta, columns). meta is a JSON-serialisable dict kept
+            in the index, columns a dict {field: array}.
+        """
+        final_dir = os.path.join(self.directory, dataset)
+        temp_dir = "{}.{}.tmp".format(final_dir, uuid.uuid4().hex)
+        os.makedirs(temp_dir)
+        index = {"units": UNIT_NAMES[CACHE_UNITS], "parts": []}
+        try:
+            for k, (meta, columns) in enumerate(parts):
+                part_name = "part-{:05d}".format(k)
+                os.makedirs(os.path.join(temp_dir, part_name))
+                rows = None
+                for field, values in columns.items():
+                    array = _fixed_width(values)
+                    if rows is None:
+                        rows = len(array)
+                    elif len(array) != rows:
+                        raise ValueError(f"Column {field} of {dataset} has {len(array)} rows, expected {rows}")
+                    np.save(os.path.join(temp_dir, part_name, field + ".npy"), array)
+                index["parts"].append(
+                    {"name": part_name, "rows": rows or 0, "fields": list(columns), "meta": meta}
+                )
+            _write_json(os.path.join(temp_dir, "index.json"), index)
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        if os.path.exists(final_dir):
+            shutil.rmtree(final_dir, ignore_errors=True)
+        try:
+            os.replace(temp_dir, final_dir)
+        except OSError:
+            # Another job stored the same dataset in the meantime, keep theirs
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _load(self, dataset, part):
+        columns = {}
+        for field in part["fields"]:
+            path = os.path.join(self.directory, dataset, part["name"], field + ".npy")
+            # Empty arrays cannot be memory-mapped
+            columns[field] = np.load(path, mmap_mode="r" if part["rows"] else None)
+        return columns
+
+    def _index(self, dataset):
+        with open(os.path.join(self.directory, dataset, "index.json")) as f:
+            return json.load(f)
+
+    def iter_parts(self, dataset):
+        """
+        Yield (meta, columns) for every part of a dataset, columns memory-mapped.
+        """
+        for part in self._index(dataset)["parts"]:
+            yield part["meta"], self._load(dataset, part)
+
+    def get(self, dataset):
+        """
+        Columns of a dataset, memory-mapped if it has one part (concatenated, i.e.
+        copied, if it has several). Returns None if the dataset is not cached.
+        """
+        if dataset not in self:
+            return None
+        parts = self._index(dataset)["parts"]
+        if len(parts) == 1:
+            return self._load(dataset, parts[0])
+        loaded = [self._load(dataset, part) for part in parts]
+        fields = parts[0]["fields"] if parts else []
+        return {field: np.concatenate([columns[field] for columns in loaded]) for field in fields}
+
+    def get_or_extract(self, dataset, extract, sap_model):
+        """
+        Columns of a dataset, extracted with extract(sap_model) and stored first if
+        it is not cached yet.
+        """
+        if dataset not in self:
+            self.put(dataset, extract(sap_model))
+        return self.get(dataset)
+
+    def prune(self):
+        """
+        Remove the cache directories of older versions of the same model file.
+
+        Returns:
+        - removed (list): Removed directories.
+        """
+        removed = []
+        for name in os.listdir(self.cache_root):
+            directory = os.path.join(self.cache_root, name)
+            if directory == self.directory or not name.startswith(self._stem + "-"):
+                continue
+            try:
+                with open(os.path.join(directory, "key.json")) as f:
+                    key = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if key.get("model_path") == self.key["model_path"]:
+                shutil.rmtree(directory, ignore_errors=True)
+                removed.append(directory)
+        return removed
+
+
+def read_table_columns(sap_model, table_key):
+    """
+    Read a database table with one GetTableForEditingArray call.
+
+    Returns:
+    - columns (dict): {field: array of str}, empty if the table could not be read.
+    """
+    ret = sap_model.DatabaseTables.GetTableForEditingArray(table_key, "")
+    if ret[-1] != 0:
+        print(f"Error reading table {table_key}. Return code: {ret[-1]}")
+        return {}
+    fields, num_records, data = list(ret[1]), ret[2], ret[3]
+    if not fields:
+        return {}
+    rows = np.asarray(data, dtype=str).reshape(num_records, len(fields))
+    return {field: rows[:, k] for k, field in enumerate(fields)}
+
+
+def _to_cache_units(columns, quantities, present):
+    # Columns with the fields of quantities converted from the present units
+    return {
+        field: convert(values, quantities[field], present, CACHE_UNITS) if field in quantities else values
+        for field, values in columns.items()
+    }
+
+
+def extract_points(sap_model):
+    """
+    All joints with one PointObj.GetAllPoints call, coordinates in mm.
+    """
+    present = sap_model.GetPresentUnits()
+    ret = sap_model.PointObj.GetAllPoints()
+    return {
+        "Name": np.asarray(ret[1], dtype=str),
+        "X": convert(ret[2], "length", present, CACHE_UNITS),
+        "Y": convert(ret[3], "length", present, CACHE_UNITS),
+        "Z": convert(ret[4], "length", present, CACHE_UNITS),
+    }
+
+
+def extract_areas(sap_model, max_points=4):
+    """
+    Area connectivity and section properties, one table read each.
+    """
+    connectivity = read_table_columns(sap_model, AREA_TABLE)
+    sections = read_table_columns(sap_model, AREA_SECTION_TABLE)
+    names = connectivity.get("UniqueName", np.array([], dtype=str))
+    columns = {
+        "Name": names,
+        "NumOfPts": connectivity.get("NumOfPts", np.array([], dtype=str)).astype(int),
+    }
+    for k in range(max_points):
+        columns["Pt{}".format(k + 1)] = connectivity.get(
+            "UniquePt{}".format(k + 1), np.full(len(names), "")
+        )
+    prop_of = dict(zip(sections.get("UniqueName", []), sections.get("SectionProperty", [])))
+    columns["Prop"] = np.asarray([prop_of.get(name, "") for name in names.tolist()], dtype=str)
+    return columns
+
+
+def extract_frames(sap_model):
+    """
+    Column and beam connectivity, one table read each, lengths in mm.
+    """
+    present = sap_model.GetPresentUnits()
+    parts = []
+    for table_key, is_column in ((COLUMN_TABLE, True), (BEAM_TABLE, False)):
+        table = read_table_columns(sap_model, table_key)
+        if table:
+            parts.append((table, is_column))
+    return {
+        "Name": np.concatenate([t["UniqueName"] for t, _ in parts] or [np.array([], dtype=str)]),
+        "PtI": np.concatenate([t["UniquePtI"] for t, _ in parts] or [np.array([], dtype=str)]),
+        "PtJ": np.concatenate([t["UniquePtJ"] for t, _ in parts] or [np.array([], dtype=str)]),
+        "Length": convert(
+            np.concatenate([t["Length"].astype(float) for t, _ in parts] or [np.array([])]),
+            "length", present, CACHE_UNITS,
+        ),
+        "IsColumn": np.concatenate(
+            [np.full(len(t["UniqueName"]), c) for t, c in parts] or [np.array([], dtype=bool)]
+        ),
+    }
+
+
+def extract_stories(sap_model):
+    """
+    StoryTable columns (bottom up, base first), elevations and heights in mm.
+    """
+    present = sap_model.GetPresentUnits()
+    stories = StoryTable.from_model(sap_model)
+    return {
+        "names": stories.names,
+        "elevations": convert(stories.elevations, "length", present, CACHE_UNITS),
+        "heights": convert(stories.heights, "length", present, CACHE_UNITS),
+        "is_master": stories.is_master,
+        "similar_to": stories.similar_to,
+        "splice_above": stories.splice_above,
+        "splice_height": convert(stories.splice_height, "length", present, CACHE_UNITS),
+    }
+
+
+def extract_materials(sap_model):
+    """
+    Main properties of the concrete and rebar materials, in units mm, N & MPa
+    (see snapshot_materials). Values which do not apply to a material are NaN.
+    """
+    snapshot = snapshot_materials(sap_model)
+    names = list(snapshot)
+    nan = float("nan")
+    columns = {field: [] for field in ("Fc", "Fy", "Fu", "E", "U", "A", "Weight")}
+    for name in names:
+        definition = snapshot[name]
+        concrete = definition.get("concrete")
+        rebar = definition.get("rebar")
+        isotropic = definition.get("isotropic")
+        uniaxial = definition.get("uniaxial")
+        columns["Fc"].append(concrete[0] if concrete else nan)
+        columns["Fy"].append(rebar[0] if rebar else nan)
+        columns["Fu"].append(rebar[1] if rebar else nan)
+        if isotropic:
+            columns["E"].append(isotropic[0])
+            columns["U"].append(isotropic[1])
+            columns["A"].append(isotropic[2])
+        else:
+            columns["E"].append(uniaxial[0] if uniaxial else nan)
+            columns["U"].append(nan)
+            columns["A"].append(uniaxial[1] if uniaxial else nan)
+        columns["Weight"].append(definition.get("weight", nan))
+    result = {
+        "Name": np.asarray(names, dtype=str),
+        "MatType": np.asarray([snapshot[n]["mat_type"] for n in names], dtype=int),
+    }
+    result.update({field: np.asarray(values, dtype=float) for field, values in columns.items()})
+    return result
+
+
+def results_dataset_name(table, cases=(), combos=(), groups=("All",)):
+    """
+    Dataset name of a result selection, e.g. "results-story_drifts-1a2b3c4d5e".
+    """
+    selection = json.dumps([list(cases), list(combos), list(groups)])
+    return "results-{}-{}".format(table, hashlib.sha1(selection.encode()).hexdigest()[:10])
+
+
+def cached_results(cache, sap_model, table, cases=(), combos=(), groups=("All",)):
+    """
+    Like iter_results, but served from the cache and in N, mm & MPa (see
+    RESULT_QUANTITIES). On a miss the chunks are extracted through COM, converted
+    and stored part by part first.
+
+    Returns:
+    - Generator of ResultChunk with memory-mapped columns.
+    """
+    dataset = results_dataset_name(table, cases, combos, groups)
+    if dataset not in cache:
+        present = sap_model.GetPresentUnits()
+        quantities = RESULT_QUANTITIES[table]
+        chunks = iter_results(sap_model, table, cases, combos, groups)
+        cache.put_parts(
+            dataset,
+            (
+                ({"case": c.case, "group": c.group}, _to_cache_units(c.columns, quantities, present))
+                for c in chunks
+            ),
+        )
+    for meta, columns in cache.iter_parts(dataset):
+        yield ResultChunk(table, meta["case"], meta["group"], columns)
@@ -0,0 +1,420 @@
+"""
+Declarative model spec compiled into an ordered plan of API operations.
+
+Instead of editing main.py, a model is described in a JSON (or TOML) spec: units,
+materials, slab properties, grid, storeys, slabs and, optionally, frames.
+compile_spec turns the spec into a Plan, a list of PlanSteps in dependency order,
+grouped by the table they write:
+- the grid and storeys come first, since they initialise a new model; the model is
+  initialised in the units of the spec, so the grid, storeys and everything after
+  them are given in those units,
+- materials, slab properties and slabs are deduplicated, and all slab ranges with
+  the same property, offset and storeys are drawn in one draw_slabs call,
+- with the "tables" geometry backend all slabs and frames are applied in one
+  table edit.
+
+The steps execute through the existing functions (create_grid_system /
+create_custom_grid, define_stories, sync_eurocode_materials,
+set_slab_prop, draw_slabs, draw_frames).
+
+A dry run executes the plan against a FakeSapModel, counts the API calls of every
+step and predicts the COM time with a per-call cost model, so the cost of a build
+can be seen (and cut) before ETABS is opened.
+
+Spec:
+{
+    "units": "kN_m",                  # or an eUnits code
+    "grid": {"x": [0, 8.1, 16.2], "y": [0, 4.365, 8.73]},
+    "stories": {"heights": [3.88, 3.88, 3.88]},
+    "materials": {"eurocode": ["EC-C30/37", "fy500"], "delete_existing": false},
+    "slab_props": ["MyRC125mmSlab"],
+    "slabs": [{"prop": "MyRC125mmSlab", "bays": [[0, 2, 0, 2]], "offset": 0.0,
+               "split_bays": false, "stories": ["Story1", "Story2"]}],
+    "frames": {"column_prop": "C600x600", "beam_prop": "B300x600"},
+    "geometry_backend": "api",        # or "tables"
+    "share_joints": false
+}
+"materials": {"eurocode": "all"} uses all of eurocode_material_definitions(), the
+names may also be any material of the EC2 catalog (material_catalog.py), e.g.
+"EC-C50/60" or "EC-B500B". With "backend": "tables" the materials are written with
+one table edit (apply_material_tables) instead of being synchronised call by call.
+
+Usage:
+    python model_spec.py example_model_spec.json --dry-run
+    python model_spec.py example_model_spec.json --dry-run --cost-model sap_model_profile.json
+    python model_spec.py example_model_spec.json
+    python model_spec.py example_model_spec.json --update  (see model_update.py)
+"""
+import argparse
+import contextlib
+import json
+import os
+from collections import Counter
+
+import numpy as np
+
+from create_grid_system import create_grid_system
+from create_ununiformed_grid_system import create_custom_grid
+from draw_frames import draw_frames
+from draw_slabs import draw_slabs
+from geometry_backends import make_geometry_backend
+from get_storey_data import get_story_data
+from grid import Grid
+from joint_index import JointIndex
+from material_prop import apply_material_tables, material_definitions, sync_eurocode_materials
+from set_slab_prop import set_slab_prop
+from story_table import StoryTable, define_stories
+from unit_state import unit_code
+
+# Seconds per API call used when no cost model is given, see load_cost_model
+DEFAULT_CALL_COST = 0.0005
+
+
+class PlanStep:
+    """
+    One operation of a plan.
+
+    Attributes:
+    - name (str): Description printed in the plan.
+    - table (str): Part of the model the step writes, e.g. "PropArea".
+    - run (callable): run(sap_model, context), context is a dict shared by the steps.
+    - calls (Counter): API calls of the step, filled in by a dry run.
+    """
+
+    def __init__(self, name, table, run):
+        self.name = name
+        self.table = table
+        self.run = run
+        self.calls = Counter()
+
+    def __repr__(self):
+        return "PlanStep({!r}, {!r})".format(self.name, self.table)
+
+
+class Plan:
+    """
+    Ordered list of PlanSteps, with the notes of the compiler (dropped duplicates,
+    merged operations).
+    """
+
+    def __init__(self, steps, notes):
+        self.steps = steps
+        self.notes = notes
+
+    def __len__(self):
+        return len(self.steps)
+
+    def execute(self, sap_model):
+        """
+        Run all steps against a model.
+
+        Returns:
+        - context (dict): State left by the steps, e.g. "grid", "slabs", "frames".
+        """
+        context = {}
+        for step in self.steps:
+            step.run(sap_model, context)
+        return context
+
+
+def load_spec(path):
+    """
+    Read a spec from a .json or .toml file.
+    """
+    if path.lower().endswith(".toml"):
+        import tomllib  # Python 3.11+
+
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path) as f:
+        return json.load(f)
+
+
+def _is_uniform(coordinates, tol=1e-9):
+    spacings = np.diff(np.asarray(coordinates, dtype=float))
+    return len(spacings) > 0 and np.all(np.abs(spacings - spacings[0]) <= tol)
+
+
+def _grid_steps(spec, notes):
+    grid_spec = spec["grid"]
+    heights = [float(h) for h in spec["stories"]["heights"]]
+    x, y = list(grid_spec["x"]), list(grid_spec["y"])
+    units = spec.get("units", "kN_m")
+    code = unit_code(units)
+    if code != 6:
+        notes.append("the model is initialised in {}".format(units))
+
+    if _is_uniform(x) and _is_uniform(y) and len(heights) > 1:
+
+        def run(sap_model, context):
+            context["grid"] = create_grid_system(sap_model, heights, x, y, units=code)
+
+        return [PlanStep("grid and {} storeys (create_grid_system)".format(len(heights)), "File/GridSys/Story", run)]
+
+    def run_grid(sap_model, context):
+        create_custom_grid(
+            sap_model, heights, x, y,
+            x_labels=grid_spec.get("x_labels"), y_labels=grid_spec.get("y_labels"),
+            units=code,
+        )
+        context["grid"] = Grid(x, y, np.concatenate(([0.0], np.cumsum(heights))))
+
+    steps = [PlanStep("grid, {} x {} lines (create_custom_grid)".format(len(x), len(y)), "File/GridSys", run_grid)]
+    typical = heights[1] if len(heights) > 1 else heights[0]
+    if any(h != typical for h in heights[1:]):
+
+        def run_stories(sap_model, context):
+            define_stories(sap_model, heights)
+
+        steps.append(PlanStep("{} storeys (define_stories)".format(len(heights)), "Story", run_stories))
+    else:
+        notes.append("storeys are created by NewGridOnly, no separate storey step")
+    return steps
+
+
+def _material_steps(spec, notes):
+    material_spec = spec.get("materials")
+    if not material_spec:
+        return []
+    names = material_spec.get("eurocode", "all")
+    if names != "all":
+        unique_names = list(dict.fromkeys(names))
+        if len(unique_names) != len(names):
+            notes.append("{} duplicate materials dropped".format(len(names) - len(unique_names)))
+        names = unique_names
+    definitions = material_definitions(names)
+    delete_existing = bool(material_spec.get("delete_existing", False))
+
+    if material_spec.get("backend", "api") == "tables":
+        if delete_existing:
+            raise ValueError('"delete_existing" is only supported by the "api" material backend')
+
+        def run(sap_model, context):
+            context["materials"] = apply_material_tables(sap_model, definitions)
+
+        return [PlanStep("{} materials (apply_material_tables)".format(len(definitions)), "DatabaseTables", run)]
+
+    def run(sap_model, context):
+        context["materials"] = sync_eurocode_materials(sap_model, delete_existing, definitions)
+
+    return [PlanStep("{} materials (sync_eurocode_materials)".format(len(definitions)), "PropMaterial", run)]
+
+
+def _slab_prop_steps(spec, notes):
+    names = [p if isinstance(p, str) else p["name"] for p in spec.get("slab_props", [])]
+    unique_names = list(dict.fromkeys(names))
+    if len(unique_names) != len(names):
+        notes.append("{} duplicate slab properties dropped".format(len(names) - len(unique_names)))
+    if not unique_names:
+        return []
+
+    def run(sap_model, context):
+        for name in unique_names:
+            ret = set_slab_prop(sap_model, name)
+            if ret != 0:
+                print(f"Error running function SetSlab for {name}. Return code: {ret}")
+
+    return [PlanStep("{} slab properties (set_slab_prop)".format(len(unique_names)), "PropArea", run)]
+
+
+def _geometry_context(spec, sap_model, context):
+    if "backend" not in context:
+        kind = spec.get("geometry_backend", "api")
+        joints = None
+        if spec.get("share_joints") and kind == "api":
+            joints = JointIndex(sap_model, load_existing=True)
+        context["joints"] = joints
+        context["backend"] = make_geometry_backend(sap_model, kind, joints)
+    return context["backend"], context["joints"]
+
+
+def _slab_steps(spec, notes):
+    # (prop, offset, split, stories) -> bay ranges, in spec order
+    groups = {}
+    num_ranges = 0
+    for slab in spec.get("slabs", []):
+        stories = tuple(slab["stories"]) if slab.get("stories") else None
+        key = (slab["prop"], float(slab.get("offset", 0.0)), bool(slab.get("split_bays", False)), stories)
+        ranges = groups.setdefault(key, {})
+        for bay_range in slab["bays"]:
+            num_ranges += 1
+            ranges[tuple(int(v) for v in bay_range)] = None
+    num_unique = sum(len(r) for r in groups.values())
+    if num_unique != num_ranges:
+        notes.append("{} duplicate slab ranges dropped".format(num_ranges - num_unique))
+    if len(groups) < len(spec.get("slabs", [])):
+        notes.append("{} slab entries merged into {} draw_slabs calls".format(len(spec["slabs"]), len(groups)))
+
+    steps = []
+    for (prop, offset, split_bays, stories), ranges in groups.items():
+
+        def run(sap_model, context, prop=prop, offset=offset, split_bays=split_bays, stories=stories, ranges=list(ranges)):
+            backend, joints = _geometry_context(spec, sap_model, context)
+            story_elevations = story_names = None
+            if stories is not None:
+                table = StoryTable.from_model(sap_model)
+                story_names = list(stories)
+                story_elevations = [table.elevations[table.index_of(name)] for name in story_names]
+            names = draw_slabs(
+                sap_model, context["grid"], ranges, prop,
+                story_elevations=story_elevations, story_names=story_names,
+                offset=offset, split_bays=split_bays, backend=backend,
+            )
+            context.setdefault("slabs", {}).update(names)
+
+        label = "{} slab ranges of {} on {} (draw_slabs)".format(
+            len(ranges), prop, "all storeys" if stories is None else ", ".join(stories)
+        )
+        steps.append(PlanStep(label, "AreaObj", run))
+
+    return steps
+
+
+def _frame_steps(spec, notes):
+    frame_spec = spec.get("frames")
+    if not frame_spec:
+        return []
+
+    def run(sap_model, context):
+        backend, _ = _geometry_context(spec, sap_model, context)
+        context["frames"] = draw_frames(
+            sap_model, context["grid"], get_story_data(sap_model),
+            frame_spec["column_prop"], frame_spec["beam_prop"],
+            x_indices=frame_spec.get("x_indices"), y_indices=frame_spec.get("y_indices"),
+            backend=backend,
+        )
+
+    return [PlanStep("columns and beams (draw_frames)", "FrameObj", run)]
+
+
+def _apply_steps(spec, geometry_steps):
+    if not geometry_steps or spec.get("geometry_backend", "api") != "tables":
+        return []
+
+    def apply(sap_model, context):
+        context["backend"].apply()
+
+    return [PlanStep("apply geometry tables (one table edit)", "DatabaseTables", apply)]
+
+
+def compile_spec(spec):
+    """
+    Compile a spec into a Plan.
+
+    Parameters:
+    - spec (dict): Model spec, see the module docstring.
+
+    Returns:
+    - plan (Plan)
+    """
+    notes = []
+    steps = []
+    steps += _grid_steps(spec, notes)
+    steps += _material_steps(spec, notes)
+    steps += _slab_prop_steps(spec, notes)
+    geometry_steps = _slab_steps(spec, notes) + _frame_steps(spec, notes)
+    steps += geometry_steps
+    steps += _apply_steps(spec, geometry_steps)
+    return Plan(steps, notes)
+
+
+def load_cost_model(path=None, default=DEFAULT_CALL_COST):
+    """
+    Per-call cost model, {method path: seconds} plus a "default" entry.
+
+    path may be a JSON file {"default": s, "methods": {path: s}}, or a report
+    written by ProfiledSapModel.write_report, whose mean call times are used.
+    """
+    cost_model = {"default": default}
+    if path is None:
+        return cost_model
+    with open(path) as f:
+        data = json.load(f)
+    methods = data.get("methods", {})
+    if isinstance(methods, list):
+        methods = {row["method"]: row["mean_s"] for row in methods}
+    cost_model.update(methods)
+    if "default" in data:
+        cost_model["default"] = data["default"]
+    return cost_model
+
+
+def predict_time(calls, cost_model):
+    return sum(count * cost_model.get(method, cost_model["default"]) for method, count in calls.items())
+
+
+def dry_run(plan):
+    """
+    Execute the plan against a FakeSapModel and record the API calls of every step
+    in step.calls.
+
+    Returns:
+    - total (Counter): API calls of the whole plan.
+    """
+    from fake_sap_model import FakeSapModel
+
+    sap_model = FakeSapModel(sleep=False)
+    context = {}
+    total = Counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for step in plan.steps:
+            sap_model.reset_counters()
+            step.run(sap_model, context)
+            step.calls = Counter(sap_model.call_counts)
+            total.update(step.calls)
+    return total
+
+
+def print_plan(plan, cost_model=None, details=True):
+    """
+    Print the steps of a dry-run plan with their call counts and predicted time.
+    """
+    cost_model = cost_model or load_cost_model()
+    print("{:>3}  {:<62} {:<18} {:>8} {:>10}".format("#", "step", "table", "calls", "est. [s]"))
+    total_calls = 0
+    total_time = 0.0
+    for k, step in enumerate(plan.steps):
+        calls = sum(step.calls.values())
+        seconds = predict_time(step.calls, cost_model)
+        total_calls += calls
+        total_time += seconds
+        print("{:>3}  {:<62} {:<18} {:>8} {:>10.3f}".format(k + 1, step.name, step.table, calls, seconds))
+        if details:
+            for method, count in step.calls.most_common():
+                print("{:>3}    {:<60} {:<18} {:>8}".format("", method, "", count))
+    print("Total: {} API calls, predicted COM time {:.3f} s".format(total_calls, total_time))
+    for note in plan.notes:
+        print("Note: " + note)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build an ETABS model from a spec.")
+    parser.add_argument("spec", help="Model spec, .json or .toml")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan with predicted cost, do not connect to ETABS")
+    parser.add_argument("--cost-model", help="Per-call cost JSON or ProfiledSapModel report")
+    parser.add_argument("--latency", type=float, default=DEFAULT_CALL_COST, help="Default seconds per call")
+    parser.add_argument("--summary", action="store_true", help="Only print one line per step")
+    parser.add_argument("--update", action="store_true", help="Update the open model incrementally instead of rebuilding it")
+    args = parser.parse_args(argv)
+
+    plan = compile_spec(load_spec(args.spec))
+    if args.dry_run:
+        cost_model = load_cost_model(args.cost_model, args.latency)
+        dry_run(plan)
+        print_plan(plan, cost_model, details=not args.summary)
+        return
+
+    from create_object import connect_to_etabs, disconnect_from_etabs
+
+    etabs_object, sap_model = connect_to_etabs()
+    if args.update:
+        from model_update import update_model
+
+        update_model(sap_model, load_spec(args.spec))
+    else:
+        plan.execute(sap_model)
+    disconnect_from_etabs(etabs_object, sap_model)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Base-model templates: build the setup shared by all variants of a study once.
+
+Every variant of a study repeats the same setup (units, Eurocode materials, slab
+properties) before its own grid, storeys and slabs. ensure_template builds that
+shared prefix once and saves it as a template model, named after a hash of the
+prefix part of the spec, so it is only rebuilt when units, materials or slab
+properties change. build_variant then copies the template file, opens the copy and
+applies only the variant-specific part of the spec with update_model, which adds the
+grid, storeys and slabs without reinitialising the model.
+
+Example:
+>>> spec = load_spec("example_model_spec.json")
+>>> template_path = ensure_template(sap_model, spec, "templates")
+>>> for k, bay_x in enumerate([6.0, 7.2, 8.1]):
+...     spec["grid"]["x"] = [bay_x * i for i in range(8)]
+...     build_variant(sap_model, spec, f"variants/option_{k}.EDB", "templates")
+
+With sweep_runner, call ensure_template once before run_sweep and let the job
+function call build_variant.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from model_spec import compile_spec
+from model_update import update_model
+
+# Spec keys making up the shared prefix
+PREFIX_KEYS = ("units", "materials", "slab_props")
+
+# Grid and storeys of the template, replaced by every variant
+_PLACEHOLDER = {"grid": {"x": [0.0, 1.0], "y": [0.0, 1.0]}, "stories": {"heights": [3.0, 3.0]}}
+
+
+def prefix_spec(spec):
+    return {key: spec[key] for key in PREFIX_KEYS if key in spec}
+
+
+def prefix_hash(spec):
+    """
+    Content hash of the prefix part of a spec.
+    """
+    text = json.dumps(prefix_spec(spec), sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def template_path(spec, template_dir="templates"):
+    return os.path.abspath(os.path.join(template_dir, "template-{}.EDB".format(prefix_hash(spec))))
+
+
+def _wait_for(path, timeout):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Timed out waiting for {path}")
+        time.sleep(0.2)
+
+
+def ensure_template(sap_model, spec, template_dir="templates", timeout=600):
+    """
+    Returns the template model of the prefix of spec, building and saving it with
+    sap_model first if it does not exist yet.
+
+    The template is complete once its .json sidecar (the prefix spec) is written.
+    When several processes need the same missing template, one builds it and the
+    others wait for it.
+    """
+    path = template_path(spec, template_dir)
+    sidecar = path[:-4] + ".json"
+    if os.path.exists(sidecar):
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    lock = path + ".lock"
+    try:
+        os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        _wait_for(sidecar, timeout)
+        return path
+
+    try:
+        prefix = dict(prefix_spec(spec), **_PLACEHOLDER)
+        compile_spec(prefix).execute(sap_model)
+        ret = sap_model.File.Save(path)
+        if ret != 0:
+            raise RuntimeError(f"Error saving template {path}. Return code: {ret}")
+        with open(sidecar, "w") as f:
+            json.dump(prefix_spec(spec), f, indent=2, sort_keys=True)
+        print(f"Template {path} saved")
+    finally:
+        os.remove(lock)
+    return path
+
+
+def open_variant(sap_model, template, variant_path):
+    """
+    Copy the template model to variant_path and open the copy.
+
+    Returns:
+    - ret: Return value of File.OpenFile, 0 on success.
+    """
+    variant_path = os.path.abspath(variant_path)
+    os.makedirs(os.path.dirname(variant_path), exist_ok=True)
+    shutil.copyfile(template, variant_path)
+    ret = sap_model.File.OpenFile(variant_path)
+    if ret != 0:
+        print(f"Error opening {variant_path}. Return code: {ret}")
+    return ret
+
+
+def build_variant(sap_model, spec, variant_path, template_dir="templates", save=True):
+    """
+    Build a variant from the template of its prefix: open a copy of the template and
+    apply the rest of the spec incrementally.
+
+    Returns:
+    - summary (dict): Summary of update_model.
+    """
+    template = ensure_template(sap_model, spec, template_dir)
+    ret = open_variant(sap_model, template, variant_path)
+    if ret != 0:
+        return {"ret": ret}
+    variant = {key: value for key, value in spec.items() if key not in ("materials", "slab_props")}
+    summary = update_model(sap_model, variant)
+    if save:
+        sap_model.File.Save(os.path.abspath(variant_path))
+    return summary
@@ -0,0 +1,334 @@
+"""
+Incremental model update: apply a spec to the open model without rebuilding it.
+
+create_grid_system and create_custom_grid start with InitializeNewModel, so changing
+one storey height or bay width regenerates every material, property and slab.
+update_model reads the current state of the model once, diffs it against the spec
+(same format as model_spec.py) and only writes what differs:
+- materials: sync_eurocode_materials, which already only writes what differs,
+- slab properties: only the missing ones are added,
+- storeys: one define_stories call if the names or heights changed,
+- grid lines: rewritten if the ordinates or labels changed,
+- slabs: matched to the spec by storey name and grid bay range, then added, moved
+  (their joints are moved to the new grid/storey coordinates), re-assigned or
+  deleted.
+Grid lines, joints and slabs are written with the database tables and applied in one
+ApplyEditedTables call, so the cost does not grow with the number of changes.
+
+State read: Story.GetStories, PropArea.GetNameList, and the grid line, point, area
+connectivity and area section tables (one call each).
+
+Notes:
+- Slabs are matched on the grid lines and storeys the model has before the update.
+  Areas which do not lie on the grid (drawn by hand) are never touched.
+- Frames are not diffed; joints shared with slabs move with them.
+- Joints left without objects by deleted slabs stay in the model.
+
+Example:
+>>> spec = load_spec("example_model_spec.json")
+>>> spec["stories"]["heights"][2] = 4.2
+>>> update_model(sap_model, spec)["slabs"]
+{'added': 0, 'moved': 8, 'reassigned': 0, 'deleted': 0, 'unchanged': 16}
+"""
+import numpy as np
+
+from create_ununiformed_grid_system import GRID_LINES_FIELDS, GRID_LINES_TABLE, grid_line_records
+from draw_slabs import slab_corners
+from geometry_backends import (
+    AREA_FIELDS,
+    AREA_SECTION_FIELDS,
+    AREA_SECTION_TABLE,
+    AREA_TABLE,
+    POINT_FIELDS,
+    POINT_TABLE,
+    TableGeometryBackend,
+)
+from grid import Grid, grid_line_labels
+from material_prop import material_definitions, sync_eurocode_materials
+from model_cache import read_table_columns
+from set_slab_prop import set_slab_prop
+from story_table import StoryTable, define_stories
+from unit_state import set_present_units
+
+
+class ModelState:
+    """
+    Grid, storeys, slab properties, joints and areas of the model, read once.
+    """
+
+    def __init__(self, sap_model, grid_sys_name="G1"):
+        self.stories = StoryTable.from_model(sap_model)
+        prop_list = sap_model.PropArea.GetNameList()
+        self.slab_props = set(prop_list[1][: prop_list[0]])
+
+        grid_table = read_table_columns(sap_model, GRID_LINES_TABLE)
+        self.grid_lines = {"X (Cartesian)": [], "Y (Cartesian)": []}
+        if grid_table:
+            for name, line_type, label, ordinate in zip(
+                grid_table["Name"], grid_table["LineType"], grid_table["ID"], grid_table["Ordinate"]
+            ):
+                if name == grid_sys_name and line_type in self.grid_lines:
+                    self.grid_lines[line_type].append((float(ordinate), str(label)))
+        for lines in self.grid_lines.values():
+            lines.sort()
+        self.grid = Grid(
+            [o for o, _ in self.grid_lines["X (Cartesian)"]],
+            [o for o, _ in self.grid_lines["Y (Cartesian)"]],
+            self.stories.elevations,
+        )
+
+        points = read_table_columns(sap_model, POINT_TABLE)
+        self.point_names = list(points.get("UniqueName", []))
+        self.point_coords = np.column_stack(
+            [points.get(f, np.array([], dtype=str)).astype(float) for f in ("X", "Y", "Z")]
+        ).reshape(-1, 3)
+
+        areas = read_table_columns(sap_model, AREA_TABLE)
+        self.area_names = list(areas.get("UniqueName", []))
+        num_points = areas.get("NumOfPts", np.array([], dtype=str)).astype(int)
+        self.area_points = []
+        for k in range(len(self.area_names)):
+            self.area_points.append(
+                [str(areas["UniquePt{}".format(p + 1)][k]) for p in range(num_points[k])]
+            )
+        sections = read_table_columns(sap_model, AREA_SECTION_TABLE)
+        self.area_props = dict(zip(sections.get("UniqueName", []), sections.get("SectionProperty", [])))
+
+
+def _desired_stories(spec):
+    heights = [float(h) for h in spec["stories"]["heights"]]
+    names = spec["stories"].get("names") or ["Story{}".format(k + 1) for k in range(len(heights))]
+    return list(names), heights
+
+
+def _desired_slabs(spec, grid, story_names, story_elevations):
+    """
+    {(storey, bay range, offset): (x corners, y corners, z, prop)} of the spec.
+    """
+    elevation_of = dict(zip(story_names, story_elevations))
+    slabs = {}
+    for slab in spec.get("slabs", []):
+        offset = float(slab.get("offset", 0.0))
+        ranges, x, y = slab_corners(grid, slab["bays"], offset, bool(slab.get("split_bays", False)))
+        for story in slab.get("stories") or story_names:
+            z = elevation_of[story]
+            for bay_range, xs, ys in zip(ranges.tolist(), x.tolist(), y.tolist()):
+                slabs[(story, tuple(bay_range), offset)] = (xs, ys, z, slab["prop"])
+    return slabs
+
+
+def _existing_slabs(state, offsets, tol=1e-6):
+    """
+    {(storey, bay range, offset): area name} of the quadrilateral areas of the model
+    which lie on the current grid and storey levels.
+    """
+    index_of = {name: k for k, name in enumerate(state.point_names)}
+    slabs = {}
+    for name, point_names in zip(state.area_names, state.area_points):
+        if len(point_names) != 4 or any(p not in index_of for p in point_names):
+            continue
+        corners = state.point_coords[[index_of[p] for p in point_names]]
+        if np.ptp(corners[:, 2]) > tol:
+            continue
+        level = state.stories.level_index(corners[0, 2], tol)
+        if level <= 0:
+            continue
+        xmin, ymin = corners[:, :2].min(axis=0)
+        xmax, ymax = corners[:, :2].max(axis=0)
+        for offset in offsets:
+            indices = (
+                state.grid.index_x(xmin + offset, tol),
+                state.grid.index_x(xmax - offset, tol),
+                state.grid.index_y(ymin + offset, tol),
+                state.grid.index_y(ymax - offset, tol),
+            )
+            if min(indices) >= 0:
+                key = (str(state.stories.names[level]), tuple(int(i) for i in indices), offset)
+                slabs.setdefault(key, name)
+                break
+    return slabs
+
+
+def _corner_index(x, y, cx, cy):
+    # Corner order of slab_corners: (x1, y1), (x2, y1), (x2, y2), (x1, y2)
+    if y < cy:
+        return 0 if x < cx else 1
+    return 3 if x < cx else 2
+
+
+def update_model(sap_model, spec, delete_unmatched=True, grid_sys_name="G1"):
+    """
+    Bring the open model in line with a spec, writing only what differs.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - spec (dict): Model spec, see model_spec.py.
+    - delete_unmatched (bool, optional): Delete the slabs on the grid which are not
+        in the spec. Default is True.
+    - grid_sys_name (str, optional): Grid system holding the grid lines.
+
+    Returns:
+    - summary (dict): What was changed, per part of the model.
+    """
+    story_names, heights = _desired_stories(spec)
+    unknown = {
+        story for slab in spec.get("slabs", []) for story in slab.get("stories") or ()
+    } - set(story_names)
+    if unknown:
+        raise ValueError("Slabs refer to storeys {} which are not in the spec".format(sorted(unknown)))
+    summary = {"materials": None, "slab_props": [], "stories": False, "grid": False}
+
+    material_spec = spec.get("materials")
+    if material_spec:
+        names = material_spec.get("eurocode", "all")
+        summary["materials"] = sync_eurocode_materials(
+            sap_model,
+            bool(material_spec.get("delete_existing", False)),
+            material_definitions(names if names == "all" else list(dict.fromkeys(names))),
+        )
+    set_present_units(sap_model, spec.get("units", "kN_m"))
+
+    state = ModelState(sap_model, grid_sys_name)
+
+    for prop in dict.fromkeys(p if isinstance(p, str) else p["name"] for p in spec.get("slab_props", [])):
+        if prop not in state.slab_props:
+            ret = set_slab_prop(sap_model, prop)
+            if ret != 0:
+                print(f"Error running function SetSlab for {prop}. Return code: {ret}")
+            summary["slab_props"].append(prop)
+
+    # Storeys
+    current_names = state.stories.names[1:].tolist()
+    current_heights = state.stories.heights[1:]
+    base = float(state.stories.elevations[0]) if len(state.stories) else 0.0
+    if current_names != story_names or not np.allclose(current_heights, heights, atol=1e-9):
+        define_stories(sap_model, heights, story_names, base_elevation=base)
+        summary["stories"] = True
+    story_elevations = base + np.cumsum(heights)
+
+    # Grid lines
+    grid_spec = spec["grid"]
+    x, y = [float(v) for v in grid_spec["x"]], [float(v) for v in grid_spec["y"]]
+    x_labels = grid_spec.get("x_labels") or grid_line_labels(len(x), True)
+    y_labels = grid_spec.get("y_labels") or grid_line_labels(len(y), False)
+    new_grid = Grid(x, y, np.concatenate(([base], story_elevations)))
+    current_x = state.grid_lines["X (Cartesian)"]
+    current_y = state.grid_lines["Y (Cartesian)"]
+    pending = []  # (table, fields, number of records, flat data)
+    if (
+        len(current_x) != len(x)
+        or len(current_y) != len(y)
+        or not np.allclose([o for o, _ in current_x], sorted(x), atol=1e-9)
+        or not np.allclose([o for o, _ in current_y], sorted(y), atol=1e-9)
+        or [l for _, l in current_x] != [str(l) for _, l in sorted(zip(x, x_labels))]
+        or [l for _, l in current_y] != [str(l) for _, l in sorted(zip(y, y_labels))]
+    ):
+        pending.append(
+            (
+                GRID_LINES_TABLE,
+                GRID_LINES_FIELDS,
+                len(x) + len(y),
+                grid_line_records(x, y, x_labels, y_labels, grid_sys_name=grid_sys_name),
+            )
+        )
+        summary["grid"] = True
+
+    # Slabs
+    desired = _desired_slabs(spec, new_grid, story_names, story_elevations)
+    offsets = list(dict.fromkeys([key[2] for key in desired] + [0.0]))
+    existing = _existing_slabs(state, offsets)
+    counts = {"added": 0, "moved": 0, "reassigned": 0, "deleted": 0, "unchanged": 0}
+    point_index = {name: k for k, name in enumerate(state.point_names)}
+    area_index = {name: k for k, name in enumerate(state.area_names)}
+    new_coords = state.point_coords.copy()
+    moved_points = set()
+    new_props = dict(state.area_props)
+    deleted = set()
+
+    for key, area in existing.items():
+        if key not in desired:
+            if delete_unmatched:
+                deleted.add(area)
+                counts["deleted"] += 1
+            continue
+        xs, ys, z, prop = desired[key]
+        cx, cy = sum(xs) / 4, sum(ys) / 4
+        point_names = state.area_points[area_index[area]]
+        rows = [point_index[p] for p in point_names]
+        old = state.point_coords[rows]
+        ocx, ocy = old[:, 0].mean(), old[:, 1].mean()
+        moved = False
+        for point, row, (px, py, _) in zip(point_names, rows, old):
+            corner = _corner_index(px, py, ocx, ocy)
+            target = (xs[corner], ys[corner], z)
+            if not np.allclose(new_coords[row], target, atol=1e-9):
+                if point in moved_points:
+                    print(f"Joint {point} is shared by slabs moving to different places, kept at {tuple(new_coords[row])}")
+                    continue
+                new_coords[row] = target
+                moved_points.add(point)
+                moved = True
+        if new_props.get(area) != prop:
+            new_props[area] = prop
+            counts["reassigned"] += 1
+        if moved:
+            counts["moved"] += 1
+        elif new_props.get(area) == state.area_props.get(area):
+            counts["unchanged"] += 1
+
+    missing = [key for key in desired if key not in existing]
+    backend = TableGeometryBackend(sap_model)
+    backend.reserve_names(state.point_names, state.area_names)
+    for name, (px, py, pz) in zip(state.point_names, new_coords.tolist()):
+        backend.joints.register(name, px, py, pz)
+    for key in missing:
+        xs, ys, z, prop = desired[key]
+        backend.add_areas(np.array([xs]), np.array([ys]), np.full((1, 4), z), prop)
+    counts["added"] = len(missing)
+    # Only areas are queued here, the frame records are empty
+    point_records, area_fields, area_records, section_records = backend.table_records()[:4]
+    summary["slabs"] = counts
+
+    if moved_points or point_records:
+        records = [
+            [name, repr(px), repr(py), repr(pz)]
+            for name, (px, py, pz) in zip(state.point_names, new_coords.tolist())
+        ] + point_records
+        pending.append((POINT_TABLE, POINT_FIELDS, len(records), [v for r in records for v in r]))
+    if deleted or area_records:
+        width = max([len(p) for p in state.area_points] + [len(area_fields) - 2])
+        fields = AREA_FIELDS[:2] + ["UniquePt{}".format(k + 1) for k in range(width)]
+        records = [
+            [name, str(len(points))] + points + [""] * (width - len(points))
+            for name, points in zip(state.area_names, state.area_points)
+            if name not in deleted
+        ] + [r + [""] * (width + 2 - len(r)) for r in area_records]
+        pending.append((AREA_TABLE, fields, len(records), [v for r in records for v in r]))
+    if deleted or section_records or counts["reassigned"]:
+        records = [
+            [name, prop] for name, prop in new_props.items() if name not in deleted
+        ] + section_records
+        pending.append((AREA_SECTION_TABLE, AREA_SECTION_FIELDS, len(records), [v for r in records for v in r]))
+
+    if not pending:
+        print("Model is up to date, no table edits needed")
+        return summary
+
+    tables = sap_model.DatabaseTables
+    for table_key, fields, num_records, data in pending:
+        ret = tables.SetTableForEditingArray(table_key, 0, list(fields), num_records, data)[-1]
+        if ret != 0:
+            print(f"Error running function SetTableForEditingArray for {table_key}. Return code: {ret}")
+            tables.CancelTableEditing()
+            summary["ret"] = ret
+            return summary
+    result = tables.ApplyEditedTables(True)
+    summary["ret"] = result[-1] or (1 if result[0] else 0)
+    if summary["ret"] != 0:
+        print(f"Error running function ApplyEditedTables\n{result[4]}")
+    else:
+        print(
+            f"Function ApplyEditedTables was successful for {len(pending)} tables: "
+            + ", ".join(f"{v} {k}" for k, v in counts.items() if v)
+        )
+    return summary
@@ -0,0 +1,189 @@
+"""
+Profiling wrapper for the SapModel object.
+
+ProfiledSapModel records, for every API method called through it:
+- the number of calls,
+- the cumulative, mean, p50/p95/p99 and max latency,
+- the payload size of the calls, e.g. the point count passed to AreaObj.AddByCoord.
+
+Usage:
+1. etabs_object, sap_model = connect_to_etabs(profile=True)
+2. Build the model as usual.
+3. disconnect_from_etabs(etabs_object, sap_model) writes the report to
+   sap_model_profile.json (or .csv, see disconnect_from_etabs).
+
+The wrapper can also be used directly:
+>>> sap_model = ProfiledSapModel(FakeSapModel())
+>>> draw_slab(sap_model, grid_points, 0, 1, 0, 1, 0, 3.88, "MyRC125mmSlab")
+>>> sap_model.print_report()
+"""
+import csv
+import json
+import math
+import time
+
+from sap_model_proxy import SapModelProxy
+
+
+def _sequence_payload(args, kwargs):
+    # Default payload: number of elements in the array arguments of the call
+    size = 0
+    for value in list(args) + list(kwargs.values()):
+        if isinstance(value, (list, tuple)):
+            size += len(value)
+    return size
+
+
+def _first_arg_payload(args, kwargs):
+    return args[0] if args else 0
+
+
+# Methods whose payload is better described by an explicit count argument
+PAYLOAD_EXTRACTORS = {
+    "AreaObj.AddByCoord": _first_arg_payload,  # NumberPoints
+    "AreaObj.AddByPoint": _first_arg_payload,  # NumberPoints
+}
+
+
+def percentile(sorted_values, q):
+    """
+    Nearest-rank percentile of an already sorted list. q is given in percent.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class MethodStats:
+    """
+    Call statistics of one API method.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.latencies = []
+        self.total_time = 0.0
+        self.payload_total = 0
+        self.payload_max = 0
+        self.errors = 0
+
+    def record(self, elapsed, payload, failed=False):
+        self.latencies.append(elapsed)
+        self.total_time += elapsed
+        self.payload_total += payload
+        if payload > self.payload_max:
+            self.payload_max = payload
+        if failed:
+            self.errors += 1
+
+    @property
+    def count(self):
+        return len(self.latencies)
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        return {
+            "method": self.path,
+            "calls": self.count,
+            "total_s": self.total_time,
+            "mean_s": self.total_time / self.count if self.count else 0.0,
+            "p50_s": percentile(latencies, 50),
+            "p95_s": percentile(latencies, 95),
+            "p99_s": percentile(latencies, 99),
+            "max_s": latencies[-1] if latencies else 0.0,
+            "payload_total": self.payload_total,
+            "payload_max": self.payload_max,
+            "errors": self.errors,
+        }
+
+
+class ProfiledSapModel(SapModelProxy):
+    """
+    SapModel wrapper recording per-method call statistics.
+
+    Parameters:
+    - sap_model: SapModel object (refer to function connect_to_etabs) or FakeSapModel.
+    - clock (callable, optional): Timer function. Default is time.perf_counter.
+    """
+
+    def __init__(self, sap_model, clock=time.perf_counter):
+        super().__init__(sap_model)
+        self._clock = clock
+        self._stats = {}
+        self._started = clock()
+
+    def _invoke(self, path, method, args, kwargs):
+        extractor = PAYLOAD_EXTRACTORS.get(path, _sequence_payload)
+        start = self._clock()
+        failed = True
+        try:
+            value = method(*args, **kwargs)
+            failed = False
+            return value
+        finally:
+            elapsed = self._clock() - start
+            stats = self._stats.get(path)
+            if stats is None:
+                stats = self._stats[path] = MethodStats(path)
+            try:
+                payload = int(extractor(args, kwargs))
+            except (TypeError, ValueError, IndexError):
+                payload = 0
+            stats.record(elapsed, payload, failed)
+
+    def reset_profile(self):
+        self._stats = {}
+        self._started = self._clock()
+
+    def report(self):
+        """
+        Returns:
+        - rows (list): One summary dict per method, sorted by cumulative time.
+        """
+        rows = [stats.summary() for stats in self._stats.values()]
+        rows.sort(key=lambda row: row["total_s"], reverse=True)
+        return rows
+
+    def write_report(self, path):
+        """
+        Write the report to a JSON file, or to a CSV file if path ends with .csv.
+        """
+        rows = self.report()
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(MethodStats("").summary()))
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, "w") as f:
+                json.dump(
+                    {
+                        "wall_s": self._clock() - self._started,
+                        "api_s": sum(row["total_s"] for row in rows),
+                        "calls": sum(row["calls"] for row in rows),
+                        "methods": rows,
+                    },
+                    f,
+                    indent=2,
+                )
+        return path
+
+    def print_report(self, top=10):
+        rows = self.report()
+        print(
+            "{:<36} {:>8} {:>10} {:>10} {:>10} {:>10}".format(
+                "method", "calls", "total [s]", "p50 [ms]", "p95 [ms]", "p99 [ms]"
+            )
+        )
+        for row in rows[:top]:
+            print(
+                "{:<36} {:>8} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.3f}".format(
+                    row["method"],
+                    row["calls"],
+                    row["total_s"],
+                    row["p50_s"] * 1000,
+                    row["p95_s"] * 1000,
+                    row["p99_s"] * 1000,
+                )
+            )
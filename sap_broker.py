@@ -0,0 +1,310 @@
+"""
+Local connection broker: attach to ETABS once and serve many short scripts.
+
+connect_to_etabs creates the API helper, queries the interface and attaches to
+ETABS on every script launch. The broker is a long-running process which connects
+once (on a ComWorker thread) and serves SapModel calls to client scripts over a
+local TCP socket. A client connects in milliseconds and uses client.model like a
+SapModel. Calls of all clients are executed in arrival order on the one COM thread.
+
+Protocol (little endian), one frame per message:
+- Header: 1 byte kind, 4 bytes request id, 4 bytes payload length.
+- Payload: marshal of
+    kind 1 (method path, client to broker): (path_id, path)
+    kind 2 (call): (path_id, args, kwargs)
+    kind 3 (result, broker to client): result
+    kind 4 (error): error message
+    kind 5 (shutdown the broker): None
+  Like in the journal, method paths are sent once per connection and referred to by
+  id afterwards. Clients may send many calls before reading the results
+  (pipelining), results come back in request order.
+
+Usage:
+    python sap_broker.py serve                    # attach to the active ETABS
+    python sap_broker.py serve --fake --latency 0.0005
+    python sap_broker.py serve --cache --journal build.sapjrnl
+    python sap_broker.py stop
+
+    client, sap_model = connect_to_broker()
+    print_model_name(sap_model)
+    futures = [client.pipeline.AreaObj.AddByCoord(4, x, y, z, "", "Slab") for x, y, z in slabs]
+    failed = failed_calls(futures)
+    client.close()
+
+Notes:
+- The broker only listens on the loopback interface. marshal payloads are not
+  safe against malicious input, do not expose the port.
+- Wrappers (profile, journal, cache) are applied in the broker, so the cache is
+  shared by all client scripts.
+"""
+import argparse
+import itertools
+import marshal
+import socket
+import struct
+import threading
+from concurrent.futures import Future
+
+from com_worker import ComWorker, PathProxy
+
+DEFAULT_PORT = 47811
+
+_HEADER = struct.Struct("<BII")
+_KIND_PATH = 1
+_KIND_CALL = 2
+_KIND_RESULT = 3
+_KIND_ERROR = 4
+_KIND_SHUTDOWN = 5
+
+
+def _wire(value):
+    # marshal only handles built-in types: NumPy values become lists / scalars,
+    # anything else its repr
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return type(value)(_wire(v) for v in value)
+    if isinstance(value, dict):
+        return {str(k): _wire(v) for k, v in value.items()}
+    if hasattr(value, "tolist"):
+        return _wire(value.tolist())
+    return repr(value)
+
+
+def _frame(kind, request_id, payload):
+    data = marshal.dumps(payload)
+    return _HEADER.pack(kind, request_id, len(data)) + data
+
+
+def _read_frame(reader):
+    header = reader.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    kind, request_id, length = _HEADER.unpack(header)
+    data = reader.read(length)
+    if len(data) < length:
+        return None
+    return kind, request_id, marshal.loads(data)
+
+
+class SapBroker:
+    """
+    Broker serving the calls of local clients on one model connection.
+
+    Parameters:
+    - connect (callable): Called on the COM thread, returns (etabs_object,
+        sap_model), e.g. lambda: connect_to_etabs(cache=True).
+    - port (int, optional): TCP port on 127.0.0.1, 0 picks a free one. Default is
+        DEFAULT_PORT.
+    """
+
+    def __init__(self, connect, port=DEFAULT_PORT, host="127.0.0.1"):
+        self.worker = ComWorker(connect)
+        self._server = socket.create_server((host, port))
+        self._server.settimeout(0.5)  # closing does not wake a blocked accept on all platforms
+        self.address = self._server.getsockname()
+        self._stopped = threading.Event()
+        self.calls = 0
+
+    def serve_forever(self):
+        """
+        Accept clients until shutdown() is called or a client sends the shutdown
+        request. The model connection stays open, see close().
+        """
+        print(f"Broker listening on {self.address[0]}:{self.address[1]}")
+        while not self._stopped.is_set():
+            try:
+                sock, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # server socket closed by shutdown()
+            sock.settimeout(None)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve_client, args=(sock,), daemon=True).start()
+
+    def shutdown(self):
+        self._stopped.set()
+        self._server.close()
+
+    def close(self, disconnect=None):
+        """
+        Stop serving and close the model connection after the queued calls.
+
+        Parameters:
+        - disconnect (callable, optional): disconnect(etabs_object, sap_model), run
+            on the COM thread before it stops, e.g. disconnect_from_etabs.
+        """
+        self.shutdown()
+        self.worker.close(disconnect=disconnect)
+
+    def _serve_client(self, sock):
+        paths = {}
+        send_lock = threading.Lock()
+
+        def reply(request_id, future):
+            error = future.exception()
+            if error is None:
+                message = _frame(_KIND_RESULT, request_id, _wire(future.result()))
+            else:
+                message = _frame(_KIND_ERROR, request_id, repr(error))
+            with send_lock:
+                try:
+                    sock.sendall(message)
+                except OSError:
+                    pass  # client went away
+
+        with sock, sock.makefile("rb") as reader:
+            while True:
+                try:
+                    frame = _read_frame(reader)
+                except (OSError, ValueError, EOFError):
+                    break
+                if frame is None:
+                    break
+                kind, request_id, payload = frame
+                if kind == _KIND_PATH:
+                    paths[payload[0]] = payload[1]
+                elif kind == _KIND_CALL:
+                    path_id, args, kwargs = payload
+                    self.calls += 1
+                    future = self.worker.submit(paths[path_id], *args, **kwargs)
+                    future.add_done_callback(lambda f, rid=request_id: reply(rid, f))
+                elif kind == _KIND_SHUTDOWN:
+                    self.shutdown()
+                    break
+
+
+class BrokerClient:
+    """
+    Connection of a client script to the broker.
+
+    Attributes:
+    - model: Use like a SapModel, every call waits for its result.
+    - pipeline: Same, but every call returns a Future at once (see
+        com_worker.failed_calls), so many calls can be in flight.
+    """
+
+    def __init__(self, port=DEFAULT_PORT, host="127.0.0.1", timeout=None):
+        self._sock = socket.create_connection((host, port), timeout=5)
+        self._sock.settimeout(None)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._timeout = timeout
+        self._paths = {}
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+        self.model = PathProxy(self.call, "")
+        self.pipeline = PathProxy(self.submit, "")
+
+    def _read_results(self):
+        with self._sock.makefile("rb") as reader:
+            while True:
+                try:
+                    frame = _read_frame(reader)
+                except (OSError, ValueError, EOFError):
+                    frame = None
+                if frame is None:
+                    break
+                kind, request_id, payload = frame
+                future = self._pending.pop(request_id, None)
+                if future is None:
+                    continue
+                if kind == _KIND_RESULT:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(RuntimeError(f"Broker call failed: {payload}"))
+        for future in list(self._pending.values()):
+            future.set_exception(ConnectionError("Connection to the broker closed"))
+        self._pending.clear()
+
+    def submit(self, path, *args, **kwargs):
+        """
+        Send the call path (e.g. "AreaObj.AddByCoord") and return its Future.
+        """
+        future = Future()
+        with self._lock:
+            message = b""
+            path_id = self._paths.get(path)
+            if path_id is None:
+                path_id = self._paths[path] = len(self._paths) + 1
+                message += _frame(_KIND_PATH, 0, (path_id, path))
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            message += _frame(_KIND_CALL, request_id, (path_id, _wire(args), _wire(kwargs)))
+            self._sock.sendall(message)
+        return future
+
+    def call(self, path, *args, **kwargs):
+        return self.submit(path, *args, **kwargs).result(self._timeout)
+
+    def shutdown_broker(self):
+        with self._lock:
+            self._sock.sendall(_frame(_KIND_SHUTDOWN, 0, None))
+
+    def close(self):
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self._reader.join(5)
+
+
+def connect_to_broker(port=DEFAULT_PORT, host="127.0.0.1", timeout=None):
+    """
+    Connect to a running broker, the counterpart of connect_to_etabs for scripts.
+
+    Returns:
+    - client (BrokerClient), sap_model (client.model)
+    """
+    client = BrokerClient(port, host, timeout)
+    return client, client.model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local ETABS connection broker.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve = subparsers.add_parser("serve", help="Attach to ETABS and serve clients")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--fake", action="store_true", help="Serve a FakeSapModel instead of ETABS")
+    serve.add_argument("--latency", type=float, default=0.0, help="Per-call latency of the fake model")
+    serve.add_argument("--instance", default=None, help="ETABS process id to attach to")
+    serve.add_argument("--cache", action="store_true")
+    serve.add_argument("--profile", action="store_true")
+    serve.add_argument("--journal", default=None)
+    stop = subparsers.add_parser("stop", help="Stop a running broker")
+    stop.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    if args.command == "stop":
+        client = BrokerClient(args.port)
+        client.shutdown_broker()
+        client.close()
+        return
+
+    from create_object import connect_to_etabs, disconnect_from_etabs
+
+    def connect():
+        return connect_to_etabs(
+            profile=args.profile,
+            journal=args.journal,
+            cache=args.cache,
+            instance="fake" if args.fake else args.instance,
+            fake_options={"latency": args.latency},
+        )
+
+    broker = SapBroker(connect, args.port)
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broker.close(disconnect_from_etabs)
+        print(f"Broker served {broker.calls} calls")
+
+
+if __name__ == "__main__":
+    main()
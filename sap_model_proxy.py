@@ -0,0 +1,108 @@
+"""
+Transparent proxy around the SapModel object.
+
+SapModelProxy wraps the SapModel returned by connect_to_etabs (or a FakeSapModel)
+and its interfaces (sap_model.File, sap_model.AreaObj, ...). Every method call made
+through the proxy is routed to _invoke() with its full method path, e.g.
+"AreaObj.AddByCoord", so subclasses can measure, record or cache the calls without
+the calling code knowing about it.
+
+Example:
+>>> class PrintingSapModel(SapModelProxy):
+...     def _invoke(self, path, method, args, kwargs):
+...         print(path)
+...         return method(*args, **kwargs)
+>>> sap_model = PrintingSapModel(sap_model)
+>>> draw_slab(sap_model, grid_points, 0, 1, 0, 1, 0, 3.88, "MyRC125mmSlab")
+AreaObj.AddByCoord
+"""
+
+# Attribute values of these types are returned as they are, everything else that is
+# not callable is treated as an API interface and wrapped.
+_PLAIN_TYPES = (int, float, str, bool, bytes, list, tuple, dict, set, type(None))
+
+
+def _resolve(proxy, name):
+    if name.startswith("__"):
+        raise AttributeError(name)
+    children = proxy._children
+    if name in children:
+        return children[name]
+    value = getattr(proxy._target, name)
+    if isinstance(value, _PLAIN_TYPES):
+        return value
+    path = proxy._path + "." + name if proxy._path else name
+    root = proxy._root
+    if callable(value):
+
+        def wrapped(*args, **kwargs):
+            return root._invoke(path, value, args, kwargs)
+
+        wrapped.__name__ = name
+        wrapped.__doc__ = getattr(value, "__doc__", None)
+    else:
+        wrapped = _InterfaceProxy(value, path, root)
+    children[name] = wrapped
+    return wrapped
+
+
+class _InterfaceProxy:
+    """
+    Proxy for an interface hanging off the SapModel (File, Story, AreaObj, ...).
+    """
+
+    def __init__(self, target, path, root):
+        self._target = target
+        self._path = path
+        self._root = root
+        self._children = {}
+
+    def __getattr__(self, name):
+        return _resolve(self, name)
+
+    def __repr__(self):
+        return "<{} proxy for {!r}>".format(self._path, self._target)
+
+
+class SapModelProxy:
+    """
+    Base class for SapModel wrappers. Subclasses override _invoke().
+
+    Parameters:
+    - sap_model: SapModel object (refer to function connect_to_etabs) or FakeSapModel.
+    """
+
+    def __init__(self, sap_model):
+        self._target = sap_model
+        self._path = ""
+        self._root = self
+        self._children = {}
+
+    def __getattr__(self, name):
+        return _resolve(self, name)
+
+    def __repr__(self):
+        return "<{} for {!r}>".format(type(self).__name__, self._target)
+
+    def _invoke(self, path, method, args, kwargs):
+        """
+        Called for every API call made through the proxy.
+
+        Parameters:
+        - path: Method path relative to the SapModel, e.g. "AreaObj.AddByCoord".
+        - method: The bound method of the wrapped object.
+        - args, kwargs: The call arguments.
+
+        Returns:
+        - The value returned by the API call.
+        """
+        return method(*args, **kwargs)
+
+
+def unwrap_sap_model(sap_model):
+    """
+    Return the raw SapModel object underneath any number of proxies.
+    """
+    while isinstance(sap_model, SapModelProxy):
+        sap_model = sap_model._target
+    return sap_model
@@ -1,21 +1,20 @@
-import comtypes.client
-
-
-def set_slab_prop(sap_model, prop_name):
+def set_slab_prop(sap_model, prop_name, thickness=0.125, mat_prop="C30/37"):
     """
     Set slab property in ETABS.
 
     Parameters:
     - sap_model: ETABS model object.
     - prop_name: Name of the slab property.
+    - thickness (float, optional): Slab thickness in the present length unit. Default is 0.125 (125mm in m).
+    - mat_prop (str, optional): Concrete material of the slab. Default is "C30/37".
 
     Returns:
     - ret: Return value indicating success (0) or failure (nonzero).
     """
     SlabType = 0  # eSlabType: Normal slab
     ShellType = 1  # eShellType.ShellThin->1,ShellThin->2, Membrane->3
-    MatProp = "C30/37"  # You may need to adjust the material property name based on your ETABS model
-    Thickness = 0.125  # Thickness in meters (125mm converted to meters)
+    MatProp = mat_prop  # You may need to adjust the material property name based on your ETABS model
+    Thickness = thickness  # Thickness in meters (125mm converted to meters)
     Color = -1  # Optional color, set to -1 for default
     Notes = ""  # Optional notes, leave empty for default
     GUID = ""  # Optional GUID, leave empty for default
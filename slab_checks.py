@@ -0,0 +1,309 @@
+"""
+EN 1992-1-1 slab checks over all panels and columns at once.
+
+The span/depth, deflection and punching shear checks are written as NumPy array
+expressions, so every panel of a model (or every candidate of a sizing loop) is
+checked in one pass instead of panel by panel in a spreadsheet:
+- span/depth: limiting l/d of 7.4.2 (expressions 7.16a/b, K of Table 7.4N), with
+  the 310/sigma_s factor and the 7 m (8.5 m for flat slabs) long span factor,
+- deflection: analysed deflection against span/250 (7.4.1),
+- punching: v_Ed = beta V_Ed / (u1 d) against v_Rd,c at the basic control
+  perimeter and against v_Rd,max at the column face (6.4.3 to 6.4.5).
+
+The layout comes from the generators: slab_layout takes the slab name table of
+draw_slabs with the slab property of set_slab_prop and the concrete strength of
+get_all_materials, column_layout the frame table of draw_frames. Results extracted
+with get_results are matched to the layout with align.
+
+All values are in N, mm & MPa, except V_Ed in kN. The layout functions convert
+from the present units of the model.
+
+Example:
+>>> layout = slab_layout(sap_model, grid_points, slab_names, "MyRC125mmSlab")
+>>> chunks = iter_results(sap_model, "joint_displacements", groups=slab_groups)
+>>> deflection = align(max_abs_by(chunks, "U3", by="group"), layout["name"])
+>>> table = check_panels(layout, rho=0.005, deflection=deflection, system="end_span")
+>>> failing(table)
+['12', '57']
+"""
+import numpy as np
+
+from material_prop import get_all_materials
+from unit_state import conversion_factor
+
+# K of EN 1992-1-1 Table 7.4N
+STRUCTURAL_SYSTEMS = {
+    "simply_supported": 1.0,
+    "end_span": 1.3,
+    "interior_span": 1.5,
+    "flat_slab": 1.2,
+    "cantilever": 0.4,
+}
+
+# beta of EN 1992-1-1 Figure 6.21N
+COLUMN_LOCATIONS = {"interior": 1.15, "edge": 1.4, "corner": 1.5}
+
+GAMMA_C = 1.5
+DEFLECTION_LIMIT = 250.0  # span / 250
+LD_CAP = 40.0  # l/d is limited to 40 K (UK and Singapore National Annexes)
+
+
+def slab_layout(sap_model, grid, slab_names, prop_name):
+    """
+    Panel geometry and concrete of the slabs drawn by draw_slabs.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - grid (Grid): Grid returned by create_grid_system.
+    - slab_names (dict): {(story, (start_x, end_x, start_y, end_y)): slab name}
+        returned by draw_slabs.
+    - prop_name: Slab property of all slabs, or a dict {slab name: property}.
+
+    Returns:
+    - layout (dict): Columns "name", "story" and, in mm & MPa, "lx", "ly", "h", "fck".
+    """
+    to_mm = conversion_factor("length", sap_model.GetPresentUnits(), 9)
+    names = list(slab_names.values())
+    stories = [key[0] for key in slab_names]
+    ranges = np.array([key[1] for key in slab_names], dtype=int).reshape(-1, 4)
+    props = [prop_name] * len(names) if isinstance(prop_name, str) else [prop_name[n] for n in names]
+
+    materials = get_all_materials(sap_model)
+    prop_values = {}
+    for prop in dict.fromkeys(props):
+        ret = sap_model.PropArea.GetSlab(prop)
+        if ret[-1] != 0:
+            raise ValueError(f"Slab property {prop} not found. Return code: {ret[-1]}")
+        mat_name, thickness = ret[2], ret[3]
+        if materials.get(mat_name, {}).get("mat_type") != "Concrete":
+            raise ValueError(f"Material {mat_name} of slab property {prop} is not a concrete")
+        prop_values[prop] = (thickness * to_mm, materials[mat_name]["fc"])
+    h, fck = np.array([prop_values[p] for p in props], dtype=float).reshape(-1, 2).T
+
+    return {
+        "name": np.array(names, dtype=object),
+        "story": np.array(stories, dtype=object),
+        "lx": (grid.x[ranges[:, 1]] - grid.x[ranges[:, 0]]) * to_mm,
+        "ly": (grid.y[ranges[:, 3]] - grid.y[ranges[:, 2]]) * to_mm,
+        "h": h,
+        "fck": fck,
+    }
+
+
+def column_layout(grid, frames):
+    """
+    Columns drawn by draw_frames with their location in the plan.
+
+    Parameters:
+    - grid (Grid): Grid returned by create_grid_system.
+    - frames (dict): Frame table returned by draw_frames.
+
+    Returns:
+    - layout (dict): Columns "name", "story" and "location" ("interior", "edge" or
+        "corner", from the position of the grid intersection on the outline).
+    """
+    columns = frames.get("columns", {})
+    keys = np.array([key[1:] for key in columns], dtype=int).reshape(-1, 2)
+    outer_x = (keys[:, 0] == 0) | (keys[:, 0] == len(grid.x) - 1)
+    outer_y = (keys[:, 1] == 0) | (keys[:, 1] == len(grid.y) - 1)
+    location = np.where(outer_x & outer_y, "corner", np.where(outer_x | outer_y, "edge", "interior"))
+    return {
+        "name": np.array(list(columns.values()), dtype=object),
+        "story": np.array([key[0] for key in columns], dtype=object),
+        "location": location.astype(object),
+    }
+
+
+def align(values, names, default=np.nan):
+    """
+    Array of the values of a {name: value} dict (e.g. from max_abs_by) in the order
+    of names, default where a name has no value.
+    """
+    return np.array([values.get(name, default) for name in names], dtype=float)
+
+
+def _system_k(system):
+    if isinstance(system, str):
+        return STRUCTURAL_SYSTEMS[system]
+    return np.asarray(system, dtype=float)
+
+
+def span_depth_limit(fck, rho, rho_comp=0.0, system="simply_supported", cap=LD_CAP):
+    """
+    Limiting span/depth ratio, expressions 7.16a and 7.16b.
+
+    Parameters:
+    - fck (array): Characteristic cylinder strength in MPa.
+    - rho (array): Required tension reinforcement ratio at mid span (at the support
+        of a cantilever).
+    - rho_comp (array, optional): Required compression reinforcement ratio. Default is 0.
+    - system (str or array, optional): Key of STRUCTURAL_SYSTEMS or K values.
+    - cap (float, optional): Upper limit of l/d / K, None for no limit. Default is 40.
+
+    Returns:
+    - limit (array): Basic l/d.
+    """
+    fck, rho, rho_comp = np.broadcast_arrays(
+        np.asarray(fck, dtype=float), np.asarray(rho, dtype=float), np.asarray(rho_comp, dtype=float)
+    )
+    k = _system_k(system)
+    root_fck = np.sqrt(fck)
+    rho_0 = root_fck * 1e-3
+    rho = np.maximum(rho, 1e-6)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        light = 11.0 + 1.5 * root_fck * rho_0 / rho + 3.2 * root_fck * np.maximum(rho_0 / rho - 1.0, 0.0) ** 1.5
+        heavy = (
+            11.0
+            + 1.5 * root_fck * rho_0 / np.maximum(rho - rho_comp, 1e-6)
+            + root_fck / 12.0 * np.sqrt(rho_comp / rho_0)
+        )
+    ratio = np.where(rho <= rho_0, light, heavy)
+    if cap is not None:
+        ratio = np.minimum(ratio, cap)
+    return k * ratio
+
+
+def check_panels(
+    layout,
+    rho,
+    deflection=None,
+    rho_comp=0.0,
+    system="simply_supported",
+    cover=25.0,
+    bar=10.0,
+    steel_factor=1.0,
+    deflection_limit=DEFLECTION_LIMIT,
+):
+    """
+    Span/depth and deflection checks of every panel.
+
+    Parameters:
+    - layout (dict): Panel layout from slab_layout, or any dict with the columns
+        "name", "lx", "ly", "h" (mm) and "fck" (MPa).
+    - rho (float or array): Required tension reinforcement ratio.
+    - deflection (array, optional): Analysed deflection of every panel in mm, NaN
+        where not known. Default is no deflection check.
+    - rho_comp (float or array, optional): Compression reinforcement ratio.
+    - system (str or array, optional): Key of STRUCTURAL_SYSTEMS or K values. The
+        span is the shorter one, the longer one for flat slabs.
+    - cover, bar (float or array, optional): Cover and bar diameter in mm, giving
+        d = h - cover - bar / 2. Default is 25 and 10.
+    - steel_factor (float or array, optional): 310 / sigma_s, i.e.
+        (500 / fyk) * (As,prov / As,req). Default is 1.
+    - deflection_limit (float, optional): Deflection limit as span / limit. Default is 250.
+
+    Returns:
+    - table (dict): Columns "name", "span", "d", "span_depth", "deflection",
+        "utilisation" (the larger of both) and "governing".
+    """
+    lx = np.asarray(layout["lx"], dtype=float)
+    ly = np.asarray(layout["ly"], dtype=float)
+    flat = np.asarray(system == "flat_slab" if isinstance(system, str) else False)
+    span = np.where(flat, np.maximum(lx, ly), np.minimum(lx, ly))
+    d = np.asarray(layout["h"], dtype=float) - cover - np.asarray(bar, dtype=float) / 2.0
+
+    limit = span_depth_limit(layout["fck"], rho, rho_comp, system) * steel_factor
+    long_span = np.where(flat, 8500.0, 7000.0)
+    limit = limit * np.minimum(long_span / span, 1.0)
+    span_depth = (span / d) / limit
+
+    if deflection is None:
+        deflection_util = np.full(span.shape, np.nan)
+    else:
+        deflection_util = np.abs(np.asarray(deflection, dtype=float)) / (span / deflection_limit)
+    utilisation = np.fmax(span_depth, deflection_util)
+    governing = np.where(deflection_util > span_depth, "deflection", "span_depth")
+
+    table = {
+        "name": layout["name"],
+        "span": span,
+        "d": d,
+        "span_depth": span_depth,
+        "deflection": deflection_util,
+        "utilisation": utilisation,
+        "governing": governing.astype(object),
+    }
+    _report("panels", table)
+    return table
+
+
+def check_punching(layout, v_ed, c1, c2, d, rho_l, fck, gamma_c=GAMMA_C):
+    """
+    Punching shear check of every column without shear reinforcement.
+
+    Parameters:
+    - layout (dict): Column layout from column_layout ("name", "location").
+    - v_ed (array): Punching force V_Ed in kN.
+    - c1, c2 (float or array): Column dimensions in mm, c1 perpendicular to the
+        slab edge of edge columns.
+    - d (float or array): Effective depth of the slab in mm.
+    - rho_l (float or array): Tension reinforcement ratio sqrt(rho_ly * rho_lz).
+    - fck (float or array): Concrete strength in MPa.
+    - gamma_c (float, optional): Partial factor of concrete. Default is 1.5.
+
+    Returns:
+    - table (dict): Columns "name", "v_ed" (at u1), "v_rd_c", "v_ed0" (at the
+        column face u0), "v_rd_max", "utilisation" and "governing".
+    """
+    location = np.asarray(layout["location"])
+    v_ed, c1, c2, d, rho_l, fck = (
+        np.broadcast_to(np.asarray(v, dtype=float), location.shape) for v in (v_ed, c1, c2, d, rho_l, fck)
+    )
+    beta = np.select(
+        [location == "corner", location == "edge"],
+        [COLUMN_LOCATIONS["corner"], COLUMN_LOCATIONS["edge"]],
+        COLUMN_LOCATIONS["interior"],
+    )
+    # Control perimeters at 2d (u1) and at the column face (u0), Figures 6.13 and 6.15
+    u1 = np.select(
+        [location == "corner", location == "edge"],
+        [c1 + c2 + np.pi * d, 2.0 * c1 + c2 + 2.0 * np.pi * d],
+        2.0 * (c1 + c2) + 4.0 * np.pi * d,
+    )
+    u0 = np.select(
+        [location == "corner", location == "edge"],
+        [np.minimum(3.0 * d, c1 + c2), np.minimum(c2 + 3.0 * d, c2 + 2.0 * c1)],
+        2.0 * (c1 + c2),
+    )
+
+    k = np.minimum(1.0 + np.sqrt(200.0 / d), 2.0)
+    rho_l = np.minimum(rho_l, 0.02)
+    v_min = 0.035 * k**1.5 * np.sqrt(fck)
+    v_rd_c = np.maximum(0.18 / gamma_c * k * np.cbrt(100.0 * rho_l * fck), v_min)
+    v_rd_max = 0.4 * 0.6 * (1.0 - fck / 250.0) * fck / gamma_c
+
+    force = beta * np.abs(v_ed) * 1000.0  # N
+    v_ed1 = force / (u1 * d)
+    v_ed0 = force / (u0 * d)
+    util_c = v_ed1 / v_rd_c
+    util_max = v_ed0 / v_rd_max
+
+    table = {
+        "name": layout["name"],
+        "v_ed": v_ed1,
+        "v_rd_c": v_rd_c,
+        "v_ed0": v_ed0,
+        "v_rd_max": v_rd_max,
+        "utilisation": np.maximum(util_c, util_max),
+        "governing": np.where(util_max > util_c, "v_rd_max", "v_rd_c").astype(object),
+    }
+    _report("columns", table)
+    return table
+
+
+def failing(table, limit=1.0):
+    """
+    Names of the panels or columns of a check table with a utilisation above the
+    limit, worst first.
+    """
+    utilisation = table["utilisation"]
+    index = np.flatnonzero(utilisation > limit)
+    index = index[np.argsort(-utilisation[index], kind="stable")]
+    return [table["name"][i] for i in index]
+
+
+def _report(kind, table):
+    utilisation = table["utilisation"]
+    num_failing = int(np.count_nonzero(utilisation > 1.0))
+    worst = float(np.nanmax(utilisation)) if len(utilisation) else 0.0
+    print(f"{len(utilisation)} {kind} checked, {num_failing} failing, maximum utilisation {worst:.2f}")
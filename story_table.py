@@ -0,0 +1,229 @@
+"""
+Storey definitions: any number of storeys in one call, and a columnar StoryTable.
+
+define_stories sets every storey of the model (individual heights, master/similar
+flags and splices) with one Story.SetStories_2 call, instead of the ground height /
+typical height pair NewGridOnly supports.
+
+StoryTable holds the storey data as NumPy arrays, sorted bottom up with the base
+first, and answers elevation-to-storey lookups with a binary search, for scalars or
+whole arrays of elevations at once.
+
+Example:
+>>> define_stories(sap_model, [4.5, 3.88, 3.88, 6.0, 3.5], master_stories=["Story3", "Story5"])
+0
+>>> stories = StoryTable.from_model(sap_model)
+>>> stories.names
+array(['Base', 'Story1', 'Story2', 'Story3', 'Story4', 'Story5'], dtype='<U6')
+>>> stories.story_index([2.0, 4.5, 12.0])
+array([1, 1, 3])
+"""
+import numpy as np
+
+
+def define_stories(
+    sap_model,
+    story_heights,
+    story_names=None,
+    base_elevation=0.0,
+    master_stories=None,
+    similar_to=None,
+    splices=None,
+):
+    """
+    Set all storeys of the model in one Story.SetStories_2 call.
+
+    Parameters:
+    - sap_model: ETABS model object.
+    - story_heights (list): Height of every storey, bottom up.
+    - story_names (list, optional): Default is "Story1", "Story2", ...
+    - base_elevation (float, optional): Elevation of the base. Default is 0.
+    - master_stories (list, optional): Names of the master storeys. Default is the
+        top storey only.
+    - similar_to (dict, optional): {storey name: master storey name}. Default is
+        the nearest master storey above (or below, for storeys above the top master).
+    - splices (dict, optional): {storey name: splice height above the storey}.
+
+    Returns:
+    - ret: Return value indicating success (0) or failure (nonzero).
+    """
+    num_of_storeys = len(story_heights)
+    if story_names is None:
+        story_names = ["Story{}".format(k + 1) for k in range(num_of_storeys)]
+    if master_stories is None:
+        master_stories = [story_names[-1]]
+    master_stories = set(master_stories)
+    splices = splices or {}
+
+    is_master = [name in master_stories for name in story_names]
+    if similar_to is None:
+        similar_to = {}
+        master = None
+        # Walk top down so every storey takes the nearest master above it
+        for name, master_flag in zip(reversed(story_names), reversed(is_master)):
+            if master_flag:
+                master = name
+            elif master is not None:
+                similar_to[name] = master
+        lowest_master = next(
+            (name for name, flag in zip(story_names, is_master) if flag), None
+        )
+        for name, master_flag in zip(story_names, is_master):
+            if not master_flag and name not in similar_to and lowest_master:
+                similar_to[name] = lowest_master
+    similar = [
+        "" if flag else similar_to.get(name, "")
+        for name, flag in zip(story_names, is_master)
+    ]
+    splice_above = [name in splices for name in story_names]
+    splice_height = [float(splices.get(name, 0.0)) for name in story_names]
+    colors = [0] * num_of_storeys
+
+    ret = sap_model.Story.SetStories_2(
+        base_elevation,
+        num_of_storeys,
+        list(story_names),
+        [float(h) for h in story_heights],
+        is_master,
+        similar,
+        splice_above,
+        splice_height,
+        colors,
+    )[-1]
+    if ret == 0:
+        print(f"Function SetStories_2 was successful for {num_of_storeys} storeys")
+    else:
+        print(f"Error running function SetStories_2. Return code: {ret}")
+    return ret
+
+
+class StoryTable:
+    """
+    Storey data as columns, sorted bottom up with the base first.
+
+    Attributes:
+    - names (array of str), elevations (array), heights (array),
+      is_master (array of bool), similar_to (array of str),
+      splice_above (array of bool), splice_height (array)
+    """
+
+    def __init__(
+        self,
+        names,
+        elevations,
+        heights,
+        is_master=None,
+        similar_to=None,
+        splice_above=None,
+        splice_height=None,
+    ):
+        elevations = np.asarray(elevations, dtype=float)
+        order = np.argsort(elevations, kind="stable")
+        count = len(elevations)
+        self.elevations = elevations[order]
+        self.names = np.asarray(names, dtype=str)[order]
+        self.heights = np.asarray(heights, dtype=float)[order]
+        self.is_master = np.asarray(
+            is_master if is_master is not None else [False] * count, dtype=bool
+        )[order]
+        self.similar_to = np.asarray(
+            [s or "" for s in similar_to] if similar_to is not None else [""] * count,
+            dtype=str,
+        )[order]
+        self.splice_above = np.asarray(
+            splice_above if splice_above is not None else [False] * count, dtype=bool
+        )[order]
+        self.splice_height = np.asarray(
+            splice_height if splice_height is not None else [0.0] * count, dtype=float
+        )[order]
+        self._index = {name: k for k, name in enumerate(self.names.tolist())}
+
+    @classmethod
+    def from_model(cls, sap_model):
+        """
+        Read the storeys of the model with one Story.GetStories call.
+        """
+        story_in = sap_model.Story.GetStories()
+        return cls(
+            story_in[1],
+            story_in[2],
+            story_in[3],
+            story_in[4],
+            story_in[5],
+            story_in[6],
+            story_in[7],
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return "StoryTable({} levels, {:.3f} to {:.3f})".format(
+            len(self), self.elevations[0], self.elevations[-1]
+        ) if len(self) else "StoryTable(0 levels)"
+
+    @property
+    def bottoms(self):
+        """Elevation of the bottom of every level (top elevation minus height)."""
+        return self.elevations - self.heights
+
+    def index_of(self, name):
+        """Position of the storey called name, KeyError if there is none."""
+        return self._index[name]
+
+    def story_index(self, elevation, tol=1e-6):
+        """
+        Index of the storey containing the elevation: the lowest level whose
+        elevation is at or above it (within tol). Elevations above the top level
+        give len(self). Works on scalars and arrays.
+        """
+        index = np.searchsorted(self.elevations, np.asarray(elevation) - tol, side="left")
+        if np.ndim(index) == 0:
+            return int(index)
+        return index
+
+    def story_name(self, elevation, tol=1e-6):
+        """
+        Name of the storey containing the elevation, "" above the top level.
+        """
+        index = np.asarray(self.story_index(elevation, tol))
+        names = np.append(self.names, "")
+        result = names[np.minimum(index, len(self.names))]
+        return str(result) if result.ndim == 0 else result
+
+    def level_index(self, elevation, tol=1e-6):
+        """
+        Index of the level at exactly this elevation (within tol), -1 where there is
+        none. Works on scalars and arrays.
+        """
+        elevation = np.asarray(elevation, dtype=float)
+        index = np.clip(
+            np.searchsorted(self.elevations, elevation - tol, side="left"),
+            0,
+            max(len(self.elevations) - 1, 0),
+        )
+        if len(self.elevations) == 0:
+            hit = np.zeros(np.shape(elevation), dtype=bool)
+        else:
+            hit = np.abs(self.elevations[index] - elevation) <= tol
+        result = np.where(hit, index, -1)
+        return int(result) if result.ndim == 0 else result
+
+    def to_story_data(self):
+        """
+        Rows in the format of get_story_data (top storey first, base last).
+        """
+        rows = []
+        for k in range(len(self) - 1, -1, -1):
+            rows.append(
+                [
+                    str(self.names[k]),
+                    round(float(self.heights[k]), 3),
+                    round(float(self.elevations[k]), 3),
+                    bool(self.is_master[k]),
+                    str(self.similar_to[k]) or None,
+                    bool(self.splice_above[k]),
+                    float(self.splice_height[k]),
+                ]
+            )
+        return rows
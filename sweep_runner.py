@@ -0,0 +1,304 @@
+"""
+Parametric sweep runner: option studies on a pool of worker processes.
+
+A parameter grid such as {"bay_x": [6.0, 7.2, 8.1], "storey_height": [3.5, 3.88]} is
+expanded into one job per combination. The jobs are dispatched to worker processes,
+each of which owns its own model connection (connect_to_etabs with instance="new"
+launches one ETABS per worker, instance="fake" gives every worker a FakeSapModel)
+and runs job_function(sap_model, **parameters) for every job it is given.
+
+- The job list is built up front; jobs are handed out only when a worker is idle,
+  so at most one job per worker is in flight.
+- A job running longer than timeout seconds is stopped by terminating its worker,
+  which is then restarted with a fresh connection.
+- If a worker dies while running a job (crash, lost connection), the job is retried
+  on a new worker up to retries times.
+- The results of all jobs are collected into one table, one row per job with the
+  parameters, status, elapsed time, attempts and the fields returned by the job.
+
+Usage:
+    python sweep_runner.py --workers 4 --bay-x 6.0 7.2 8.1 --storey-height 3.5 3.88 --slab-thickness 0.125 0.15
+    python sweep_runner.py --instance new --workers 2 --output sweep_results.csv
+
+Notes:
+- job_function must be a module-level function, it is pickled to the workers.
+- Workers are started with the "spawn" method (as on Windows), every worker
+  connects once and reuses its model for all its jobs.
+"""
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+from create_object import connect_to_etabs, disconnect_from_etabs
+
+
+def expand_parameters(parameter_grid):
+    """
+    Returns the list of parameter dicts of every combination of the grid values.
+    """
+    names = list(parameter_grid)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(parameter_grid[name] for name in names))
+    ]
+
+
+def _worker_main(conn, job_function, connect_options, quiet):
+    if quiet:
+        devnull = open(os.devnull, "w")
+        os.dup2(devnull.fileno(), 1)
+    etabs_object, sap_model = connect_to_etabs(**connect_options)
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            job_id, parameters = message
+            start = time.perf_counter()
+            try:
+                result = job_function(sap_model, **parameters)
+                conn.send((job_id, "ok", result, time.perf_counter() - start))
+            except Exception as error:
+                conn.send((job_id, "error", repr(error), time.perf_counter() - start))
+    finally:
+        disconnect_from_etabs(
+            etabs_object, sap_model, close=connect_options.get("instance") == "new"
+        )
+
+
+class _Worker:
+    def __init__(self, context, job_function, connect_options, quiet):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, job_function, connect_options, quiet),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.job = None  # (job id, parameters, attempt)
+        self.started = None
+
+    def submit(self, job):
+        self.job = job
+        self.started = time.monotonic()
+        self.conn.send((job[0], job[1]))
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.terminate()
+        else:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def run_sweep(
+    job_function,
+    parameter_grid,
+    workers=None,
+    instance="fake",
+    connect_options=None,
+    timeout=None,
+    retries=1,
+    quiet=True,
+):
+    """
+    Run job_function for every combination of the parameter grid on a worker pool.
+
+    Parameters:
+    - job_function (callable): job_function(sap_model, **parameters), returns a dict
+        of result fields (or any value, stored as "result").
+    - parameter_grid (dict or list): {name: values} to expand, or a list of
+        parameter dicts.
+    - workers (int, optional): Number of worker processes. Default is the number of CPUs.
+    - instance (optional): Passed to connect_to_etabs, "fake" (default), "new" or a
+        process id (only useful with one worker).
+    - connect_options (dict, optional): Further keyword arguments of connect_to_etabs,
+        e.g. {"fake_options": {"latency": 0.0005}}.
+    - timeout (float, optional): Seconds after which a job is stopped.
+    - retries (int, optional): Times a job is retried after its worker died. Default is 1.
+    - quiet (bool, optional): Discard the print output of the workers. Default is True.
+
+    Returns:
+    - rows (list): One dict per job, in job order: "job", the parameters, "status"
+        ("ok", "error", "timeout" or "crashed"), "elapsed_s", "attempts", and the
+        result fields or "error".
+    """
+    jobs = parameter_grid if isinstance(parameter_grid, list) else expand_parameters(parameter_grid)
+    workers = min(workers or os.cpu_count() or 1, max(len(jobs), 1))
+    connect_options = dict(connect_options or {}, instance=instance)
+    context = multiprocessing.get_context("spawn")
+
+    def start_worker():
+        return _Worker(context, job_function, connect_options, quiet)
+
+    pool = [start_worker() for _ in range(workers)]
+    queue = deque((k, parameters, 1) for k, parameters in enumerate(jobs))
+    rows = {}
+
+    def finish(job, status, elapsed, result):
+        job_id, parameters, attempt = job
+        row = {"job": job_id}
+        row.update(parameters)
+        row.update({"status": status, "elapsed_s": elapsed, "attempts": attempt})
+        if status == "ok":
+            row.update(result if isinstance(result, dict) else {"result": result})
+        else:
+            row["error"] = result
+        rows[job_id] = row
+        print(f"Job {job_id} {status} after {elapsed:.2f} s: {parameters}")
+
+    try:
+        while queue or any(w.job is not None for w in pool):
+            for worker in pool:
+                if worker.job is None and queue:
+                    worker.submit(queue.popleft())
+
+            busy = [w for w in pool if w.job is not None]
+            wait_for = None
+            if timeout is not None:
+                now = time.monotonic()
+                wait_for = max(0.0, min(w.started + timeout - now for w in busy))
+            ready = wait([w.conn for w in busy] + [w.process.sentinel for w in busy], wait_for)
+
+            for k, worker in enumerate(pool):
+                if worker.job is None:
+                    continue
+                if worker.conn in ready:
+                    try:
+                        job_id, status, result, elapsed = worker.conn.recv()
+                    except (EOFError, OSError):
+                        pass  # died while sending, handled below
+                    else:
+                        finish(worker.job, status, elapsed, result)
+                        worker.job = None
+                        continue
+                if not worker.process.is_alive():
+                    job_id, parameters, attempt = worker.job
+                    elapsed = time.monotonic() - worker.started
+                    if attempt <= retries:
+                        print(f"Worker crashed on job {job_id}, retrying")
+                        queue.appendleft((job_id, parameters, attempt + 1))
+                    else:
+                        finish(worker.job, "crashed", elapsed, f"exit code {worker.process.exitcode}")
+                    worker.job = None
+                    worker.stop(kill=True)
+                    pool[k] = start_worker()
+                elif timeout is not None and time.monotonic() - worker.started > timeout:
+                    finish(worker.job, "timeout", time.monotonic() - worker.started, f"timeout after {timeout} s")
+                    worker.job = None
+                    worker.stop(kill=True)
+                    pool[k] = start_worker()
+    finally:
+        for worker in pool:
+            worker.stop()
+
+    return [rows[k] for k in sorted(rows)]
+
+
+def write_results(rows, path):
+    """
+    Write the result rows to a CSV file, with the union of all row fields as header.
+    """
+    fields = list(dict.fromkeys(field for row in rows for field in row))
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def build_option(
+    sap_model,
+    bay_x=8.1,
+    bay_y=4.365,
+    storey_height=3.88,
+    slab_thickness=0.125,
+    num_bays_x=7,
+    num_bays_y=3,
+    num_of_storeys=3,
+):
+    """
+    Example job: one building option with create_grid_system, set_slab_prop and one
+    draw_slab per bay and storey.
+
+    Returns:
+    - result (dict): Number of slabs, total slab area and concrete volume.
+    """
+    from create_grid_system import create_grid_system
+    from draw_slab import draw_slab
+    from set_slab_prop import set_slab_prop
+
+    x_coordinates = [bay_x * i for i in range(num_bays_x + 1)]
+    y_coordinates = [bay_y * j for j in range(num_bays_y + 1)]
+    grid_points = create_grid_system(
+        sap_model, [storey_height] * num_of_storeys, x_coordinates, y_coordinates
+    )
+    set_slab_prop(sap_model, "Slab", thickness=slab_thickness)
+    slabs = 0
+    for z in grid_points.z[1:].tolist():
+        for i in range(num_bays_x):
+            for j in range(num_bays_y):
+                if draw_slab(sap_model, grid_points, i, i + 1, j, j + 1, 0, z, "Slab"):
+                    slabs += 1
+    slab_area = slabs * bay_x * bay_y
+    return {
+        "slabs": slabs,
+        "slab_area": slab_area,
+        "concrete_volume": slab_area * slab_thickness,
+        "height": storey_height * num_of_storeys,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parametric sweep of build_option on a worker pool.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--instance", default="fake", help='"fake" or "new" (one ETABS per worker)')
+    parser.add_argument("--latency", type=float, default=0.0005, help="Per-call latency of the fake model")
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--retries", type=int, default=1)
+    parser.add_argument("--bay-x", type=float, nargs="+", default=[6.0, 7.2, 8.1])
+    parser.add_argument("--storey-height", type=float, nargs="+", default=[3.5, 3.88])
+    parser.add_argument("--slab-thickness", type=float, nargs="+", default=[0.125, 0.15])
+    parser.add_argument("--output", default="sweep_results.csv")
+    args = parser.parse_args(argv)
+
+    connect_options = {}
+    if args.instance == "fake":
+        connect_options["fake_options"] = {"latency": args.latency}
+    start = time.perf_counter()
+    rows = run_sweep(
+        build_option,
+        {
+            "bay_x": args.bay_x,
+            "storey_height": args.storey_height,
+            "slab_thickness": args.slab_thickness,
+        },
+        workers=args.workers,
+        instance=args.instance,
+        connect_options=connect_options,
+        timeout=args.timeout,
+        retries=args.retries,
+    )
+    write_results(rows, args.output)
+    failed = sum(row["status"] != "ok" for row in rows)
+    print(
+        f"{len(rows)} jobs ({failed} failed) in {time.perf_counter() - start:.2f} s, "
+        f"results written to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cached_sap_model import CachedSapModel
+from fake_sap_model import FakeSapModel
+from material_prop import add_eurocode_conc_materials, snapshot_materials
+
+
+def test_table_apply_invalidates_cached_materials():
+    sap_model = CachedSapModel(FakeSapModel())
+    sap_model.InitializeNewModel(6)
+    before = snapshot_materials(sap_model)
+    assert not any(name.startswith("EC-C") for name in before)
+    snapshot_materials(sap_model)
+    assert sap_model.hits > 0  # the second read is served from the cache
+
+    add_eurocode_conc_materials(sap_model, grades=["C25/30", "C30/37", "C32/40", "C40/50"])
+
+    after = snapshot_materials(sap_model)
+    assert {"EC-C25/30", "EC-C30/37", "EC-C32/40", "EC-C40/50"} <= set(after)
@@ -0,0 +1,28 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from com_worker import ComWorker
+from fake_sap_model import FakeSapModel
+
+
+def test_close_disconnects_on_the_worker_thread_and_rejects_new_calls():
+    etabs_object = object()
+    sap_model = FakeSapModel()
+    disconnected = []
+
+    def disconnect(etabs, model):
+        disconnected.append((etabs, model, threading.current_thread().name))
+
+    worker = ComWorker(lambda: (etabs_object, sap_model), disconnect=disconnect)
+    future = worker.model.InitializeNewModel(6)
+    worker.close()
+    assert future.result() == 0
+    assert disconnected == [(etabs_object, sap_model, "ComWorker")]
+    assert worker.etabs_object is None
+    with pytest.raises(RuntimeError):
+        worker.model.GetPresentUnits()
@@ -0,0 +1,98 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_sap_model import FakeSapModel
+from floor_plate import FloorPlate, draw_floor_plates
+from geometry_backends import make_geometry_backend
+from grid import Grid
+from set_slab_prop import set_slab_prop
+
+GRID = Grid([0, 8.1, 16.2, 24.3, 32.4], [0, 4.365, 8.73, 13.095], [0, 3.88, 7.76])
+FULL_AREA = 32.4 * 13.095
+
+
+def _area(panel):
+    # Shoelace formula, positive for counterclockwise corners
+    x, y = np.asarray(panel.x), np.asarray(panel.y)
+    return 0.5 * np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)
+
+
+def _plate_with_opening():
+    plate = FloorPlate(GRID, "Slab")
+    plate.add_bays(0, 4, 0, 3)
+    plate.add_opening_bays(1, 2, 1, 2)
+    return plate
+
+
+def test_opening_splits_the_plate():
+    panels = _plate_with_opening().panels()
+    assert len(panels) == 2
+    assert all(_area(p) > 0 for p in panels)
+    assert sum(_area(p) for p in panels) == pytest.approx(FULL_AREA - 8.1 * 4.365)
+
+
+def test_balconies_merge_into_one_polygon():
+    plate = FloorPlate(GRID, "Slab")
+    plate.add_bays(0, 4, 0, 3)
+    plate.add_balconies("south", [1, 3], width=4, depth=2)
+    (panel,) = plate.panels()
+    assert len(panel.x) == 12
+    assert min(panel.y) == -2
+    assert _area(panel) == pytest.approx(FULL_AREA + 2 * 4 * 2)
+
+
+@pytest.mark.parametrize(
+    "merge, count",
+    [("polygons", 2), ("rectangles", 4), ("bays", 8)],
+)
+def test_merge_counts(merge, count):
+    panels = _plate_with_opening().panels(merge)
+    assert len(panels) == count
+    assert sum(_area(p) for p in panels) == pytest.approx(FULL_AREA - 8.1 * 4.365)
+
+
+def test_properties_are_kept_apart():
+    plate = FloorPlate(GRID, "Slab")
+    plate.add_bays(0, 4, 0, 3)
+    plate.add_bays(1, 2, 1, 2, prop_name="Thick")
+    panels = plate.panels()
+    assert [p.prop_name for p in panels].count("Thick") == 1
+    assert len(plate.panels("rectangles")) == 5
+
+
+def test_draw_floor_plates_through_tables_matches_api():
+    plate = _plate_with_opening()
+    plate.add_balconies("north", [2], width=4, depth=1.5)
+    models = {}
+    for kind in ("api", "tables"):
+        sap_model = FakeSapModel()
+        sap_model.InitializeNewModel(6)
+        set_slab_prop(sap_model, "Slab")
+        backend = make_geometry_backend(sap_model, kind)
+        names = draw_floor_plates(sap_model, plate, backend=backend)
+        assert backend.apply() == 0
+        assert len(names) == 2 * len(plate.panels())
+        models[kind] = sap_model
+
+    def outlines(sap_model):
+        return sorted(
+            tuple(sorted(sap_model.points[p] for p in area["points"]))
+            for area in sap_model.areas.values()
+        )
+
+    assert outlines(models["tables"]) == outlines(models["api"])
+
+    # A second table edit with rectangles only keeps the larger polygons drawn before
+    sap_model = models["tables"]
+    roof = FloorPlate(GRID, "Slab")
+    roof.add_bays(0, 4, 0, 3)
+    backend = make_geometry_backend(sap_model, "tables")
+    draw_floor_plates(sap_model, roof, story_elevations=[11.64], backend=backend)
+    assert backend.apply() == 0
+    assert sap_model.AreaObj.Count() == 2 * len(plate.panels()) + 1
+    assert set(outlines(models["api"])) <= set(outlines(sap_model))
@@ -0,0 +1,89 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from draw_slabs import draw_slabs
+from fake_sap_model import FakeSapModel
+from geometry_backends import make_geometry_backend
+from grid import Grid
+from joint_index import JointIndex
+from set_slab_prop import set_slab_prop
+
+
+def _model():
+    sap_model = FakeSapModel()
+    sap_model.InitializeNewModel(6)
+    set_slab_prop(sap_model, "Slab")
+    return sap_model, Grid([0, 8.1, 16.2], [0, 4.365], [0, 3.88, 7.76, 11.64])
+
+
+def test_second_tables_run_keeps_existing_objects_and_joints():
+    sap_model, grid = _model()
+    for _ in range(2):
+        backend = make_geometry_backend(sap_model, "tables")
+        draw_slabs(sap_model, grid, [(0, 1, 0, 1)], "Slab", backend=backend)
+        assert backend.apply() == 0
+    assert sap_model.AreaObj.Count() == 6
+    # The second run reuses the corner joints of the first one
+    assert len(sap_model.points) == 12
+
+    backend = make_geometry_backend(sap_model, "tables")
+    names = draw_slabs(sap_model, grid, [(1, 2, 0, 1)], "Slab", backend=backend)
+    assert backend.apply() == 0
+    assert sap_model.AreaObj.Count() == 9
+    assert len(sap_model.points) == 18
+    assert not set(names.values()) & {"TA1", "TA2", "TA3", "TA4", "TA5", "TA6"}
+
+
+def test_joints_with_backend_is_rejected():
+    sap_model, grid = _model()
+    backend = make_geometry_backend(sap_model, "tables")
+    with pytest.raises(ValueError):
+        draw_slabs(sap_model, grid, [(0, 1, 0, 1)], "Slab", joints=JointIndex(sap_model), backend=backend)
+
+
+def test_frames_through_tables_match_api():
+    from draw_frames import draw_frames
+    from get_storey_data import get_story_data
+    from create_grid_system import create_grid_system
+
+    results = {}
+    for kind in ("api", "tables"):
+        sap_model = FakeSapModel()
+        sap_model.InitializeNewModel(6)
+        grid = create_grid_system(sap_model, [3.88, 3.88], [0, 8.1, 16.2], [0, 4.365])
+        backend = make_geometry_backend(sap_model, kind)
+        sap_model.reset_counters()
+        frames = draw_frames(sap_model, grid, get_story_data(sap_model), "C600", "B300", backend=backend)
+        assert backend.apply() == 0
+        results[kind] = (frames, sap_model)
+    api_frames, api_model = results["api"]
+    table_frames, table_model = results["tables"]
+    assert table_frames == api_frames
+    assert table_model.FrameObj.Count() == api_model.FrameObj.Count() == 26
+    assert {n: f["prop"] for n, f in table_model.frames.items()} == {n: f["prop"] for n, f in api_model.frames.items()}
+    # Shared end joints, and a handful of calls instead of one per member
+    assert len(table_model.points) == 18
+    assert table_model.total_calls < 20
+
+
+def test_tables_backend_keeps_corners_of_existing_larger_areas():
+    from floor_plate import FloorPlate, draw_floor_plates
+
+    sap_model, grid = _model()
+    # An L-shaped panel with 6 corners, drawn through the api
+    plate = FloorPlate(grid, "Slab")
+    plate.add_bays(0, 2, 0, 1)
+    plate.add_bays(0, 1, 0, 1)
+    plate.add_region(0, 8.1, 4.365, 8.0)
+    draw_floor_plates(sap_model, plate, story_elevations=[3.88])
+    (existing,) = sap_model.areas
+
+    backend = make_geometry_backend(sap_model, "tables")
+    draw_slabs(sap_model, grid, [(1, 2, 0, 1)], "Slab", story_elevations=[7.76], backend=backend)
+    assert backend.apply() == 0
+    assert sap_model.AreaObj.Count() == 2
+    assert len(sap_model.areas[existing]["points"]) == 6
@@ -0,0 +1,16 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from get_results import ResultChunk, max_abs_by
+
+
+def test_group_key_of_tables_not_extracted_per_group():
+    chunks = [
+        ResultChunk("story_drifts", "ULS1", None, {"Drift": np.array([0.001, -0.003])}),
+        ResultChunk("story_drifts", "ULS2", None, {"Drift": np.array([0.002])}),
+    ]
+    assert max_abs_by(iter(chunks), "Drift", by="group") == {"All": 0.003}
@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from create_grid_system import create_grid_system
+from draw_frames import draw_frames
+from fake_sap_model import FakeSapModel
+from get_results import iter_results
+from get_storey_data import get_story_data
+from model_cache import ModelCache, cached_results, extract_frames, extract_points, extract_stories
+
+
+def test_datasets_do_not_depend_on_the_present_units(tmp_path):
+    sap_model = FakeSapModel()
+    sap_model.InitializeNewModel(6)
+    grid = create_grid_system(sap_model, [3.88, 3.88], [0, 8.1], [0, 4.365])
+    draw_frames(sap_model, grid, get_story_data(sap_model), "C600", "B300")
+    sap_model.File.Save(str(tmp_path / "model.EDB"))
+
+    cache = ModelCache.for_model(sap_model, str(tmp_path / "cache"))
+    points = cache.get_or_extract("points", extract_points, sap_model)
+    frames = cache.get_or_extract("frames", extract_frames, sap_model)
+    stories = cache.get_or_extract("stories", extract_stories, sap_model)
+    assert np.isclose(points["X"].max(), 8100.0)
+    assert np.isclose(frames["Length"][frames["IsColumn"]].max(), 3880.0)
+    assert np.isclose(stories["elevations"].max(), 7760.0)
+
+    # Extracted in other units, the same numbers are stored
+    sap_model.SetPresentUnits(5)  # kN_mm, the fake stores values as they are
+    for name, extract in (("points", extract_points), ("frames", extract_frames)):
+        other = extract(sap_model)
+        key = "X" if name == "points" else "Length"
+        assert np.allclose(other[key], cache.get(name)[key] / 1000.0)
+
+
+def test_results_are_cached_in_n_mm(tmp_path):
+    sap_model = FakeSapModel()
+    sap_model.InitializeNewModel(6)
+    grid = create_grid_system(sap_model, [3.88, 3.88], [0, 8.1], [0, 4.365])
+    draw_frames(sap_model, grid, get_story_data(sap_model), "C600", "B300")
+    sap_model.File.Save(str(tmp_path / "model.EDB"))
+    sap_model.Analyze.RunAnalysis()
+    cache = ModelCache(str(tmp_path / "model.EDB"), str(tmp_path / "cache"))
+
+    direct = list(iter_results(sap_model, "frame_forces", cases=["Dead"]))
+    cached = list(cached_results(cache, sap_model, "frame_forces", cases=["Dead"]))
+    assert len(cached) == len(direct) > 0
+    assert np.allclose(cached[0].columns["P"], direct[0].columns["P"] * 1000.0)
+    assert np.allclose(cached[0].columns["M3"], direct[0].columns["M3"] * 1e6)
+    assert np.allclose(cached[0].columns["StepNum"], direct[0].columns["StepNum"])
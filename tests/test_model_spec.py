@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_sap_model import FakeSapModel
+from model_spec import compile_spec
+
+
+@pytest.mark.parametrize("x", [[0, 8100, 16200], [0, 8100, 12000]])
+def test_spec_units_apply_to_the_grid_and_slabs(x):
+    spec = {
+        "units": "N_mm",
+        "grid": {"x": x, "y": [0, 4365]},
+        "stories": {"heights": [3880, 3880]},
+        "slab_props": ["Slab"],
+        "slabs": [{"prop": "Slab", "bays": [[0, 1, 0, 1]]}],
+    }
+    sap_model = FakeSapModel()
+    compile_spec(spec).execute(sap_model)
+    assert sap_model.GetPresentUnits() == 9
+    assert [line[1] for line in sap_model.grid_lines_x] == x
+    assert sap_model.Story.GetStories()[2][-1] == 7760
+    corners = [sap_model.points[p] for a in sap_model.areas.values() for p in a["points"]]
+    assert max(c[0] for c in corners) == 8100
+    assert max(c[2] for c in corners) == 7760
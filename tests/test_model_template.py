@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_sap_model import FakeSapModel
+from model_spec import load_spec
+from model_template import build_variant, ensure_template
+
+SPEC_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "example_model_spec.json")
+
+
+def test_variants_reuse_the_template(tmp_path):
+    template_dir = str(tmp_path / "templates")
+    spec = load_spec(SPEC_PATH)
+    sap_model = FakeSapModel()
+
+    for k, bay_x in enumerate([7.2, 8.1]):
+        sap_model.reset_counters()
+        template = ensure_template(sap_model, spec, template_dir)
+        if k == 0:
+            assert sap_model.call_counts["File.Save"] == 1
+            built = os.path.getmtime(template)
+        else:
+            # Found by its sidecar, nothing is built
+            assert sap_model.total_calls == 0
+            assert os.path.getmtime(template) == built
+
+        spec["grid"]["x"] = [bay_x * i for i in range(8)]
+        variant_path = str(tmp_path / "variants" / "option_{}.EDB".format(k))
+        summary = build_variant(sap_model, spec, variant_path, template_dir)
+        assert summary["ret"] == 0
+        assert summary["slabs"]["added"] == 3
+        assert sap_model.call_counts.get("PropMaterial.AddMaterial", 0) == (5 if k == 0 else 0)
+        assert os.path.exists(variant_path)
+        assert sap_model.AreaObj.Count() == 3
+        assert max(x for x, _, _ in sap_model.points.values()) == pytest.approx(bay_x * 7)
+
+    assert len(os.listdir(template_dir)) == 2  # the template and its sidecar
@@ -0,0 +1,37 @@
+import copy
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_sap_model import FakeSapModel
+from model_spec import compile_spec, load_spec
+from model_update import update_model
+
+SPEC_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "example_model_spec.json")
+
+
+def test_update_model_moves_adds_deletes_then_is_up_to_date():
+    spec = load_spec(SPEC_PATH)
+    spec["slabs"][0]["bays"] = [[0, 2, 0, 3], [2, 4, 0, 3], [4, 7, 0, 3]]
+    sap_model = FakeSapModel()
+    compile_spec(spec).execute(sap_model)
+    assert sap_model.AreaObj.Count() == 9
+
+    spec = copy.deepcopy(spec)
+    spec["stories"]["heights"][2] = 4.2  # the top storey slabs move up
+    spec["grid"]["x"][4] = 32.0  # the second bay range moves on every storey
+    spec["slabs"][0]["bays"] = [[0, 2, 0, 3], [2, 4, 0, 3], [4, 6, 0, 3]]
+    summary = update_model(sap_model, spec)
+    assert summary["ret"] == 0
+    assert summary["stories"] and summary["grid"]
+    assert summary["slabs"] == {"added": 3, "moved": 4, "reassigned": 0, "deleted": 3, "unchanged": 2}
+    assert sap_model.AreaObj.Count() == 9
+    assert sap_model.Story.GetStories()[2][-1] == pytest.approx(2 * 3.88 + 4.2)
+
+    summary = update_model(sap_model, spec)
+    assert "ret" not in summary
+    assert not summary["stories"] and not summary["grid"]
+    assert summary["slabs"] == {"added": 0, "moved": 0, "reassigned": 0, "deleted": 0, "unchanged": 9}
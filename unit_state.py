@@ -0,0 +1,201 @@
+"""
+Present-unit state of the model and unit conversion on the Python side.
+
+The ETABS API reads and writes every value in the present units of the model, so
+code which needs other units (the materials are defined in N, mm & MPa) used to
+switch the model with SetPresentUnits and not switch it back. This module keeps
+the unit handling in one place:
+
+- UnitTrackingSapModel is a SapModel wrapper (connect_to_etabs(track_units=True))
+  which remembers the present units, answers GetPresentUnits from memory and drops
+  SetPresentUnits calls to the units the model is already in.
+- present_units(sap_model, units) is a context manager which switches the model to
+  the given units only if needed and restores the previous units on exit.
+- convert(values, quantity, from_units, to_units) converts scalars or whole NumPy
+  arrays of coordinates, forces, stresses, ... between unit systems, so values
+  read in the present units can be used in any units without switching the model.
+
+Units are given as an eUnits code (6) or a "force_length" name ("kN_m").
+
+Example:
+>>> present = sap_model.GetPresentUnits()
+>>> x_mm = convert(grid_points.x, "length", present, "N_mm")
+>>> with present_units(sap_model, "N_mm"):
+...     sap_model.PropMaterial.SetMPIsotropic("EC-C30/37", 33000, 0.2, 1e-05)
+"""
+from contextlib import contextmanager
+
+import numpy as np
+
+from sap_model_proxy import SapModelProxy
+
+# eUnits code: (force, length, temperature)
+EUNITS = {
+    1: ("lb", "in", "F"),
+    2: ("lb", "ft", "F"),
+    3: ("kip", "in", "F"),
+    4: ("kip", "ft", "F"),
+    5: ("kN", "mm", "C"),
+    6: ("kN", "m", "C"),
+    7: ("kgf", "mm", "C"),
+    8: ("kgf", "m", "C"),
+    9: ("N", "mm", "C"),
+    10: ("N", "m", "C"),
+    11: ("Ton", "mm", "C"),
+    12: ("Ton", "m", "C"),
+    13: ("kN", "cm", "C"),
+    14: ("kgf", "cm", "C"),
+    15: ("N", "cm", "C"),
+    16: ("Ton", "cm", "C"),
+}
+UNIT_NAMES = {code: "{}_{}".format(force, length) for code, (force, length, _) in EUNITS.items()}
+
+FORCE_IN_N = {"lb": 4.4482216152605, "kip": 4448.2216152605, "N": 1.0, "kN": 1000.0, "kgf": 9.80665, "Ton": 9806.65}
+LENGTH_IN_M = {"in": 0.0254, "ft": 0.3048, "mm": 0.001, "cm": 0.01, "m": 1.0}
+TEMPERATURE_STEP_IN_K = {"C": 1.0, "F": 5.0 / 9.0}
+
+# Quantity: exponents of (force, length, temperature)
+QUANTITIES = {
+    "length": (0, 1, 0),
+    "area": (0, 2, 0),
+    "volume": (0, 3, 0),
+    "force": (1, 0, 0),
+    "moment": (1, 1, 0),
+    "force_per_length": (1, -1, 0),
+    "stress": (1, -2, 0),
+    "weight_density": (1, -3, 0),
+    "thermal_coefficient": (0, 0, -1),
+}
+
+# Calls after which the present units are no longer known
+_UNITS_RESET = ("File.NewBlank", "File.NewGridOnly", "File.OpenFile")
+
+
+def unit_code(units):
+    """
+    eUnits code of units given as a code or a "force_length" name, e.g. "kN_m" -> 6.
+    """
+    if isinstance(units, str):
+        for code, name in UNIT_NAMES.items():
+            if name == units:
+                return code
+        raise ValueError(f"Unknown units {units!r}, use one of {sorted(UNIT_NAMES.values())}")
+    code = int(units)
+    if code not in EUNITS:
+        raise ValueError(f"Unknown eUnits code {units!r}")
+    return code
+
+
+def conversion_factor(quantity, from_units, to_units):
+    """
+    Factor converting a quantity (see QUANTITIES) from one unit system to another.
+    """
+    force_exp, length_exp, temperature_exp = QUANTITIES[quantity]
+    factor = 1.0
+    for units, sign in ((from_units, 1), (to_units, -1)):
+        force, length, temperature = EUNITS[unit_code(units)]
+        factor *= (
+            FORCE_IN_N[force] ** force_exp
+            * LENGTH_IN_M[length] ** length_exp
+            * TEMPERATURE_STEP_IN_K[temperature] ** temperature_exp
+        ) ** sign
+    return factor
+
+
+def convert(values, quantity, from_units, to_units):
+    """
+    Convert values of a quantity between unit systems.
+
+    Parameters:
+    - values: Scalar, list or NumPy array.
+    - quantity (str): One of QUANTITIES, e.g. "length" or "stress".
+    - from_units, to_units: eUnits codes or names.
+
+    Returns:
+    - The converted values, a float for a scalar, else a float NumPy array.
+    """
+    if unit_code(from_units) == unit_code(to_units):
+        factor = 1.0
+    else:
+        factor = conversion_factor(quantity, from_units, to_units)
+    if np.ndim(values) == 0:
+        return float(values) * factor
+    return np.asarray(values, dtype=float) * factor
+
+
+class UnitTrackingSapModel(SapModelProxy):
+    """
+    SapModel wrapper which knows the present units and skips redundant unit calls.
+
+    Parameters:
+    - sap_model: SapModel object (refer to function connect_to_etabs) or FakeSapModel.
+
+    Attributes:
+    - present (int): eUnits code the model is in, None until read or set.
+    - elided (int): Number of GetPresentUnits / SetPresentUnits calls not sent.
+    """
+
+    def __init__(self, sap_model):
+        super().__init__(sap_model)
+        self.present = None
+        self.elided = 0
+
+    def _invoke(self, path, method, args, kwargs):
+        if path == "GetPresentUnits":
+            if self.present is None:
+                self.present = method(*args, **kwargs)
+            else:
+                self.elided += 1
+            return self.present
+        if path == "SetPresentUnits":
+            code = args[0] if args else kwargs.get("Units")
+            if code == self.present:
+                self.elided += 1
+                return 0
+            ret = method(*args, **kwargs)
+            self.present = code if ret == 0 else None
+            return ret
+
+        result = method(*args, **kwargs)
+        if path == "InitializeNewModel":
+            code = args[0] if args else kwargs.get("Units")
+            self.present = code if result == 0 else None
+        elif path in _UNITS_RESET:
+            self.present = None
+        return result
+
+
+def set_present_units(sap_model, units):
+    """
+    Switch the model to the given units unless it is already in them.
+
+    Returns:
+    - ret (int): 0 on success or if nothing had to be done.
+    """
+    code = unit_code(units)
+    if sap_model.GetPresentUnits() == code:
+        return 0
+    return sap_model.SetPresentUnits(code)
+
+
+@contextmanager
+def present_units(sap_model, units):
+    """
+    Context manager running its block in the given units and restoring the previous
+    units afterwards. Nothing is called if the model is already in these units.
+
+    Example:
+    >>> with present_units(sap_model, "N_mm"):
+    ...     fc = sap_model.PropMaterial.GetOConcrete_1("EC-C30/37")[0]  # MPa
+    """
+    code = unit_code(units)
+    previous = sap_model.GetPresentUnits()
+    if previous != code:
+        ret = sap_model.SetPresentUnits(code)
+        if ret != 0:
+            raise RuntimeError(f"Error setting the units {UNIT_NAMES[code]}. Return code: {ret}")
+    try:
+        yield code
+    finally:
+        if previous != code:
+            sap_model.SetPresentUnits(previous)